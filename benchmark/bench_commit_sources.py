@@ -0,0 +1,51 @@
+"""Compare the commit source backends against the original GitPython git log path on a large synthetic range.
+
+ Usage (from the root of the repo): python -m benchmark.bench_commit_sources [--commits 100000]
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from benchmark.reference import original_gitpython_log
+from benchmark.synthetic_repo import create_repo
+from commit_source import COMMIT_SOURCES
+from commit_source import open_commit_source
+
+def backend_log(repo_directory, backend, source, destination):
+    """Read the same range through a commit source backend"""
+    with open_commit_source(repo_directory, backend) as commits:
+        return [line for _, line in commits.iter_log(source, destination)]
+
+def time_call(function, *args):
+    """Run function once, returning (seconds, result)"""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=100000, help='Number of commits in the synthetic repo')
+    parser.add_argument('--merge_every', type=int, default=50, help='Add a merge commit every n commits')
+    parser.add_argument('--packed', action='store_true', help='Repack the repo before timing (the odb backend reads packs and loose objects)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        repo_directory = os.path.join(directory, "repo")
+        create_repo(repo_directory, args.commits, merge_every=args.merge_every)
+
+        if args.packed:
+            subprocess.run(["git", "repack", "-adq"], cwd=repo_directory, check=True)
+
+        seconds, expected = time_call(original_gitpython_log, repo_directory, "start", "end")
+        print(f"{'original gitpython':<20}{seconds:>10.3f}s {len(expected):>10} commits")
+
+        for backend in sorted(COMMIT_SOURCES):
+            seconds, lines = time_call(backend_log, repo_directory, backend, "start", "end")
+            status = "" if lines == expected else "  OUTPUT DIFFERS"
+            print(f"{backend:<20}{seconds:>10.3f}s {len(lines):>10} commits{status}")
+
+if __name__ == "__main__":
+    main()
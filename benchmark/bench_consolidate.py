@@ -0,0 +1,65 @@
+"""Compare the hash join consolidation of git and Jira data against the original two loop consolidation.
+
+ The original kept only the last commit of each key (and split its comment into one line per character),
+ so only the keys and the InJira/InGit columns of the review rows are compared.
+
+ Usage (from the root of the repo): python -m benchmark.bench_consolidate [--keys 100000]
+"""
+
+import argparse
+import random
+import time
+
+from benchmark.reference import original_consolidate
+from consolidate import consolidate, review_rows
+from records import GitCommitMessage
+
+def synthetic_inputs(keys, seed=1):
+    """A jira dictionary of keys issues and a list of commits, 80% of them for issues in Jira with several commits for some issues"""
+    rng = random.Random(seed)
+    jira_issues = {}
+    commits = []
+
+    for number in range(keys):
+        key = "ABC-" + str(number)
+        jira_issues[key] = (rng.choice(["Story", "Defect", "Epic"]), "Summary of " + key, "Release note for " + key)
+
+    for number in range(keys):
+        key = "ABC-" + str(rng.randint(0, keys * 5 // 4))
+        for commit in range(rng.choice([1, 1, 1, 2, 3])):
+            commits.append(GitCommitMessage(format(number, "07x") + str(commit), key, "Commit " + str(commit) + " for " + key))
+
+    return jira_issues, commits
+
+def group_commits(commits):
+    """The git dictionary built by get_git_log"""
+    git_dictionary = {}
+    for commit in commits:
+        git_dictionary.setdefault(commit.jira_id, []).append(commit)
+    return git_dictionary
+
+def time_call(function, *args):
+    """Run function once, returning (seconds, result)"""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, nargs='+', default=[100000], help='Numbers of Jira issue keys')
+    args = parser.parse_args()
+
+    for count in args.keys:
+        jira_issues, commits = synthetic_inputs(count)
+
+        # The original needed the commits grouped into a dictionary first, the join consumes them as they are read
+        original_seconds, original_rows = time_call(lambda: original_consolidate(jira_issues, group_commits(commits)))
+        seconds, rows = time_call(lambda: list(review_rows(consolidate(jira_issues, commits))))
+
+        line = f"{count:>10} keys {len(commits):>8} commits  original {original_seconds:>8.3f}s  hash join {seconds:>8.3f}s"
+        if [row[:4] for row in rows] != [row[:4] for row in original_rows]:
+            line += "  OUTPUT DIFFERS"
+        print(line)
+
+if __name__ == "__main__":
+    main()
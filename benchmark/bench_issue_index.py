@@ -0,0 +1,49 @@
+"""Time building the issue index of a synthetic repo, updating it after a few more commits, and looking up keys in it.
+
+ Usage (from the root of the repo): python -m benchmark.bench_issue_index [--commits 100000] [--new_commits 50]
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+
+from benchmark.suite import fastest
+from benchmark.synthetic_repo import create_repo
+from commit_source import open_commit_source
+from issue_index import IssueIndex
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=100000, help='Number of commits in the synthetic repo')
+    parser.add_argument('--new_commits', type=int, default=50, help='Number of commits added before the incremental update')
+    parser.add_argument('--backend', type=str, default="gitpython", help='Commit source backend')
+    parser.add_argument('--repeat', type=int, default=100, help='Number of times each lookup is run, keeping the fastest')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        repo_directory = create_repo(os.path.join(workdir, "repo"), args.commits, merge_every=50)
+
+        with IssueIndex(os.path.join(workdir, "index.sqlite")) as index, open_commit_source(repo_directory, args.backend) as commits:
+            build, added = fastest(1, index.update, commits, "master")
+
+        for number in range(args.new_commits):
+            subprocess.run(["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com", "commit", "-q", "--allow-empty",
+                            "-m", f"NEW-{number} A later change"], cwd=repo_directory, check=True)
+        subprocess.run(["git", "tag", "later"], cwd=repo_directory, check=True)
+
+        with IssueIndex(os.path.join(workdir, "index.sqlite")) as index, open_commit_source(repo_directory, args.backend) as commits:
+            incremental, new = fastest(1, index.update, commits, "master")
+
+            key = index.lookup_prefix("")[args.commits // 2][0]
+            lookup, entries = fastest(args.repeat, index.lookup, key)
+            prefix, prefixed = fastest(args.repeat, index.lookup_prefix, key[:-1])
+
+    print(f"{args.commits} commits ({args.backend})")
+    print(f"{'build the index (' + str(added) + ' commits)':<40}{build:>9.3f}s")
+    print(f"{'update the index (' + str(new) + ' new commits)':<40}{incremental:>9.3f}s")
+    print(f"{'lookup ' + key + ' (' + str(len(entries)) + ' commits)':<40}{lookup * 1000:>9.3f}ms")
+    print(f"{'lookup prefix ' + key[:-1] + ' (' + str(len(prefixed)) + ' commits)':<40}{prefix * 1000:>9.3f}ms")
+
+if __name__ == "__main__":
+    main()
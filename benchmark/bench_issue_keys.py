@@ -0,0 +1,58 @@
+"""Compare the de-duplication and filtering of the issue keys queried in Jira against the original list based implementation.
+
+ Usage (from the root of the repo): python -m benchmark.bench_issue_keys [--keys 100000 200000]
+"""
+
+import argparse
+import random
+import time
+
+from benchmark.reference import original_filter_jira_issues
+from trackers import registry
+
+# The projects the original implementation left out of the JQL
+BLACKLIST = ['AZMV', 'AMZV']
+
+# The original implementation is quadratic, so only time it up to this many keys
+ORIGINAL_LIMIT = 20000
+
+def synthetic_keys(count, seed=1):
+    """count issue keys from several projects, with duplicates, UNKNOWN keys and blacklisted projects"""
+    rng = random.Random(seed)
+    projects = ['ABC', 'DEF', 'VMS', 'FW', 'AZMV', 'amzv']
+    keys = []
+
+    for _ in range(count):
+        if rng.random() < 0.05:
+            keys.append('UNKNOWN')
+        else:
+            keys.append(rng.choice(projects) + '-' + str(rng.randint(1, count // 2)))
+
+    return keys
+
+def time_call(function, *args):
+    """Run function once, returning (seconds, result)"""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, nargs='+', default=[10000, 100000, 1000000], help='Numbers of keys to filter')
+    args = parser.parse_args()
+
+    for count in args.keys:
+        keys = synthetic_keys(count)
+        seconds, issues = time_call(registry.default_issues, keys)
+        line = f"{count:>10} keys  default_issues {seconds:>8.3f}s"
+
+        if count <= ORIGINAL_LIMIT:
+            original_seconds, original_issues = time_call(original_filter_jira_issues, keys, BLACKLIST)
+            line += f"  original {original_seconds:>8.3f}s"
+            if original_issues != issues:
+                line += "  OUTPUT DIFFERS"
+
+        print(line)
+
+if __name__ == "__main__":
+    main()
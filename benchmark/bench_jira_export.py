@@ -0,0 +1,76 @@
+"""Compare reading a Jira export with the projected reader, and loading it from a snapshot store, against
+ the original csv.DictReader path, checking all of them produce the same consolidation columns.
+
+ Usage (from the root of the repo): python -m benchmark.bench_jira_export [--issues 50000] [--custom_fields 40]
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmark.reference import original_read_jira_export
+from benchmark.synthetic_jira_export import create_jira_export
+from jira_export import read_jira_export
+from jira_snapshot import load_jira_issues
+
+def read_projected(path, use_mmap):
+    """Build the jira dictionary of release_note_generator.main with the projected reader"""
+    return {issue_key: (issue_type, summary, proposed_release_note)
+            for issue_key, issue_type, summary, proposed_release_note in read_jira_export(path, use_mmap=use_mmap)}
+
+def measure(function, *args):
+    """Run function once, returning (seconds, bytes held by the result, result)"""
+    gc.collect()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+
+    # Measure the memory separately, as tracing slows everything down
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, held, result
+
+def time_call(function, *args):
+    """Run function once, returning the seconds it took"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--issues', type=int, nargs='+', default=[50000], help='Numbers of issues in the export')
+    parser.add_argument('--custom_fields', type=int, default=40, help='Number of unused custom field columns')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.issues:
+            path = create_jira_export(os.path.join(directory, "export.csv"), count, args.custom_fields)
+
+            original_seconds, original_held, original = measure(original_read_jira_export, path)
+            expected = {key: (entry.issue_type, entry.summary, entry.proposed_release_note) for key, entry in original.items()}
+            print(f"{count:>10} issues  DictReader  {original_seconds:>8.3f}s {original_held / 2**20:>8.1f}MiB")
+            del original
+
+            for name, use_mmap in (("projected", False), ("mmap", True)):
+                seconds, held, projected = measure(read_projected, path, use_mmap)
+                line = f"{count:>10} issues  {name:<10}  {seconds:>8.3f}s {held / 2**20:>8.1f}MiB"
+                if projected != expected:
+                    line += "  OUTPUT DIFFERS"
+                print(line)
+
+            # The first load imports the export into the store, later loads only read the snapshot
+            store_path = os.path.join(directory, "store" + str(count) + ".sqlite")
+            for name in ("import", "snapshot"):
+                seconds = time_call(load_jira_issues, [path], store_path)
+                print(f"{count:>10} issues  {name:<10}  {seconds:>8.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Compare parsing git log lines one by one against parsing chunks of them in a pool of processes.
+
+ The lines are generated in memory, in the mix of message styles of the synthetic repos, so only parsing is timed.
+ Parallel parsing only pays off with more than one CPU: each chunk is pickled to a worker and its fields back.
+
+ Usage (from the root of the repo): python -m benchmark.bench_parallel_parse [--lines 1000000] [--jobs 2 4]
+"""
+
+import argparse
+import os
+import random
+
+from benchmark.suite import fastest
+from benchmark.synthetic_repo import commit_message
+from parse_git_log import iter_parallel_parse, split_commit_message, PARSE_CHUNK_SIZE
+
+def synthetic_lines(count, seed=1):
+    """count git log --oneline entries"""
+    rng = random.Random(seed)
+    return [format(rng.getrandbits(28), "07x") + " " + commit_message(rng) for _ in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=1000000, help='Number of git log lines to parse')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[2, 4], help='Numbers of worker processes to compare')
+    parser.add_argument('--chunk_size', type=int, default=PARSE_CHUNK_SIZE, help='Number of lines parsed by a worker at a time')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times each way is run, keeping the fastest')
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines)
+
+    serial, expected = fastest(args.repeat, lambda: [(line, split_commit_message(line)) for line in lines])
+    print(f"{args.lines} lines on {os.cpu_count()} CPUs")
+    print(f"serial            {serial:>8.3f}s")
+
+    for jobs in args.jobs:
+        seconds, entries = fastest(args.repeat, lambda: list(iter_parallel_parse(lines, jobs, args.chunk_size)))
+        assert [(commit.hash, commit.jira_id, commit.comment) for _, commit in entries] == \
+            [(commit.hash, commit.jira_id, commit.comment) for _, commit in expected]
+        print(f"{jobs} processes       {seconds:>8.3f}s")
+
+if __name__ == "__main__":
+    main()
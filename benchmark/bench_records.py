@@ -0,0 +1,81 @@
+"""Compare the memory held by the shared records against the original records with a __dict__ per instance.
+
+ Usage (from the root of the repo): python -m benchmark.bench_records [--records 100000]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from benchmark import reference
+import records
+
+STATUSES = ["Closed", "Resolved", "Done"]
+ISSUE_TYPES = ["Epic", "Story", "Defect", "Support", "Spike", "Sub-task"]
+
+def synthetic_commits(make_commit, count, seed=1):
+    """count commits, built from freshly parsed strings as the git log parser would, with repeated issue keys"""
+    rng = random.Random(seed)
+    commits = []
+
+    for number in range(count):
+        # Build each key with a join so that, as for a parsed line, no two commits share the same string object
+        key = "-".join((rng.choice(["ABC", "DEF", "VMS"]), str(rng.randint(1, count // 10 + 1))))
+        commits.append(make_commit(format(number, "010x"), key, "Commit message number " + str(number)))
+
+    return commits
+
+def synthetic_jira_rows(make_entry, count, seed=1):
+    """count rows of a Jira export, built from fresh strings as csv.DictReader would"""
+    rng = random.Random(seed)
+    rows = []
+
+    for number in range(count):
+        rows.append(make_entry(**{
+            'Issue Type': "".join(rng.choice(ISSUE_TYPES)), 'Issue key': "-".join(("ABC", str(number))),
+            'Issue id': str(100000 + number), 'Parent id': "", 'Summary': "Summary of issue " + str(number),
+            'Resolution': "".join("Fixed"), 'Resolved': "01/Jan/25 10:00 AM", 'Custom field (Closed Date)': "",
+            'Custom field (ID)': "", 'Assignee': "".join(rng.choice(["alice", "bob", "carol"])),
+            'Reporter': "".join(rng.choice(["dave", "erin"])), 'Priority': "".join(rng.choice(["P1", "P2", "P3"])),
+            'Created': "01/Dec/24 9:00 AM", 'Status': "".join(rng.choice(STATUSES)), 'Fix Version/s': "".join("V500_25.1"),
+            'Custom field (Proposed Release Notes)': "Release note " + str(number)}))
+
+    return rows
+
+def synthetic_entries(make_entry, count, seed=1):
+    """count consolidated entries, as built by the note generators"""
+    rng = random.Random(seed)
+    return [make_entry("-".join(("ABC", str(number))), "Yes", "Yes", "Summary " + str(number), "".join(rng.choice(ISSUE_TYPES)),
+                       "Commit message " + str(number), "Release note " + str(number)) for number in range(count)]
+
+def memory_held(build, *args):
+    """The bytes still allocated once build(*args) has returned, i.e. the memory its result holds on to"""
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', type=int, nargs='+', default=[100000], help='Number of records of each kind')
+    args = parser.parse_args()
+
+    kinds = [
+        ("GitCommitMessage", synthetic_commits, reference.OriginalGitCommitMessage, records.GitCommitMessage),
+        ("JiraExportQueryEntry", synthetic_jira_rows, reference.OriginalJiraExportQueryEntry, records.JiraExportQueryEntry),
+        ("ConsolidatedEntry", synthetic_entries, reference.OriginalConsolidatedEntry, records.ConsolidatedEntry),
+    ]
+
+    for count in args.records:
+        for name, build, original, shared in kinds:
+            original_bytes = memory_held(build, original, count)
+            shared_bytes = memory_held(build, shared, count)
+            print(f"{count:>10} {name:<22} original {original_bytes / 2**20:>8.1f}MiB  "
+                  f"records {shared_bytes / 2**20:>8.1f}MiB  ({1 - shared_bytes / original_bytes:.0%} less)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare fetching the git logs of a release train with one get_git_log per pair of tags against a single walk with get_release_train.
+
+ The train is --tags evenly spaced tags of a synthetic repo with a merge every 50 commits. Every run exports
+ the commits to a commit log CSV, as the tools do by default. With --branch_age, each merged branch starts
+ that many commits before its merge, so the branches merged into one range fork from before earlier tags
+ and git log has to walk back past them for every pair.
+
+ Usage (from the root of the repo): python -m benchmark.bench_release_train [--commits 100000] [--tags 40] [--branch_age 0]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmark.suite import fastest
+from benchmark.synthetic_repo import create_repo
+from parse_git_log import get_git_log
+from release_train import get_release_train
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=100000, help='Number of commits in the synthetic repo')
+    parser.add_argument('--tags', type=int, default=40, help='Number of tags in the release train')
+    parser.add_argument('--branch_age', type=int, default=0, help='Number of commits before its merge that each side branch starts')
+    parser.add_argument('--backend', type=str, default="gitpython", help='Commit source backend')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times each way is run, keeping the fastest')
+    args = parser.parse_args()
+
+    tag_every = args.commits // args.tags
+
+    with tempfile.TemporaryDirectory() as workdir:
+        repo_directory = create_repo(os.path.join(workdir, "repo"), args.commits, tag_every=tag_every, merge_every=50,
+                                     branch_age=args.branch_age)
+        tags = ["start"] + ["tag-" + str(number * tag_every) for number in range(1, args.tags + 1)]
+        repo_location, repo = os.path.split(repo_directory)
+        commit_log = os.path.join(workdir, "commitMessages.csv")
+
+        per_pair, pairs = fastest(args.repeat, lambda: [get_git_log(repo_location, repo, source, destination, backend=args.backend, commit_log=commit_log)
+                                                        for source, destination in zip(tags, tags[1:])])
+        largest, _ = fastest(args.repeat, get_git_log, repo_location, repo, tags[0], tags[-1], False, args.backend, commit_log)
+        single_walk, train = fastest(args.repeat, get_release_train, repo_location, repo, tags, args.backend, commit_log, False, True)
+
+        for (git_dictionary, _, git_log), (_, _, train_dictionary, _, train_log) in zip(pairs, train):
+            assert git_log == train_log and list(git_dictionary) == list(train_dictionary)
+
+    print(f"{len(tags) - 1} pairs of tags over {args.commits} commits, branches of {args.branch_age} commits ({args.backend})")
+    print(f"get_git_log per pair          {per_pair:>8.3f}s")
+    print(f"get_git_log of the whole train {largest:>7.3f}s")
+    print(f"get_release_train with roll-up {single_walk:>7.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare the HTML renderers against the original renderer on large notes, checking the output is byte-identical.
+
+ Usage (from the root of the repo): python -m benchmark.bench_render [--rows 100000]
+"""
+
+import argparse
+import filecmp
+import os
+import random
+import tempfile
+import time
+
+from benchmark import reference_render_to_html
+from records import ConsolidatedEntry, GitCommitMessage
+import render_to_html
+from render_paged_html import render_engineering_notes_paged
+
+ISSUE_TYPES = ["Epic", "Story", "Defect", "Support", "Spike", "Sub-task"]
+
+def synthetic_issues(count, seed=1):
+    """count consolidated entries with a mix of issue types, jira and AZDO keys"""
+    rng = random.Random(seed)
+    issues = []
+
+    for number in range(count):
+        key = rng.choice(["ABC", "DEF", "AZMV"]) + "-" + str(number)
+        issues.append(ConsolidatedEntry(key, "Yes", "Yes", "Summary of " + key, rng.choice(ISSUE_TYPES),
+                                        "Commit message for " + key, "Release note for " + key))
+
+    return issues
+
+def time_call(function, *args):
+    """Run function once, returning the seconds it took"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help='Number of issues in each note')
+    args = parser.parse_args()
+
+    issues = synthetic_issues(args.rows)
+    git_log = "".join("abcd%03x %s %s\n" % (number % 4096, issue.jira_id, issue.git_comment) for number, issue in enumerate(issues))
+
+    # The engineering notes render a row per commit, which the original renderer took as consolidated entries
+    commits = [GitCommitMessage("abcd%03x" % (number % 4096), issue.jira_id, issue.git_comment) for number, issue in enumerate(issues)]
+    engineering_rows = {reference_render_to_html: issues, render_to_html: commits}
+
+    renders = {
+        "engineering note": lambda module, output: module.render_engineering_notes(output, "v1", "v2", engineering_rows[module], "git log v1..v2\n", git_log, "https://jira/?jql="),
+        "release note": lambda module, output: module.render_to_html(output, "v2", "v1", issues),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, render in renders.items():
+            original_output = os.path.join(directory, "original.html")
+            output = os.path.join(directory, "new.html")
+
+            original_seconds = time_call(render, reference_render_to_html, original_output)
+            seconds = time_call(render, render_to_html, output)
+            status = "" if filecmp.cmp(original_output, output, shallow=False) else "  OUTPUT DIFFERS"
+
+            print(f"{name:<18}{args.rows:>8} rows  original {original_seconds:>7.3f}s  optimised {seconds:>7.3f}s{status}")
+
+        # The paged note writes the same rows to chunks beside a small index page, which is all a browser opens up front
+        output = os.path.join(directory, "paged.html")
+        seconds = time_call(render_engineering_notes_paged, output, "v1", "v2", commits, "git log v1..v2\n", git_log, "https://jira/?jql=")
+        single_size = os.path.getsize(os.path.join(directory, "new.html"))
+        print(f"{'  paged':<18}{args.rows:>8} rows  paged     {seconds:>7.3f}s  index page {os.path.getsize(output) / 1024:.1f}KB (single file {single_size / 1048576:.1f}MB)")
+
+if __name__ == "__main__":
+    main()
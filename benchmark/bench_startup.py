@@ -0,0 +1,72 @@
+"""Compare the startup cost of the releasenotes entry point against the individual tool scripts, with python -X importtime.
+
+ Each command line is run with --help, so the time measured is the interpreter starting and importing the
+ modules it needs, and nothing else. The total import time is the sum of the self times -X importtime
+ reports for every module imported. The modules are compiled first, so compiling them is not counted.
+
+ Usage (from the root of the repo): python -m benchmark.bench_startup [--repeat 10]
+"""
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+import time
+
+import releasenotes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that are slow to import, and that a run should only import when it uses them
+HEAVY_MODULES = ["argparse", "sqlite3", "cProfile", "pstats", "tracemalloc", "json", "gzip", "webbrowser", "concurrent.futures",
+                 "tempfile", "git", "jira_snapshot", "pipeline", "render_to_html", "parse_git_log"]
+
+def import_times(command_line):
+    """Run a command line under python -X importtime, returning (wall seconds, total import microseconds, modules imported)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *command_line], cwd=ROOT, capture_output=True, text=True, check=True)
+    seconds = time.perf_counter() - start
+
+    total = 0
+    modules = set()
+
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_time, _, module = line[len("import time:"):].split("|")
+            total += int(self_time)
+            modules.add(module.strip())
+
+    return seconds, total, modules
+
+def fastest(repeat, command_line):
+    """The fastest of repeat runs of import_times, and the modules imported"""
+    runs = [import_times(command_line) for _ in range(repeat)]
+    return min(seconds for seconds, _, _ in runs), min(total for _, total, _ in runs), runs[-1][2]
+
+def report(name, repeat, command_line):
+    """Print the startup cost of a command line, and which of the heavy modules it imported"""
+    seconds, total, modules = fastest(repeat, command_line)
+    heavy = [module for module in HEAVY_MODULES if module in modules]
+    print(f"{name:<36} {seconds * 1000:>8.1f}ms {total / 1000:>8.1f}ms imports   {' '.join(heavy)}")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=10, help='Number of times each command line is run, keeping the fastest')
+    args = parser.parse_args()
+
+    compileall.compile_dir(ROOT, quiet=1)
+
+    print(f"{'command line':<36} {'wall':>10} {'total':>8}            heavy modules imported")
+    report("python -c pass", args.repeat, ["-c", "pass"])
+    every_tool = ", ".join(module for module, _ in releasenotes.COMMANDS.values())
+    report("import every tool", args.repeat, ["-c", "import " + every_tool])
+    report("releasenotes --help", args.repeat, ["releasenotes.py", "--help"])
+
+    for command, (module, _) in releasenotes.COMMANDS.items():
+        report(module + ".py --help", args.repeat, [module + ".py", "--help"])
+        report("releasenotes " + command + " --help", args.repeat, ["releasenotes.py", command, "--help"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""The implementations of the release note tools as they were before they were optimised,
+ kept so the benchmarks can compare against them
+"""
+
+import dataclasses
+
+def original_gitpython_log(repo_directory, source, destination):
+    """Buffer the whole of git log through GitPython, then split it into lines"""
+    import git
+
+    repo = git.Repo(repo_directory)
+    logs = repo.git.log("--oneline", "--no-merges", "--no-decorate", source + ".." + destination)
+    lines = logs.splitlines()
+    repo.close()
+    return lines
+
+def original_filter_jira_issues(keys, blacklist):
+    """The list based de-duplication and filtering of the original parse_jira_issues_from_git_log"""
+    blacklisted_issues = []
+    jira_issues = []
+
+    for item in keys:
+        jira_issue = True
+
+        for project in blacklist:
+            if item.upper().startswith("UNKNOWN"):
+                jira_issue = False
+                break
+            elif item.upper().startswith(project):
+                if item not in blacklisted_issues:
+                    blacklisted_issues.append(item)
+                jira_issue = False
+                break
+
+        if(jira_issue and item not in jira_issues):
+            jira_issues.append(item)
+
+    return jira_issues
+
+@dataclasses.dataclass
+class OriginalGitCommitMessage:
+    """GitCommitMessage as it was, with a __dict__ per instance"""
+    def __init__(self, sha_hash, jira_id, comment):
+        self.hash = sha_hash
+        self.jira_id = jira_id
+        self.comment = comment
+
+@dataclasses.dataclass
+class OriginalConsolidatedEntry:
+    """ConsolidatedEntry as it was, with a __dict__ per instance"""
+    def __init__(self, jira_id, found_in_jira, found_in_git, jira_comment, issue_type, git_comment, release_note):
+        self.jira_id = jira_id
+        self.found_in_jira = found_in_jira
+        self.found_in_git = found_in_git
+        self.jira_comment = jira_comment
+        self.issue_type = issue_type
+        self.git_comment = git_comment
+        self.release_note = release_note
+
+@dataclasses.dataclass
+class OriginalJiraExportQueryEntry:
+    """JiraExportQueryEntry as it was, with a __dict__ per instance"""
+    def __init__(self, **kwargs):
+        self.issue_type = kwargs.get('Issue Type')
+        self.issue_key = kwargs.get('Issue key')
+        self.issue_id = kwargs.get('Issue id')
+        self.parent = kwargs.get('Parent id')
+        self.summary = kwargs.get('Summary')
+        self.resolution = kwargs.get('Resolution')
+        self.resolved = kwargs.get('Resolved')
+        self.closed_date = kwargs.get('Custom field (Closed Date)')
+        self.id = kwargs.get('Custom field (ID)')
+        self.assignee = kwargs.get('Assignee')
+        self.reporter = kwargs.get('Reporter')
+        self.priority = kwargs.get('Priority')
+        self.created = kwargs.get('Created')
+        self.status = kwargs.get('Status')
+        self.fix_version = kwargs.get('Fix Version/s')
+        self.proposed_release_note = kwargs.get('Custom field (Proposed Release Notes)')
+
+def original_issue_key_to_hyperlink(issue):
+    """The per key prefix checks and string assembly of helpers.issue_key_to_hyperlink, before the tracker registry"""
+    url = ""
+
+    if issue.startswith("UNKNOWN"):
+        return issue
+
+    if issue.startswith(("AZMV", "azmv")):
+        dash_location = issue.find('-')
+
+        if dash_location != -1:
+            url = 'https://dev.azure.com/MobileVideo/VideoManager/_workitems/edit/' + issue[dash_location+1:]
+
+    else:
+        url = "https://jira.mot-solutions.com/browse/" + issue
+
+    return '<a href="' + url + '">' + issue + '</a>'
+
+def original_read_jira_export(jira_export_file):
+    """Read the whole Jira export through csv.DictReader, as release_note_generator.main did"""
+    import csv
+
+    jira_dictionary = {}
+
+    with open(jira_export_file, 'r', encoding="utf-8") as input_csv_file:
+        for row in csv.DictReader(input_csv_file, delimiter="^"):
+            entry = OriginalJiraExportQueryEntry(**row)
+            jira_dictionary[entry.issue_key] = entry
+
+    return jira_dictionary
+
+def original_consolidate(jira_dictionary, git_dictionary):
+    """The two loops of release_note_generator.main that consolidated the jira and git dictionaries, and the
+    review rows written from them (jira_dictionary holds (issue type, summary, proposed release note) tuples)"""
+    from records import ConsolidatedEntry
+
+    consolidated_dictionary = {}
+
+    for item, (issue_type, summary, proposed_release_note) in jira_dictionary.items():
+        entry = ConsolidatedEntry(item, "Yes", "No", summary, issue_type, "", proposed_release_note)
+
+        if item in git_dictionary:
+            entry.found_in_git = "Yes"
+            entry.git_comment = git_dictionary[item]
+
+        consolidated_dictionary[item] = entry
+
+    for item, entry in git_dictionary.items():
+        for commit_messages in entry:
+            new_item = ConsolidatedEntry(item, "No", "Yes", "", "", commit_messages.comment, "")
+
+            if item in jira_dictionary:
+                new_item.found_in_jira = "Yes"
+                new_item.issue_type, new_item.jira_comment, new_item.release_note = jira_dictionary[item]
+
+            consolidated_dictionary[item] = new_item
+
+    rows = []
+    for item, entry in consolidated_dictionary.items():
+        comments = ''
+        for comment in entry.git_comment:
+            comments += comment + '\n'
+        rows.append([item, entry.issue_type, entry.found_in_jira, entry.found_in_git, entry.jira_comment, comments, entry.release_note])
+
+    return rows
@@ -0,0 +1,155 @@
+"""Time every stage of the release note tools on synthetic repos and matching Jira exports, and compare
+ the results against a JSON baseline to flag regressions.
+
+ Each size generates (offline, with git fast-import) a repo of that many commits with a realistic mix of
+ well formed, malformed and missing issue keys, and a '^' delimited Jira export holding most of the keys
+ found in the repo plus some issues that are not in git. Inputs are kept in --workdir, if given, so they are
+ only generated once. Each stage is run --repeat times and the fastest time is kept.
+
+ Usage (from the root of the repo):
+   python -m benchmark.suite [--sizes 1000 10000 100000 1000000] [--save baseline.json] [--baseline baseline.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmark.synthetic_jira_export import create_jira_export
+from benchmark.synthetic_repo import create_repo
+from consolidate import commit_rows, consolidate
+from issue_list_from_git_log import build_default_query
+from jira_snapshot import load_jira_issues
+from parse_git_log import get_git_log, split_commit_message
+from render_to_html import render_engineering_notes, render_to_html
+from trackers import registry
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Stages that take less than this are too quick to time reliably, so are never flagged as regressions
+NOISE_FLOOR = 0.005
+
+def create_inputs(workdir, size):
+    """Create (or reuse) the synthetic repo and matching Jira export for a size, returning their paths"""
+    repo_directory = os.path.join(workdir, "repo-" + str(size))
+    jira_export = os.path.join(workdir, "jira-" + str(size) + ".csv")
+
+    if not os.path.exists(repo_directory):
+        create_repo(repo_directory, size)
+
+    if not os.path.exists(jira_export):
+        git_dictionary, _, _ = get_git_log(workdir, os.path.basename(repo_directory), "start", "end", commit_log=None)
+        keys = registry.default_issues(git_dictionary)
+
+        # Most, but not all, of the issues in git are in the export, along with issues that have no commits
+        keys = [key for number, key in enumerate(keys) if number % 5] + ["JIRA-" + str(number) for number in range(len(keys) // 10)]
+        create_jira_export(jira_export, len(keys), custom_fields=20, keys=keys)
+
+    return repo_directory, jira_export
+
+def fastest(repeat, function, *args):
+    """Run function repeat times, returning (fastest seconds, last result)"""
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    return best, result
+
+def time_stages(workdir, repo_directory, jira_export, repeat):
+    """Time each stage on one size of input, returning a dictionary of stage -> seconds"""
+    timings = {}
+    html = os.path.join(workdir, "notes.html")
+
+    timings["get_git_log"], (git_dictionary, git_log_command, git_log) = fastest(
+        repeat, get_git_log, workdir, os.path.basename(repo_directory), "start", "end", False, "gitpython", None)
+
+    lines = git_log.splitlines()
+    timings["split_commit_message"], _ = fastest(repeat, lambda: [split_commit_message(line) for line in lines])
+
+    # Named after the function the stage used to time, so results stay comparable with older baselines
+    timings["parse_jira_issues_from_git_log"], jql = fastest(repeat, build_default_query, git_dictionary.keys())
+
+    timings["read_jira_export"], jira_issues = fastest(repeat, load_jira_issues, [jira_export])
+
+    commits = list(itertools.chain.from_iterable(git_dictionary.values()))
+    timings["consolidate"], consolidated = fastest(repeat, consolidate, jira_issues, commits)
+
+    rows = list(commit_rows(consolidated))
+    timings["render_engineering_notes"], _ = fastest(repeat, render_engineering_notes, html, "start", "end", commits, git_log_command, git_log, jql)
+
+    # Every issue found in Jira goes into the release notes, with its release note as the text
+    for row in rows:
+        row.release_note = row.release_note or row.git_comment
+    timings["render_to_html"], _ = fastest(repeat, render_to_html, html, "end", "start", rows)
+
+    return timings
+
+def find_regressions(results, baseline, tolerance):
+    """List the stages that are more than tolerance slower than in the baseline"""
+    regressions = []
+
+    for size, timings in results["sizes"].items():
+        for stage, seconds in timings.items():
+            baseline_seconds = baseline["sizes"].get(size, {}).get(stage)
+
+            if baseline_seconds is not None and seconds > NOISE_FLOOR and seconds > baseline_seconds * (1 + tolerance):
+                regressions.append(f"{stage} at {size} commits: {seconds:.3f}s against {baseline_seconds:.3f}s in the baseline")
+
+    return regressions
+
+def run_suite(workdir, sizes, repeat):
+    """Generate the inputs for each size and time every stage on them"""
+    results = {"python": platform.python_version(), "machine": platform.machine(), "repeat": repeat, "sizes": {}}
+
+    for size in sizes:
+        repo_directory, jira_export = create_inputs(workdir, size)
+        timings = time_stages(workdir, repo_directory, jira_export, repeat)
+        results["sizes"][str(size)] = timings
+
+        for stage, seconds in timings.items():
+            print(f"{size:>10} commits  {stage:<32} {seconds:>9.3f}s")
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Numbers of commits in the synthetic repos')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times each stage is run, keeping the fastest')
+    parser.add_argument('--workdir', type=str, help='Directory to keep the generated repos and Jira exports in between runs')
+    parser.add_argument('--save', type=str, help='Write the results to this JSON file, to use as a baseline')
+    parser.add_argument('--baseline', type=str, help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Fraction slower than the baseline a stage can be before it is flagged')
+    args = parser.parse_args()
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run_suite(args.workdir, args.sizes, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run_suite(workdir, args.sizes, args.repeat)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.tolerance)
+
+        for regression in regressions:
+            print("REGRESSION: " + regression)
+
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Generate synthetic '^' delimited Jira exports for benchmarking, with the columns of a real export
+ followed by a number of unused custom fields
+"""
+
+import csv
+import random
+
+EXPORT_COLUMNS = ["Issue Type", "Issue key", "Issue id", "Parent id", "Summary", "Resolution", "Resolved",
+                  "Custom field (Closed Date)", "Custom field (ID)", "Assignee", "Reporter", "Priority", "Created",
+                  "Status", "Fix Version/s", "Custom field (Proposed Release Notes)"]
+
+ISSUE_TYPES = ["Epic", "Story", "Defect", "Support", "Spike", "Sub-task", "Dependency"]
+
+PROJECTS = ["ABC", "DEF", "VMS", "FW"]
+
+def export_row(rng, number, custom_fields, key=None):
+    """One issue of the export, including a multi-line release note for some issues"""
+    key = key or PROJECTS[number % len(PROJECTS)] + "-" + str(number + 1)
+    release_note = "Release note for " + key + ("\nwith a second line" if rng.random() < 0.1 else "")
+    row = [rng.choice(ISSUE_TYPES), key, str(100000 + number), "", "Summary of " + key, "Fixed",
+           "01/Jan/25 10:00 AM", "", "", rng.choice(["alice", "bob", "carol"]), rng.choice(["dave", "erin"]),
+           rng.choice(["P1", "P2", "P3"]), "01/Dec/24 9:00 AM", rng.choice(["Closed", "Resolved", "Done"]),
+           "V500_25.1", release_note]
+    row.extend("Custom value " + str(field) for field in range(custom_fields))
+    return row
+
+def create_jira_export(path, issues, custom_fields=40, seed=1, keys=None):
+    """Write a Jira export of issues rows, with custom_fields unused custom field columns.
+    The issue keys are taken from keys if it is given, e.g. to match the keys of a synthetic repo"""
+    rng = random.Random(seed)
+
+    with open(path, "w", encoding="utf-8", newline="") as export_file:
+        writer = csv.writer(export_file, delimiter="^")
+        writer.writerow(EXPORT_COLUMNS + ["Custom field (Unused " + str(field) + ")" for field in range(custom_fields)])
+        for number in range(issues):
+            writer.writerow(export_row(rng, number, custom_fields, keys[number] if keys else None))
+
+    return path
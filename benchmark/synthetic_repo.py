@@ -0,0 +1,82 @@
+"""Generate synthetic git repositories for benchmarking, using git fast-import so that
+ repos with hundreds of thousands of commits can be created in seconds
+"""
+
+import os
+import random
+import subprocess
+
+# Mix of commit message styles seen in real histories, including the malformed jira ids the parser has to handle
+MESSAGE_STYLES = [
+    "{key} {summary}",
+    "{key} {summary}",
+    "{key} {summary}",
+    "{key}: {summary}",
+    "{key} - {summary}",
+    "{malformed_key} {summary}",
+    "{summary} ({key})",
+    "{summary}",
+]
+
+PROJECTS = ["ABC", "DEF", "VMS", "FW", "AZMV"]
+
+SUMMARIES = ["Fix crash on startup", "Add support for new dock", "Update translations",
+             "Refactor upload queue", "Improve battery reporting", "Tidy up logging"]
+
+def commit_message(rng):
+    """A random commit subject in one of the MESSAGE_STYLES"""
+    project = rng.choice(PROJECTS)
+    number = rng.randint(1, 20000)
+    return rng.choice(MESSAGE_STYLES).format(key=project + "-" + str(number),
+                                             malformed_key=project + ":" + str(number),
+                                             summary=rng.choice(SUMMARIES))
+
+def create_repo(path, commit_count, tag_every=1000, merge_every=0, seed=1, branch_age=0):
+    """Create a git repo at path with a linear history of commit_count empty commits (plus a merge
+    every merge_every commits), tagged 'tag-<n>' every tag_every commits and 'start' / 'end' at either end.
+    Each merged side branch starts branch_age commits before the merge, so long lived branches can be
+    merged across several tags"""
+
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(["git", "init", "-q", path], check=True)
+
+    process = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    stream = process.stdin
+    timestamp = 1600000000
+
+    def write_commit(mark, message, parents, ref="refs/heads/master"):
+        data = message.encode("utf-8")
+        stream.write(b"commit %s\nmark :%d\ncommitter Bench <bench@example.com> %d +0000\ndata %d\n%s\n"
+                     % (ref.encode(), mark, timestamp + mark, len(data), data))
+        if parents:
+            stream.write(b"from :%d\n" % parents[0])
+        for parent in parents[1:]:
+            stream.write(b"merge :%d\n" % parent)
+        stream.write(b"\n")
+
+    write_commit(1, "Initial commit", [])
+    stream.write(b"reset refs/tags/start\nfrom :1\n\n")
+
+    mark = 1
+    for number in range(1, commit_count + 1):
+        mark += 1
+
+        if merge_every and number % merge_every == 0:
+            # A side branch commit and the merge that brings it back in
+            write_commit(mark, commit_message(rng), [max(mark - 1 - branch_age, 1)], "refs/heads/side")
+            mark += 1
+            write_commit(mark, "Merge branch 'side'", [mark - 2, mark - 1])
+        else:
+            write_commit(mark, commit_message(rng), [mark - 1])
+
+        if number % tag_every == 0:
+            stream.write(b"reset refs/tags/tag-%d\nfrom :%d\n\n" % (number, mark))
+
+    stream.write(b"reset refs/tags/end\nfrom :%d\n\n" % mark)
+    stream.close()
+
+    if process.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+
+    return path
@@ -0,0 +1,37 @@
+"""Persistent cache of parsed git commits, keyed by the full sha of the commit.
+
+ The cache is a SQLite database kept in the .git directory of the repo being searched, so that
+ consecutive runs over overlapping ranges only need to parse the commits they have not seen before
+"""
+
+import os
+
+from sqlite_store import SQLiteStore
+
+def cache_path(repo):
+    """Location of the commit cache for a GitPython repo"""
+    return os.path.join(repo.git_dir, 'release_notes', 'commit_cache.sqlite')
+
+class CommitCache(SQLiteStore):
+    """Class to store the parsed fields of git commits by sha.
+
+    The cache is stamped with a version number. Opening it with a different version (i.e. after the
+    parser has changed) discards every stale entry.
+    """
+    TABLES = ("commits",)
+    SCHEMA = ("""CREATE TABLE IF NOT EXISTS commits (
+                     sha TEXT PRIMARY KEY,
+                     line TEXT,
+                     hash TEXT,
+                     jira_id TEXT,
+                     comment TEXT)""",)
+
+    def lookup(self, shas):
+        """Return a dictionary of sha -> (line, hash, jira_id, comment) for the shas found in the cache"""
+        rows = self.select_in("SELECT sha, line, hash, jira_id, comment FROM commits WHERE sha IN ({})", shas)
+        return {sha: (line, sha_hash, jira_id, comment) for sha, line, sha_hash, jira_id, comment in rows}
+
+    def store(self, records):
+        """Store an iterable of (sha, line, hash, jira_id, comment) records"""
+        self.connection.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?)", records)
+        self.connection.commit()
@@ -0,0 +1,558 @@
+"""Backends that provide the commits in a range of a git repo.
+
+ Every backend produces the same entries as: git log --no-merges --format="%H %h %s" <source>..<destination>
+ i.e. a tuple of (full sha, "<abbreviated sha> <subject>") for each commit, newest first. iter_graph also
+ gives the merges and the parents of each commit, as (full sha, parent shas, line), for callers that need
+ the shape of the history and not just the commits in it.
+
+ gitpython - runs git log through GitPython (the original behaviour)
+ pipe      - streams git rev-list and reads commits through a long lived git cat-file --batch-command process (git 2.36+)
+ odb       - walks the history by reading commits straight from the packfiles and loose objects
+"""
+
+import heapq
+import itertools
+import os
+import re
+import subprocess
+
+# The format of each entry, as a git log option
+LOG_FORMAT = "--format=%H %h %s"
+
+# The format of each entry of iter_graph: the sha and parents, then the entry, separated by a NUL
+GRAPH_FORMAT = "--format=%H %P%x00%h %s"
+
+# The format of each tag listed by git for-each-ref: the tag's object and type, and (for an annotated tag) what it points at
+TAG_REF_FORMAT = "--format=%(objectname) %(objecttype) %(*objectname) %(*objecttype) %(refname:strip=2)"
+
+# Number of commits requested from git cat-file at a time. Small enough that two batches of names
+# always fit in the pipe buffer, so writing a batch can never block on cat-file's output
+CAT_FILE_BATCH_SIZE = 256
+
+# A revision with optional ~<n> and ^<n> suffixes e.g. v1.2~3
+REVISION_PATTERN = re.compile(r"^(.*?)((?:[~^][0-9]*)*)$")
+REVISION_SUFFIX_PATTERN = re.compile(r"([~^])([0-9]*)")
+
+class CommitSourceError(Exception):
+    """Raised when a backend cannot read the history of a repo"""
+
+def commit_subject(message):
+    """The subject of a commit message, as git log's %s: the first paragraph joined onto one line"""
+    subject = []
+
+    for line in message.decode("utf-8", errors="replace").split("\n"):
+        line = line.rstrip()
+        if line:
+            subject.append(line)
+        elif subject:
+            break
+
+    return " ".join(subject)
+
+def revision_range(source, destination):
+    """The git revision range source..destination, or all of destination's history if source is None"""
+    return destination if source is None else source + ".." + destination
+
+def parse_tag_refs(output):
+    """Parse git for-each-ref output in the TAG_REF_FORMAT into a dictionary of tag name -> commit sha.
+    Tags of anything other than a commit are left out"""
+    tags = {}
+
+    for entry in output.splitlines():
+        sha, object_type, target_sha, target_type, name = entry.split(" ", 4)
+        if object_type == "commit":
+            tags[name] = sha
+        elif target_type == "commit":
+            tags[name] = target_sha
+
+    return tags
+
+def parse_commit(data):
+    """Split a raw commit object into (committer timestamp, parent shas, message)"""
+    header_end = data.find(b"\n\n")
+    headers = data[:header_end] if header_end != -1 else data
+    message = data[header_end + 2:] if header_end != -1 else b""
+
+    parents = []
+    timestamp = 0
+
+    for header in headers.split(b"\n"):
+        if header.startswith(b"parent "):
+            parents.append(header[7:].decode("ascii"))
+        elif header.startswith(b"committer "):
+            timestamp = int(header.rsplit(b" ", 2)[1])
+
+    return timestamp, tuple(parents), message
+
+class GitPythonCommitSource:
+    """Commit source that runs git through GitPython"""
+    def __init__(self, repo_directory):
+        import git
+
+        self.repo = git.Repo(repo_directory)
+        self.git_dir = self.repo.git_dir
+
+    def resolve(self, reference):
+        """The full sha of the commit a reference points at"""
+        return self.repo.git.rev_parse(reference + "^{commit}")
+
+    def resolve_many(self, references):
+        """The full shas of the commits a list of references point at, resolved by a single git command"""
+        return self.repo.git.rev_parse(*(reference + "^{commit}" for reference in references)).split()
+
+    def tags(self):
+        """A dictionary of tag name -> sha of the commit it points at, for every tag of a commit"""
+        return parse_tag_refs(self.repo.git.for_each_ref(TAG_REF_FORMAT, "refs/tags"))
+
+    def is_ancestor(self, ancestor, descendant):
+        """True if ancestor is an ancestor of (or the same commit as) descendant"""
+        return self.repo.is_ancestor(ancestor, descendant)
+
+    def iter_log(self, source, destination):
+        """Yield (sha, line) for each commit in source..destination, newest first, read from a pipe"""
+        process = self.repo.git.log("--no-merges", LOG_FORMAT, source + ".." + destination, as_process=True)
+
+        for raw_line in process.stdout:
+            sha, line = raw_line.decode("utf-8", errors="replace").rstrip("\n").split(" ", 1)
+            yield sha, line
+
+        # Raises a GitCommandError if git failed (e.g. an unknown tag)
+        process.wait()
+
+    def iter_graph(self, source, destination):
+        """Yield (sha, parent shas, line) for each commit in source..destination (or all of destination's history
+        if source is None), merges included, newest first"""
+        process = self.repo.git.log(GRAPH_FORMAT, revision_range(source, destination), as_process=True)
+
+        for raw_line in process.stdout:
+            shas, line = raw_line.decode("utf-8", errors="replace").rstrip("\n").split("\0", 1)
+            sha, *parents = shas.split()
+            yield sha, tuple(parents), line
+
+        process.wait()
+
+    def read_lines(self, shas):
+        """Return a dictionary of sha -> line for a list of commits"""
+        lines = {}
+        for entry in self.repo.git.log("--no-walk=unsorted", LOG_FORMAT, *shas).splitlines():
+            sha, line = entry.split(" ", 1)
+            lines[sha] = line
+        return lines
+
+    def close(self):
+        """Release the repo"""
+        self.repo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class GitPipeCommitSource:
+    """Commit source that streams git rev-list, reading the commits through a long lived git cat-file --batch-command"""
+    def __init__(self, repo_directory):
+        self.repo_directory = repo_directory
+        self.git_dir = self.run_git("rev-parse", "--absolute-git-dir").strip()
+        self.cat_file = None
+
+    def run_git(self, *args):
+        """Run a git command to completion, returning its output"""
+        result = subprocess.run(["git", *args], cwd=self.repo_directory, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommitSourceError(result.stderr.strip())
+        return result.stdout
+
+    def resolve(self, reference):
+        """The full sha of the commit a reference points at"""
+        return self.run_git("rev-parse", "--verify", "--end-of-options", reference + "^{commit}").strip()
+
+    def resolve_many(self, references):
+        """The full shas of the commits a list of references point at, resolved by a single git command"""
+        return self.run_git("rev-parse", *(reference + "^{commit}" for reference in references)).split()
+
+    def tags(self):
+        """A dictionary of tag name -> sha of the commit it points at, for every tag of a commit"""
+        return parse_tag_refs(self.run_git("for-each-ref", TAG_REF_FORMAT, "refs/tags"))
+
+    def is_ancestor(self, ancestor, descendant):
+        """True if ancestor is an ancestor of (or the same commit as) descendant"""
+        result = subprocess.run(["git", "merge-base", "--is-ancestor", ancestor, descendant],
+                                cwd=self.repo_directory, capture_output=True, text=True)
+        if result.returncode > 1:
+            raise CommitSourceError(result.stderr.strip())
+        return result.returncode == 0
+
+    def request_commits(self, names):
+        """Ask git cat-file for a batch of commits (abbreviated or full shas)"""
+        if self.cat_file is None:
+            self.cat_file = subprocess.Popen(["git", "cat-file", "--batch-command", "--buffer"], cwd=self.repo_directory,
+                                             stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        # Buffered, so cat-file writes the whole batch at once when it is told to flush
+        self.cat_file.stdin.write(b"".join(b"contents " + name + b"\n" for name in names) + b"flush\n")
+        self.cat_file.stdin.flush()
+
+    def receive_commits(self, names):
+        """Read the reply to request_commits, returning a list of (sha, raw commit)"""
+        commits = []
+        for name in names:
+            header = self.cat_file.stdout.readline().split()
+            if len(header) != 3:
+                raise CommitSourceError("Unable to read commit " + name.decode("ascii"))
+            data = self.cat_file.stdout.read(int(header[2]) + 1)[:-1]
+            commits.append((header[0].decode("ascii"), data))
+
+        return commits
+
+    def graph_entries(self, names):
+        """Receive a batch of commits named by their abbreviated shas, as (sha, parent shas, line) entries"""
+        entries = []
+        for abbreviation, (sha, data) in zip(names, self.receive_commits(names)):
+            _, parents, message = parse_commit(data)
+            entries.append((sha, parents, abbreviation.decode("ascii") + " " + commit_subject(message)))
+        return entries
+
+    def iter_log(self, source, destination):
+        """Yield (sha, line) for each commit in source..destination, newest first"""
+        for sha, _, line in self.iter_rev_list("--no-merges", source + ".." + destination):
+            yield sha, line
+
+    def iter_graph(self, source, destination):
+        """Yield (sha, parent shas, line) for each commit in source..destination (or all of destination's history
+        if source is None), merges included, newest first"""
+        return self.iter_rev_list(revision_range(source, destination))
+
+    def iter_rev_list(self, *args):
+        """Yield (sha, parent shas, line) for each commit git rev-list lists with args"""
+        process = subprocess.Popen(["git", "rev-list", "--abbrev-commit", *args],
+                                   cwd=self.repo_directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        batch = []
+        pending = []
+
+        for name in itertools.chain(process.stdout, [None]):
+            if name is not None:
+                batch.append(name.strip())
+
+            # Request each batch before receiving the previous one, so cat-file is never left idle
+            if batch and (name is None or len(batch) == CAT_FILE_BATCH_SIZE):
+                self.request_commits(batch)
+                yield from self.graph_entries(pending)
+                pending = batch
+                batch = []
+
+        yield from self.graph_entries(pending)
+
+        if process.wait() != 0:
+            raise CommitSourceError(process.stderr.read().decode("utf-8", errors="replace").strip())
+
+    def read_lines(self, shas):
+        """Return a dictionary of sha -> line for a list of commits"""
+        lines = {}
+        for entry in self.run_git("log", "--no-walk=unsorted", LOG_FORMAT, *shas).splitlines():
+            sha, line = entry.split(" ", 1)
+            lines[sha] = line
+        return lines
+
+    def close(self):
+        """Stop the git cat-file process"""
+        if self.cat_file is not None:
+            self.cat_file.stdin.close()
+            self.cat_file.wait()
+            self.cat_file.stdout.close()
+            self.cat_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ObjectDatabaseCommitSource:
+    """Commit source that walks the history by reading the repo's object database directly, without running git"""
+    def __init__(self, repo_directory):
+        from git_object_database import ObjectDatabase
+
+        self.git_dir = find_git_dir(repo_directory)
+
+        # Linked worktrees keep their objects and refs in the common directory of the main repo
+        self.common_dir = self.git_dir
+        commondir_file = os.path.join(self.git_dir, "commondir")
+        if os.path.exists(commondir_file):
+            with open(commondir_file, "r", encoding="utf-8") as commondir:
+                self.common_dir = os.path.normpath(os.path.join(self.git_dir, commondir.read().strip()))
+
+        self.objects = ObjectDatabase(os.path.join(self.common_dir, "objects"))
+        self.abbreviation = self.objects.default_abbreviation()
+        self.packed_refs = None
+
+        # sha -> (committer timestamp, parents) for every commit read so far
+        self.commits = {}
+
+    def read_commit(self, sha):
+        """Read a commit, returning (committer timestamp, parents, message)"""
+        type_name, data = self.objects.read(sha)
+        if type_name != "commit":
+            raise CommitSourceError(sha + " is a " + type_name + ", not a commit")
+
+        timestamp, parents, message = parse_commit(data)
+        self.commits[sha] = (timestamp, parents)
+
+        return timestamp, parents, message
+
+    def commit_info(self, sha):
+        """(committer timestamp, parents) of a commit"""
+        if sha not in self.commits:
+            self.read_commit(sha)
+        return self.commits[sha]
+
+    def read_ref(self, name):
+        """The sha a ref points at (following symbolic refs), or None if there is no such ref"""
+        for directory in (self.git_dir, self.common_dir):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8") as ref_file:
+                    content = ref_file.read().strip()
+                if content.startswith("ref: "):
+                    return self.read_ref(content[5:])
+                return content
+
+        return self.read_packed_refs().get(name)
+
+    def read_packed_refs(self):
+        """A dictionary of ref name -> sha of the refs in the packed-refs file, read once"""
+        if self.packed_refs is None:
+            self.packed_refs = {}
+            packed_refs_path = os.path.join(self.common_dir, "packed-refs")
+            if os.path.exists(packed_refs_path):
+                with open(packed_refs_path, "r", encoding="utf-8") as packed_refs_file:
+                    for line in packed_refs_file:
+                        if line[0] not in "#^":
+                            sha, ref_name = line.split()
+                            self.packed_refs[ref_name] = sha
+
+        return self.packed_refs
+
+    def tags(self):
+        """A dictionary of tag name -> sha of the commit it points at, for every tag of a commit"""
+        names = [name[len("refs/tags/"):] for name in self.read_packed_refs() if name.startswith("refs/tags/")]
+
+        # Loose refs, which override packed refs of the same name
+        tags_directory = os.path.join(self.common_dir, "refs", "tags")
+        for directory, _, files in os.walk(tags_directory):
+            names.extend(os.path.relpath(os.path.join(directory, file), tags_directory).replace(os.sep, "/") for file in files)
+
+        tags = {}
+        for name in sorted(set(names)):
+            try:
+                tags[name] = self.peel(self.read_ref("refs/tags/" + name))
+            except CommitSourceError:
+                pass
+
+        return tags
+
+    def peel(self, sha):
+        """Follow annotated tags down to the commit they point at"""
+        type_name, data = self.objects.read(sha)
+
+        while type_name == "tag":
+            sha = data[7:data.index(b"\n")].decode("ascii")
+            type_name, data = self.objects.read(sha)
+
+        if type_name != "commit":
+            raise CommitSourceError(sha + " is a " + type_name + ", not a commit")
+
+        return sha
+
+    def resolve(self, reference):
+        """The full sha of the commit a reference points at.
+        Supports ref names, full and abbreviated shas, and ~<n> / ^<n> suffixes"""
+        name, suffixes = REVISION_PATTERN.match(reference).groups()
+
+        sha = None
+        for candidate in (name, "refs/" + name, "refs/tags/" + name, "refs/heads/" + name,
+                          "refs/remotes/" + name, "refs/remotes/" + name + "/HEAD"):
+            sha = self.read_ref(candidate)
+            if sha is not None:
+                break
+
+        if sha is None and re.fullmatch(r"[0-9a-fA-F]{4,40}", name):
+            try:
+                sha = self.objects.complete(name)
+            except Exception as error:
+                raise CommitSourceError(str(error)) from error
+
+        if sha is None:
+            raise CommitSourceError("Unknown revision: " + reference)
+
+        try:
+            sha = self.peel(sha)
+
+            for operator, number in REVISION_SUFFIX_PATTERN.findall(suffixes):
+                count = int(number) if number else 1
+                if operator == "~":
+                    for _ in range(count):
+                        sha = self.commit_info(sha)[1][0]
+                elif count:
+                    sha = self.commit_info(sha)[1][count - 1]
+        except IndexError as error:
+            raise CommitSourceError("Unknown revision: " + reference) from error
+
+        return sha
+
+    def resolve_many(self, references):
+        """The full shas of the commits a list of references point at"""
+        return [self.resolve(reference) for reference in references]
+
+    def is_ancestor(self, ancestor, descendant):
+        """True if ancestor is an ancestor of (or the same commit as) descendant.
+        Commits older than the ancestor are not searched, so this relies on commit dates being in order"""
+        ancestor_timestamp = self.commit_info(ancestor)[0]
+        queue = [(-self.commit_info(descendant)[0], descendant)]
+        seen = {descendant}
+
+        while queue:
+            _, sha = heapq.heappop(queue)
+            if sha == ancestor:
+                return True
+
+            for parent in self.commit_info(sha)[1]:
+                parent_timestamp = self.commit_info(parent)[0]
+                if parent not in seen and parent_timestamp >= ancestor_timestamp:
+                    seen.add(parent)
+                    heapq.heappush(queue, (-parent_timestamp, parent))
+
+        return False
+
+    def line(self, sha, message):
+        """The --oneline entry for a commit"""
+        return self.objects.abbreviate(sha, self.abbreviation) + " " + commit_subject(message)
+
+    def iter_log(self, source, destination):
+        """Yield (sha, line) for each commit in source..destination, newest first"""
+        for sha, parents, message in self.walk(source, destination):
+            if len(parents) <= 1:
+                yield sha, self.line(sha, message)
+
+    def iter_graph(self, source, destination):
+        """Yield (sha, parent shas, line) for each commit in source..destination (or all of destination's history
+        if source is None), merges included, newest first"""
+        for sha, parents, message in self.walk(source, destination):
+            yield sha, parents, self.line(sha, message)
+
+    def walk(self, source, destination):
+        """Yield (sha, parent shas, raw message) for each commit in source..destination, newest first.
+
+        Like git, commits are visited newest first (by committer date) from both ends of the range.
+        Commits reachable from the source are uninteresting, and the walk stops once only uninteresting
+        commits are left to visit.
+        """
+        uninteresting = set()
+        queued = set()
+        seen = set()
+        queue = []
+        order = itertools.count()
+        interesting_queued = 0
+        candidates = []
+
+        # Messages of the queued commits, so each commit is only read once
+        messages = {}
+
+        def push(sha):
+            nonlocal interesting_queued
+            if sha in seen:
+                return
+            seen.add(sha)
+            queued.add(sha)
+            timestamp, _, messages[sha] = self.read_commit(sha)
+            heapq.heappush(queue, (-timestamp, next(order), sha))
+            if sha not in uninteresting:
+                interesting_queued += 1
+
+        def mark_uninteresting(sha):
+            nonlocal interesting_queued
+            stack = [sha]
+            while stack:
+                sha = stack.pop()
+                if sha in uninteresting:
+                    continue
+                uninteresting.add(sha)
+                if sha in queued:
+                    interesting_queued -= 1
+                elif sha in seen:
+                    # Already visited, so everything it reached is uninteresting too
+                    stack.extend(self.commits[sha][1])
+
+        if source is not None:
+            uninteresting.add(self.resolve(source))
+            push(self.resolve(source))
+        push(self.resolve(destination))
+
+        while queue and interesting_queued:
+            _, _, sha = heapq.heappop(queue)
+            queued.discard(sha)
+            message = messages.pop(sha)
+            parents = self.commits[sha][1]
+
+            if sha in uninteresting:
+                for parent in parents:
+                    mark_uninteresting(parent)
+                    push(parent)
+            else:
+                interesting_queued -= 1
+                candidates.append((sha, parents, message))
+                for parent in parents:
+                    push(parent)
+
+        for sha, parents, message in candidates:
+            if sha not in uninteresting:
+                yield sha, parents, message
+
+    def read_lines(self, shas):
+        """Return a dictionary of sha -> line for a list of commits"""
+        return {sha: self.line(sha, self.read_commit(sha)[2]) for sha in shas}
+
+    def close(self):
+        """Release the object database"""
+        self.objects.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def find_git_dir(repo_directory):
+    """The git directory of a work tree (or bare repo) without running git"""
+    dot_git = os.path.join(repo_directory, ".git")
+
+    if os.path.isdir(dot_git):
+        return os.path.abspath(dot_git)
+
+    # A linked worktree or submodule, where .git is a file pointing at the git directory
+    if os.path.isfile(dot_git):
+        with open(dot_git, "r", encoding="utf-8") as dot_git_file:
+            content = dot_git_file.read().strip()
+        if content.startswith("gitdir: "):
+            return os.path.normpath(os.path.join(repo_directory, content[8:]))
+
+    if os.path.isdir(os.path.join(repo_directory, "objects")) and os.path.exists(os.path.join(repo_directory, "HEAD")):
+        return os.path.abspath(repo_directory)
+
+    raise CommitSourceError("Not a git repository: " + repo_directory)
+
+# Backends that can be selected by name
+COMMIT_SOURCES = {
+    "gitpython": GitPythonCommitSource,
+    "pipe": GitPipeCommitSource,
+    "odb": ObjectDatabaseCommitSource,
+}
+
+DEFAULT_COMMIT_SOURCE = "gitpython"
+
+def open_commit_source(repo_directory, backend=DEFAULT_COMMIT_SOURCE):
+    """Open a repo with the named commit source backend"""
+    if backend not in COMMIT_SOURCES:
+        raise CommitSourceError("Unknown commit source: " + backend)
+
+    return COMMIT_SOURCES[backend](repo_directory)
@@ -0,0 +1,62 @@
+"""Consolidate the issues exported from Jira with the commits found in git.
+
+ This is a full outer hash join on the issue key: the commits are gathered by key in one pass over the
+ git log, then each Jira issue, already hashed by key, probes them once. The rows for the review CSV and
+ the rows rendered to html are both produced from the result
+"""
+
+from records import ConsolidatedEntry
+
+REVIEW_HEADER = ['JiraId', 'IssueType', 'InJira', 'InGit', 'Jira Comment', 'Git comment', 'ProposedReleaseNote']
+
+def group_commits(commits):
+    """Gather the comments of an iterable of GitCommitMessage into a dictionary of issue key -> list of comments,
+    so the commits can be read before the Jira issues are available to join them with"""
+    commit_groups = {}
+
+    for commit in commits:
+        comments = commit_groups.get(commit.jira_id)
+
+        if comments is None:
+            commit_groups[commit.jira_id] = [commit.comment]
+        else:
+            comments.append(commit.comment)
+
+    return commit_groups
+
+def join_grouped(jira_issues, commit_groups):
+    """Join a dictionary of issue key -> (issue type, summary, proposed release note) with the commits gathered by group_commits.
+
+    Returns a dictionary of issue key -> ConsolidatedEntry, whose git_comment is the list of the comments of every
+    commit for that key. The Jira issues come first in their own order, followed by the keys only found in git,
+    in the order they were first seen.
+    """
+    consolidated = {}
+
+    for issue_key, (issue_type, summary, proposed_release_note) in jira_issues.items():
+        comments = commit_groups.get(issue_key)
+        consolidated[issue_key] = ConsolidatedEntry(issue_key, "Yes", "No" if comments is None else "Yes", summary, issue_type,
+                                                    [] if comments is None else comments, proposed_release_note)
+
+    for issue_key, comments in commit_groups.items():
+        if issue_key not in consolidated:
+            consolidated[issue_key] = ConsolidatedEntry(issue_key, "No", "Yes", "", "", comments, "")
+
+    return consolidated
+
+def consolidate(jira_issues, commits):
+    """join_grouped() for an iterable of GitCommitMessage"""
+    return join_grouped(jira_issues, group_commits(commits))
+
+def review_rows(consolidated):
+    """Yield a row of the review CSV (see REVIEW_HEADER) for each consolidated entry, with one line per commit comment"""
+    for issue_key, entry in consolidated.items():
+        comments = "".join(comment + "\n" for comment in entry.git_comment)
+        yield [issue_key, entry.issue_type, entry.found_in_jira, entry.found_in_git, entry.jira_comment, comments, entry.release_note]
+
+def commit_rows(consolidated):
+    """Yield a ConsolidatedEntry per commit, to render each commit as a unique entry in the html table"""
+    for issue_key, entry in consolidated.items():
+        for comment in entry.git_comment:
+            yield ConsolidatedEntry(issue_key, entry.found_in_jira, entry.found_in_git, entry.jira_comment,
+                                    entry.issue_type, comment, entry.release_note)
@@ -1,68 +1,147 @@
 """Engineering Release Note Generator - pretty prints the content of a git log to html"""
 
 import argparse
-import dataclasses
-
-from render_to_html import render_engineering_notes
-from parse_git_log import get_git_log
-from issue_list_from_git_log import parse_jira_issues_from_git_log
-
-@dataclasses.dataclass
-class ConsolidatedEntry:
-    """Class to encapsulate git and jira data"""
-    def __init__(self, jira_id, found_in_jira, found_in_git, jira_comment, issue_type, git_comment, release_note):
-        self.jira_id = jira_id
-        self.found_in_jira = found_in_jira
-        self.found_in_git = found_in_git
-        self.jira_comment = jira_comment
-        self.issue_type = issue_type
-        self.git_comment = git_comment
-        self.release_note = release_note
-
-    def __str__(self):
-        return self.found_in_jira + " " + self.found_in_git + " " + self.jira_comment + " " + self.issue_type + " " + self.git_comment + " " + self.release_note
-
-def main():
-    """Pretty print the content of a git log to html"""
+import itertools
+import os
+
+from render_to_html import render_engineering_notes, render_engineering_notes_streaming
+from render_paged_html import render_engineering_notes_paged, render_engineering_notes_paged_streaming, PAGE_SIZE
+from parse_git_log import get_git_log, iter_git_log, build_git_log_command, add_git_range_arguments
+from issue_list_from_git_log import build_default_query
+from multi_repo import load_manifest, get_git_logs, describe_versions
+from release_train import get_release_train
+from instrumentation import add_profile_arguments, profile_session, metrics
+from trackers import add_tracker_arguments, configure_trackers
+
+def main(argv=None, prog=None):
+    """Pretty print the content of a git log to html, taking the command line from argv (default: sys.argv[1:])"""
     #
     #Parse the command line arguments
     #
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-l','--repo_loc', type=str, help='Location of a git repo to search history in', required=True)
-    parser.add_argument('-r','--repo', type=str, help='The name of the git repo in which to search the history', required=True)
-    parser.add_argument('-s','--source', type=str, help='Git tag of starting range to search in git', required=True)
-    parser.add_argument('-d','--dest', type=str, help='Git tag of destination to search in git', required=True)
+    parser = argparse.ArgumentParser(prog=prog)
+    # The repo and range can come from --manifest or --train instead
+    add_git_range_arguments(parser, required=False)
+    parser.add_argument('-m','--manifest', type=str, help='CSV file of repo_loc,repo,source,dest ranges to render in one report, instead of -l/-r/-s/-d')
+    parser.add_argument('-j','--jobs', type=int, help='Number of repos from the manifest to process in parallel (default: one per CPU)')
     parser.add_argument('-o','--output', type=str, help='HTML to render output to', required=True)
+    parser.add_argument('--train', type=str, nargs='+', help='Ordered list of tags in a release train. Renders notes for each consecutive pair of tags, from a single walk of the history, instead of -s/-d')
+    parser.add_argument('--roll_up', action='store_true', help='With --train, also render the notes for the whole train, from its first to its last tag')
+    parser.add_argument('-t','--stream', action='store_true', help='Render each commit as it is read (in git log order, not grouped by issue) so memory use does not grow with the range')
+    parser.add_argument('--paged', action='store_true', help='Render a small index page, with the issues and git log in chunks beside it (in <output>_files) that are loaded as they are scrolled to, so very large notes open instantly')
+    parser.add_argument('--page_size', type=int, default=PAGE_SIZE, help='With --paged, the number of issues or git log lines in each chunk')
+    add_tracker_arguments(parser)
+    add_profile_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     arguments = vars(args)
+    configure_trackers(arguments)
 
     source = arguments['source']
     destination = arguments['dest']
     repo_location = arguments['repo_loc']
     repo = arguments['repo']
     output = arguments['output']
+    commit_log = None if arguments['no_commit_log'] else arguments['commit_log']
+    page_size = arguments['page_size'] if arguments['paged'] else None
+
+    if arguments['stream'] and (arguments['manifest'] or None in (source, destination, repo_location, repo)):
+        parser.error('--stream needs all of --repo_loc, --repo, --source and --dest, and cannot be used with --manifest')
+
+    if arguments['page_size'] < 1:
+        parser.error('--page_size must be at least 1')
+
+    if arguments['train'] and (arguments['manifest'] or arguments['stream'] or arguments['cache'] or len(arguments['train']) < 2 or None in (repo_location, repo)):
+        parser.error('--train needs at least two tags and both --repo_loc and --repo, and cannot be used with --manifest, --stream or --cache')
+
+    if arguments['train']:
+        with profile_session(arguments) as metrics:
+            #Walk the history of the whole train once, splitting it into the range between each pair of tags
+            with metrics.stage("git log"):
+                try:
+                    train = get_release_train(repo_location, repo, arguments['train'], backend=arguments['backend'], commit_log=commit_log,
+                                              background_writes=arguments['background_writes'], roll_up=arguments['roll_up'])
+                except ValueError as error:
+                    parser.error(str(error))
+
+            pairs = len(arguments['train']) - 1
+            for number, (source, destination, git_dictionary, git_log_command, git_log) in enumerate(train):
+                # Each pair is rendered next to the output, and the roll-up (which comes last) to the output itself
+                range_output = train_output(output, source, destination) if number < pairs else output
+                render_range(range_output, source, destination, git_dictionary, git_log_command, git_log, page_size)
+
+                if metrics.enabled and number < pairs:
+                    metrics.count_commits(git_dictionary)
+                    metrics.count_bytes_written(range_output)
+
+            metrics.count_bytes_written(output if arguments['roll_up'] else None, commit_log)
+        return
 
-    #Fetch the content of a parsed git log
-    git_dictionary, git_log_command, git_log = get_git_log(repo_location, repo, source, destination)
+    if not arguments['manifest'] and None in (source, destination, repo_location, repo):
+        parser.error('either --manifest or all of --repo_loc, --repo, --source and --dest are required')
 
-    commits = []
+    # The repos of a manifest are already parsed in parallel, a process each
+    if arguments['manifest'] and arguments['parse_jobs'] > 1:
+        parser.error('--parse_jobs cannot be used with --manifest, whose repos are each parsed in a process of their own (see --jobs)')
+
+    with profile_session(arguments) as metrics:
+
+        if arguments['stream']:
+            #Render each commit straight from the git log, without collecting them first
+            with metrics.stage("stream engineering notes"):
+                log_entries = iter_git_log(repo_location, repo, source, destination, use_cache=arguments['cache'], backend=arguments['backend'],
+                                           commit_log=commit_log, background_writes=arguments['background_writes'], parse_jobs=arguments['parse_jobs'])
+                if page_size:
+                    render_engineering_notes_paged_streaming(output, source, destination, log_entries, build_git_log_command(source, destination),
+                                                             build_default_query, page_size)
+                else:
+                    render_engineering_notes_streaming(output, source, destination, log_entries, build_git_log_command(source, destination),
+                                                       build_default_query)
+
+            metrics.count_bytes_written(output, commit_log)
+            return
+
+        with metrics.stage("git log"):
+            if arguments['manifest']:
+                #Fetch and merge the parsed git logs of every repo in the manifest, in parallel
+                repo_ranges = load_manifest(arguments['manifest'])
+                source = describe_versions(repo_range.source for repo_range in repo_ranges)
+                destination = describe_versions(repo_range.dest for repo_range in repo_ranges)
+                git_dictionary, git_log_command, git_log = get_git_logs(repo_ranges, use_cache=arguments['cache'], backend=arguments['backend'], jobs=arguments['jobs'],
+                                                                        commit_log=commit_log, background_writes=arguments['background_writes'])
+            else:
+                #Fetch the content of a parsed git log
+                git_dictionary, git_log_command, git_log = get_git_log(repo_location, repo, source, destination, use_cache=arguments['cache'], backend=arguments['backend'],
+                                                                       commit_log=commit_log, background_writes=arguments['background_writes'], parse_jobs=arguments['parse_jobs'])
+
+        render_range(output, source, destination, git_dictionary, git_log_command, git_log, page_size)
+
+        if metrics.enabled:
+            metrics.count_commits(git_dictionary)
+            metrics.count_bytes_written(output, commit_log)
+
+def render_range(output, source, destination, git_dictionary, git_log_command, git_log, page_size=None):
+    """Render the engineering notes for the parsed git log of a range, to a single file or (given a page_size) paged"""
 
     #
-    # Find all the issues that are in Git
+    # Find all the issues that are in Git, adding each commit found by the key as a unique entry in the html table.
+    # There is no Jira data to join with, so the commits are rendered straight from the dictionary, grouped by key
     #
-    for item, dict_entry in git_dictionary.items():
+    commits = itertools.chain.from_iterable(git_dictionary.values())
 
-        #Add each commit entry found by the key as a unique entry in the html table
-        for commit_messages in dict_entry:
-            entry = ConsolidatedEntry(item, "No", "Yes", "", "", commit_messages.comment, "")
-            commits.append(entry)
-
-    blacklist = ['AZMV', 'AMZV']
-    jql = parse_jira_issues_from_git_log(git_dictionary.keys(), blacklist)
+    with metrics.stage("build jql"):
+        jql = build_default_query(git_dictionary.keys())
 
     # Render the content to a HTML file
-    render_engineering_notes(output, source, destination, commits, git_log_command, git_log, jql)
+    with metrics.stage("render html"):
+        if page_size:
+            render_engineering_notes_paged(output, source, destination, commits, git_log_command, git_log, jql, page_size)
+        else:
+            render_engineering_notes(output, source, destination, commits, git_log_command, git_log, jql)
+
+def train_output(output, source, destination):
+    """The file the notes for one pair of tags in a release train are rendered to, e.g. notes_25.1.1-25.1.2.html for notes.html"""
+    root, extension = os.path.splitext(output)
+    return root + "_" + (source + "-" + destination).replace("/", "_") + extension
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,350 @@
+"""Read objects straight from the packfiles and loose objects of a git repository, without running git.
+
+ Only what is needed to walk the history of a repo is supported: pack index v1/v2 lookups, packed
+ objects (including OFS_DELTA and REF_DELTA objects), zlib compressed loose objects and alternates.
+"""
+
+import bisect
+import glob
+import mmap
+import os
+import struct
+import zlib
+
+# Object types as stored in a pack
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+# Pack index v2 files start with this magic number
+PACK_INDEX_V2_MAGIC = b"\377tOc"
+
+# Git never abbreviates an object name to fewer characters than this
+MINIMUM_ABBREVIATION = 7
+
+class ObjectDatabaseError(Exception):
+    """Raised when an object cannot be found or the object database cannot be read"""
+
+def common_prefix_length(first, second):
+    """Number of leading hex digits that two binary shas have in common"""
+    difference = int.from_bytes(first, "big") ^ int.from_bytes(second, "big")
+    return (160 - difference.bit_length()) // 4
+
+def read_varint(data, pos):
+    """Read a little endian base 128 size from a delta, returning (value, next position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+def apply_delta(base, delta):
+    """Rebuild an object from its base object and a git delta"""
+    _, pos = read_varint(delta, 0)
+    target_size, pos = read_varint(delta, pos)
+    target = bytearray()
+
+    while pos < len(delta):
+        opcode = delta[pos]
+        pos += 1
+
+        if opcode & 0x80:
+            #Copy a range of the base object
+            offset = 0
+            size = 0
+            for byte_number in range(4):
+                if opcode & (1 << byte_number):
+                    offset |= delta[pos] << (8 * byte_number)
+                    pos += 1
+            for byte_number in range(3):
+                if opcode & (0x10 << byte_number):
+                    size |= delta[pos] << (8 * byte_number)
+                    pos += 1
+            target += base[offset:offset + (size or 0x10000)]
+        elif opcode:
+            #Insert the next opcode bytes of the delta
+            target += delta[pos:pos + opcode]
+            pos += opcode
+        else:
+            raise ObjectDatabaseError("Invalid delta opcode")
+
+    if len(target) != target_size:
+        raise ObjectDatabaseError("Delta produced an object of the wrong size")
+
+    return bytes(target)
+
+def inflate(data, pos, size):
+    """Decompress a zlib stream that starts at pos and expands to size bytes"""
+    decompressor = zlib.decompressobj()
+    chunk_size = size + 1024
+    output = decompressor.decompress(data[pos:pos + chunk_size])
+
+    while not decompressor.eof and pos + chunk_size < len(data):
+        pos += chunk_size
+        output += decompressor.decompress(data[pos:pos + chunk_size])
+
+    return output
+
+class PackIndex:
+    """Class to look up the offsets of objects in a pack from its .idx file"""
+    def __init__(self, path):
+        with open(path, "rb") as index_file:
+            self.data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.data[:4] == PACK_INDEX_V2_MAGIC:
+            self.version = 2
+            fanout_start = 8
+        else:
+            self.version = 1
+            fanout_start = 0
+
+        self.fanout = struct.unpack(">256I", self.data[fanout_start:fanout_start + 1024])
+        self.count = self.fanout[255]
+
+        if self.version == 2:
+            self.sha_start = fanout_start + 1024
+            self.sha_stride = 20
+            self.offset_start = self.sha_start + 24 * self.count
+            self.large_offset_start = self.offset_start + 4 * self.count
+        else:
+            #Each entry is a 4 byte offset followed by the sha
+            self.sha_start = fanout_start + 1024 + 4
+            self.sha_stride = 24
+
+    def sha(self, position):
+        """The binary sha of the object at a position in the (sorted) index"""
+        start = self.sha_start + position * self.sha_stride
+        return self.data[start:start + 20]
+
+    def __getitem__(self, position):
+        return self.sha(position)
+
+    def __len__(self):
+        return self.count
+
+    def search(self, binsha):
+        """Return the position of binsha in the index, or the position where it would be inserted"""
+        low = self.fanout[binsha[0] - 1] if binsha[0] else 0
+        return bisect.bisect_left(self, binsha, low, self.fanout[binsha[0]])
+
+    def offset(self, binsha):
+        """The offset of an object in the pack, or None if the object is not in this pack"""
+        position = self.search(binsha)
+
+        if position >= self.count or self.sha(position) != binsha:
+            return None
+
+        if self.version == 1:
+            start = self.sha_start + position * self.sha_stride - 4
+            return struct.unpack(">I", self.data[start:start + 4])[0]
+
+        start = self.offset_start + 4 * position
+        offset = struct.unpack(">I", self.data[start:start + 4])[0]
+
+        # Offsets with the MSB set are an index into the table of 8 byte offsets
+        if offset & 0x80000000:
+            start = self.large_offset_start + 8 * (offset & 0x7fffffff)
+            offset = struct.unpack(">Q", self.data[start:start + 8])[0]
+
+        return offset
+
+    def neighbours(self, binsha):
+        """The shas either side of binsha in the index (excluding binsha itself)"""
+        position = self.search(binsha)
+        found = position < self.count and self.sha(position) == binsha
+        candidates = [position - 1, position + 1 if found else position]
+        return [self.sha(candidate) for candidate in candidates if 0 <= candidate < self.count]
+
+    def close(self):
+        """Release the index"""
+        self.data.close()
+
+class Pack:
+    """Class to read objects from a .pack file"""
+    def __init__(self, path, database):
+        self.index = PackIndex(path[:-len(".pack")] + ".idx")
+        self.database = database
+
+        with open(path, "rb") as pack_file:
+            self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_entry(self, offset):
+        """Read the entry at an offset, returning (type, base, data) where base is set for deltas"""
+        data = self.data
+        byte = data[offset]
+        pos = offset + 1
+
+        object_type = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+
+        base = None
+
+        if object_type == OFS_DELTA:
+            byte = data[pos]
+            pos += 1
+            base_distance = byte & 0x7f
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                base_distance = ((base_distance + 1) << 7) | (byte & 0x7f)
+            base = offset - base_distance
+        elif object_type == REF_DELTA:
+            base = data[pos:pos + 20]
+            pos += 20
+
+        return object_type, base, inflate(data, pos, size)
+
+    def read(self, offset):
+        """Read the object at an offset, returning (type name, data)"""
+        deltas = []
+
+        # Follow the chain of deltas down to a whole object, then apply the deltas back up the chain
+        while True:
+            object_type, base, data = self.read_entry(offset)
+
+            if object_type == OFS_DELTA:
+                deltas.append(data)
+                offset = base
+            elif object_type == REF_DELTA:
+                deltas.append(data)
+                type_name, data = self.database.read(base)
+                break
+            else:
+                type_name = OBJECT_TYPES[object_type]
+                break
+
+        for delta in reversed(deltas):
+            data = apply_delta(data, delta)
+
+        return type_name, data
+
+    def close(self):
+        """Release the pack"""
+        self.data.close()
+        self.index.close()
+
+class ObjectDatabase:
+    """Class to read objects from the objects directory of a git repository"""
+    def __init__(self, objects_directory):
+        self.objects_directories = [objects_directory]
+
+        # Alternates are other object directories this repository borrows objects from
+        alternates = os.path.join(objects_directory, "info", "alternates")
+        if os.path.exists(alternates):
+            with open(alternates, "r", encoding="utf-8") as alternates_file:
+                for line in alternates_file:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        self.objects_directories.append(os.path.normpath(os.path.join(objects_directory, line)))
+
+        self.packs = []
+        for directory in self.objects_directories:
+            for pack_path in sorted(glob.glob(os.path.join(directory, "pack", "pack-*.pack"))):
+                self.packs.append(Pack(pack_path, self))
+
+        self.loose_shas = None
+
+    def packed_object_count(self):
+        """The number of objects in all the packs"""
+        return sum(pack.index.count for pack in self.packs)
+
+    def loose_object_path(self, hexsha):
+        """The path of a loose object, if it exists"""
+        for directory in self.objects_directories:
+            path = os.path.join(directory, hexsha[:2], hexsha[2:])
+            if os.path.exists(path):
+                return path
+        return None
+
+    def read(self, sha):
+        """Read an object given its binary or hex sha, returning (type name, data)"""
+        binsha = bytes.fromhex(sha) if isinstance(sha, str) else sha
+
+        for pack in self.packs:
+            offset = pack.index.offset(binsha)
+            if offset is not None:
+                return pack.read(offset)
+
+        path = self.loose_object_path(binsha.hex())
+        if path is None:
+            raise ObjectDatabaseError("Object not found: " + binsha.hex())
+
+        with open(path, "rb") as loose_file:
+            data = zlib.decompress(loose_file.read())
+
+        header_end = data.index(b"\0")
+        type_name = data[:data.index(b" ")].decode("ascii")
+
+        return type_name, data[header_end + 1:]
+
+    def all_loose_shas(self):
+        """A sorted list of the (hex) shas of every loose object"""
+        if self.loose_shas is None:
+            shas = []
+            for directory in self.objects_directories:
+                for subdirectory in glob.glob(os.path.join(directory, "[0-9a-f][0-9a-f]")):
+                    prefix = os.path.basename(subdirectory)
+                    shas.extend(prefix + name for name in os.listdir(subdirectory) if len(name) == 38)
+            self.loose_shas = sorted(set(shas))
+
+        return self.loose_shas
+
+    def complete(self, prefix):
+        """Expand an abbreviated hex sha to the one full sha it names"""
+        prefix = prefix.lower()
+        matches = set()
+
+        low = bytes.fromhex(prefix.ljust(40, "0"))
+        for pack in self.packs:
+            position = pack.index.search(low)
+            while position < pack.index.count and pack.index.sha(position).hex().startswith(prefix):
+                matches.add(pack.index.sha(position).hex())
+                position += 1
+
+        loose_shas = self.all_loose_shas()
+        position = bisect.bisect_left(loose_shas, prefix)
+        while position < len(loose_shas) and loose_shas[position].startswith(prefix):
+            matches.add(loose_shas[position])
+            position += 1
+
+        if len(matches) != 1:
+            raise ObjectDatabaseError(("Ambiguous" if matches else "Unknown") + " object name: " + prefix)
+
+        return matches.pop()
+
+    def default_abbreviation(self):
+        """The abbreviation length git picks for this repository (core.abbrev=auto)"""
+        # Enough hex digits to hold twice as many bits as it takes to count the packed objects
+        bits = self.packed_object_count().bit_length()
+        return max(MINIMUM_ABBREVIATION, (bits + 1) // 2)
+
+    def abbreviate(self, hexsha, length):
+        """Abbreviate a hex sha to at least length characters, extending it until it is unique"""
+        binsha = bytes.fromhex(hexsha)
+        neighbours = [neighbour for pack in self.packs for neighbour in pack.index.neighbours(binsha)]
+
+        loose_shas = self.all_loose_shas()
+        if loose_shas:
+            position = bisect.bisect_left(loose_shas, hexsha)
+            neighbours.extend(bytes.fromhex(loose_shas[candidate]) for candidate in (position - 1, position, position + 1)
+                              if 0 <= candidate < len(loose_shas) and loose_shas[candidate] != hexsha)
+
+        for neighbour in neighbours:
+            length = max(length, common_prefix_length(binsha, neighbour) + 1)
+
+        return hexsha[:length]
+
+    def close(self):
+        """Release all the packs"""
+        for pack in self.packs:
+            pack.close()
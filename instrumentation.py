@@ -0,0 +1,181 @@
+"""Timers and counters for the stages of a run, and optional whole-run profiling with cProfile or tracemalloc.
+
+ Instrumentation is off unless a tool is run with --profile, --metrics or --profiler. While it is off,
+ stage() hands back a shared do-nothing context manager and timed_iterator() hands back the iterator it
+ was given, so the instrumented code runs exactly as it would without them. Per-item work (e.g. counting
+ commits) is only done by callers that first check metrics.enabled. The profilers, and json, are only imported
+ once they are asked for, so a run without instrumentation does not pay to import them.
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+PROFILERS = ("cprofile", "tracemalloc")
+
+# Where the profiler's results are dumped unless --profiler_output says otherwise
+PROFILER_OUTPUT = "release_notes.prof"
+
+# Number of functions or allocation sites listed in the profiler summary
+PROFILER_SUMMARY_LINES = 25
+
+NULL_CONTEXT = contextlib.nullcontext()
+
+class StageTimer:
+    """Class to add the time spent in a with block to a named timer"""
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+
+class Metrics:
+    """Class to collect the time spent in each stage of a run, and counts of what was processed"""
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = {}
+
+    def reset(self, enabled=False):
+        """Discard everything collected so far, and turn collection on or off"""
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+
+    def stage(self, name):
+        """A context manager that times a stage"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return StageTimer(self, name)
+
+    def add_time(self, name, seconds):
+        """Add seconds to a named timer"""
+        if self.enabled:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        """Add amount to a named counter"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count_commits(self, commit_groups):
+        """Count the commits in a dictionary of issue key -> list of commits, and those without an issue key"""
+        self.count("commits parsed", sum(len(commits) for commits in commit_groups.values()))
+        self.count("UNKNOWN keys", len(commit_groups.get("UNKNOWN", ())))
+
+    def count_bytes_written(self, *paths):
+        """Add the sizes of output files to the bytes written counter, skipping outputs that were not written"""
+        for path in paths:
+            if self.enabled and path is not None and os.path.exists(path):
+                self.count("bytes written", os.path.getsize(path))
+
+    def timed_iterator(self, name, iterator):
+        """Add the time spent producing each item of an iterator to a named timer"""
+        if not self.enabled:
+            return iterator
+        return self.iterate_timed(name, iterator)
+
+    def iterate_timed(self, name, iterator):
+        """Generator behind timed_iterator"""
+        iterator = iter(iterator)
+        seconds = 0.0
+
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                yield item
+        finally:
+            self.add_time(name, seconds)
+
+    def as_dict(self):
+        """The timers (in seconds) and counters collected"""
+        return {"timers": dict(self.timers), "counters": dict(self.counters)}
+
+    def summary(self, output):
+        """Write a table of the timers and counters"""
+        for name, seconds in self.timers.items():
+            output.write(f"{name:<24} {seconds:>12.3f}s\n")
+        for name, value in self.counters.items():
+            output.write(f"{name:<24} {value:>13}\n")
+
+    def write_json(self, path):
+        """Write the timers and counters to a JSON file"""
+        import json
+
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            json.dump(self.as_dict(), metrics_file, indent=2)
+
+# The metrics of the current run, shared by every module
+metrics = Metrics()
+
+def add_profile_arguments(parser):
+    """Add the options that turn on instrumentation to a tool's argument parser"""
+    parser.add_argument('-p','--profile', action='store_true', help='Report the time taken by each stage, and counts of what was processed')
+    parser.add_argument('--metrics', type=str, help='Write the stage timings and counts to this JSON file')
+    parser.add_argument('--profiler', type=str, choices=PROFILERS, help='Profile the whole run (cprofile only profiles the main thread), dumping the results to --profiler_output')
+    parser.add_argument('--profiler_output', type=str, default=PROFILER_OUTPUT, help='File the profiler results are dumped to')
+
+@contextlib.contextmanager
+def profile_session(arguments, output=None):
+    """Collect metrics and run the chosen profiler for the body of the with block, as set by the profile arguments,
+    then report them (to stderr unless given an output). Does nothing unless one of the profile arguments was given"""
+    enabled = arguments['profile'] or arguments['metrics'] is not None
+    profiler = arguments['profiler']
+
+    if not enabled and profiler is None:
+        yield metrics
+        return
+
+    metrics.reset(enabled=True)
+    output = output or sys.stderr
+    profile = None
+
+    if profiler == "cprofile":
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    elif profiler == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start()
+
+    try:
+        with metrics.stage("total"):
+            yield metrics
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(arguments['profiler_output'])
+            import io
+            import pstats
+
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(PROFILER_SUMMARY_LINES)
+            output.write(summary.getvalue())
+        elif profiler == "tracemalloc":
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            snapshot.dump(arguments['profiler_output'])
+            metrics.count("peak bytes allocated", peak)
+            for statistic in snapshot.statistics("lineno")[:PROFILER_SUMMARY_LINES]:
+                output.write(str(statistic) + "\n")
+
+        if arguments['profile']:
+            metrics.summary(output)
+        if arguments['metrics'] is not None:
+            metrics.write_json(arguments['metrics'])
+
+        metrics.reset()
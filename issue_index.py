@@ -0,0 +1,208 @@
+"""Persistent index from jira id to the commits that mention it, and the first tag that contains each commit,
+ to answer "which release shipped ABC-123?" without running git log over range after range.
+
+ The index is a SQLite database kept in the .git directory of the repo. Each update walks only the commits
+ of a ref that were added since the ref was last indexed, parses them with the same rules as
+ split_commit_message, and assigns each commit to the first tag that contains it, reusing the release
+ train's assignment: a commit already assigned to an earlier tag is not walked again. Only the first
+ containing tag is stored; every later tag also contains the commit.
+
+ Commits are numbered in topological order, every commit after its parents, so a tag that is an ancestor
+ of another always comes first. Commit dates are not relied on, as a skewed clock can date a commit
+ before its parents.
+
+ Usage: python issue_index.py -l <repo location> -r <repo> -u master        (index what master gained since the last update)
+        python issue_index.py -l <repo location> -r <repo> ABC-123 ABC-124  (the commits and release of each)
+        python issue_index.py -l <repo location> -r <repo> -x ABC-12        (every jira id starting with ABC-12)
+"""
+
+import argparse
+import os
+import sys
+
+from commit_source import find_git_dir, COMMIT_SOURCES, DEFAULT_COMMIT_SOURCE
+from parse_git_log import open_repo, parse_commit_line, PARSER_VERSION
+from release_train import assign_commits
+from sqlite_store import SQLiteStore
+
+# Bump whenever the layout of the index changes. The parser's version is part of the stamp, so a change to
+# the parsing rules also discards the index
+INDEX_VERSION = 2
+
+def index_path(git_dir):
+    """Location of the issue index for a git directory"""
+    return os.path.join(git_dir, 'release_notes', 'issue_index.sqlite')
+
+def parents_first(graph):
+    """Reorder the (sha, parents, line) entries of a walk (newest first) so every commit comes after those of its parents
+    that are in the walk. Otherwise the commits keep the reverse of the walk's order, oldest first by date"""
+    entries = {entry[0]: entry for entry in graph}
+    ordered = []
+    done = set()
+
+    for sha, _, _ in reversed(graph):
+        stack = [sha]
+
+        while stack:
+            sha = stack[-1]
+            if sha in done:
+                stack.pop()
+                continue
+
+            # Only a skewed clock leaves a parent to be placed before its child here
+            pending = [parent for parent in entries[sha][1] if parent in entries and parent not in done]
+            if pending:
+                stack.extend(pending)
+            else:
+                done.add(sha)
+                ordered.append(entries[sha])
+                stack.pop()
+
+    return ordered
+
+def prefix_upper_bound(prefix):
+    """The smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class IssueIndex(SQLiteStore):
+    """Class to store the jira id, parents and first containing tag of every indexed commit, and the sha each indexed ref was at.
+
+    Lookups return a list of (jira_id, sha, comment, tag) for each commit, oldest first (parents before children),
+    with a tag of None for commits that are not in a tag yet. Merge commits are indexed for their parents but have
+    no jira id.
+    """
+    TABLES = ("commits", "tags", "refs")
+    SCHEMA = ("""CREATE TABLE IF NOT EXISTS commits (
+                     sha TEXT PRIMARY KEY,
+                     position INTEGER,
+                     parents TEXT,
+                     jira_id TEXT,
+                     comment TEXT,
+                     tag TEXT)""",
+              "CREATE INDEX IF NOT EXISTS commits_by_jira_id ON commits (jira_id, position)",
+              "CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, sha TEXT)",
+              "CREATE TABLE IF NOT EXISTS refs (ref TEXT PRIMARY KEY, sha TEXT)")
+
+    def __init__(self, path):
+        super().__init__(path, INDEX_VERSION * 1000 + PARSER_VERSION)
+
+    def update(self, commits, ref):
+        """Index the commits of ref (in an open commit source) added since it was last indexed, then assign
+        the tags of the repo that are new or have moved. Returns the number of commits added"""
+        head = commits.resolve(ref)
+        row = self.connection.execute("SELECT sha FROM refs WHERE ref = ?", (ref,)).fetchone()
+        last = row[0] if row is not None else None
+
+        # Everything reachable from the ref that was not reachable from it last time. If the ref has been rewritten,
+        # that includes commits already indexed from other refs, which are skipped
+        graph = list(commits.iter_graph(last, head))
+        indexed = self.positions(sha for sha, _, _ in graph)
+
+        (latest,) = self.connection.execute("SELECT coalesce(max(position), 0) FROM commits").fetchone()
+        records = []
+
+        # Numbered after every commit already indexed: those include all the parents of the new commits that are
+        # not new themselves, and none of their children
+        for sha, parents, line in parents_first([entry for entry in graph if entry[0] not in indexed]):
+            if len(parents) <= 1:
+                _, jira_id, comment = parse_commit_line(line)
+            else:
+                jira_id, comment = None, line
+            records.append((sha, latest + len(records) + 1, " ".join(parents), jira_id, comment, None))
+
+        self.connection.executemany("INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?)", records)
+        self.connection.execute("INSERT OR REPLACE INTO refs VALUES (?, ?)", (ref, head))
+        self.assign_tags(commits.tags())
+        self.connection.commit()
+
+        return len(records)
+
+    def assign_tags(self, tags):
+        """Assign the unassigned commits to the first of the tags (a dictionary of tag name -> commit sha) that contains them"""
+        stored = dict(self.connection.execute("SELECT tag, sha FROM tags"))
+
+        # Tags in topological order of their commits, so a tag always comes before the tags it is an ancestor of
+        commit_positions = self.positions(tags.values())
+        positions = {tag: commit_positions[sha] for tag, sha in tags.items() if sha in commit_positions}
+
+        new_tags = sorted((position, tag) for tag, position in positions.items() if tag not in stored)
+        latest = max((positions.get(tag, -1) for tag in stored), default=-1)
+
+        #
+        # A tag that has moved or gone, or a new tag on a commit older than a tag already assigned, may change
+        # which tag comes first for commits that are already assigned, so every commit is assigned again
+        #
+        if any(tags.get(tag) != sha for tag, sha in stored.items()) or (new_tags and new_tags[0][0] < latest):
+            self.connection.execute("UPDATE commits SET tag = NULL")
+            self.connection.execute("DELETE FROM tags")
+            new_tags = sorted((position, tag) for tag, position in positions.items())
+
+        if not new_tags:
+            return
+
+        # Only the unassigned commits need walking: assigned commits have every one of their ancestors assigned
+        parents = {sha: commit_parents.split() for sha, commit_parents in self.connection.execute("SELECT sha, parents FROM commits WHERE tag IS NULL")}
+        tag_names = [tag for _, tag in new_tags]
+        assigned = assign_commits(parents, [tags[tag] for tag in tag_names])
+
+        self.connection.executemany("UPDATE commits SET tag = ? WHERE sha = ?", ((tag_names[index], sha) for sha, index in assigned.items()))
+        self.connection.executemany("INSERT INTO tags VALUES (?, ?)", ((tag, tags[tag]) for tag in tag_names))
+
+    def positions(self, shas):
+        """Return a dictionary of sha -> position for the shas of an iterable that are indexed"""
+        return dict(self.select_in("SELECT sha, position FROM commits WHERE sha IN ({})", shas))
+
+    def lookup(self, jira_id):
+        """Return (jira_id, sha, comment, tag) for each commit of a jira id, oldest first"""
+        return self.connection.execute("""SELECT jira_id, sha, comment, tag FROM commits
+                                          WHERE jira_id = ? ORDER BY position""", (jira_id,)).fetchall()
+
+    def lookup_prefix(self, prefix):
+        """Return (jira_id, sha, comment, tag) for each commit of every jira id starting with prefix, by jira id then oldest first"""
+        if not prefix:
+            return self.connection.execute("""SELECT jira_id, sha, comment, tag FROM commits
+                                              WHERE jira_id IS NOT NULL ORDER BY jira_id, position""").fetchall()
+
+        return self.connection.execute("""SELECT jira_id, sha, comment, tag FROM commits
+                                          WHERE jira_id >= ? AND jira_id < ? ORDER BY jira_id, position""",
+                                       (prefix, prefix_upper_bound(prefix))).fetchall()
+
+def format_entries(entries):
+    """A line per commit of a lookup: the jira id, the first tag containing the commit, the sha and the comment"""
+    return "".join(f"{jira_id}\t{tag or '(not tagged)'}\t{sha}\t{comment}\n" for jira_id, sha, comment, tag in entries)
+
+def main(argv=None, prog=None):
+    """Update or search the issue index of a repo, taking the command line from argv (default: sys.argv[1:])"""
+
+    #
+    #Parse the command line arguments
+    #
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument('-l','--repo_loc', type=str, help='Location of a git repo to index', required=True)
+    parser.add_argument('-r','--repo', type=str, help='The name of the git repo to index', required=True)
+    parser.add_argument('-b','--backend', type=str, choices=sorted(COMMIT_SOURCES), default=DEFAULT_COMMIT_SOURCE, help='How to read the history of the git repo')
+    parser.add_argument('-i','--index', type=str, help='The index database (default: release_notes/issue_index.sqlite in the .git directory of the repo)')
+    parser.add_argument('-u','--update', type=str, nargs='+', default=[], metavar='REF', help='Index the commits added to these refs since they were last indexed, before any lookup')
+    parser.add_argument('-x','--prefix', type=str, nargs='+', default=[], help='Look up every jira id starting with these prefixes')
+    parser.add_argument('jira_ids', type=str, nargs='*', help='Jira ids to look up')
+
+    args = parser.parse_args(argv)
+
+    # Found without opening the repo, so a lookup does not start git
+    path = args.index or index_path(find_git_dir(os.path.join(os.path.abspath(args.repo_loc), args.repo)))
+
+    with IssueIndex(path) as index:
+        if args.update:
+            with open_repo(args.repo_loc, args.repo, args.backend) as commits:
+                for ref in args.update:
+                    added = index.update(commits, ref)
+                    print(f"Indexed {added} new commits of {ref}", file=sys.stderr)
+
+        for jira_id in args.jira_ids:
+            sys.stdout.write(format_entries(index.lookup(jira_id)) or f"{jira_id}\t(not found)\n")
+
+        for prefix in args.prefix:
+            sys.stdout.write(format_entries(index.lookup_prefix(prefix)))
+
+if __name__ == "__main__":
+    main()
@@ -2,92 +2,127 @@
  From the git log messages between two tags,
  find a list of jira issues and wrap them up into a JQL query that can be opened in Jira.
  This query can be used to tag the 'build version' field for each
- issue that was changed in this build
+ issue that was changed in this build. Issues that the tracker registry routes to another
+ tracker (e.g. Azure DevOps) get a query of their own in that tracker's query language
 """
 
 import argparse
-import webbrowser
 
-from parse_git_log import get_git_log
+from parse_git_log import get_git_log, add_git_range_arguments
+from instrumentation import add_profile_arguments, profile_session
+from trackers import registry, add_tracker_arguments, configure_trackers, build_jql_query, JIRA_ISSUES_URL
 
-def main():
+def main(argv=None, prog=None):
+    """Build JQL queries for the issues changed between two tags, taking the command line from argv (default: sys.argv[1:])"""
 
     #
     #Parse the command line arguments
     #
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-l','--repo_loc', type=str, help='Location of a git repo to search history in', required=True)
-    parser.add_argument('-r','--repo', type=str, help='The name of the git repo in which to search the history', required=True)
-    parser.add_argument('-s','--source', type=str, help='Git tag of starting range to search in git', required=True)
-    parser.add_argument('-d','--dest', type=str, help='Git tag of destination to search in git', required=True)
+    parser = argparse.ArgumentParser(prog=prog)
+    add_git_range_arguments(parser)
     parser.add_argument('-o','--output', type=str, help='JQL output for issues that have changed', required=True)
+    parser.add_argument('-u','--max_url_length', type=int, default=MAX_JQL_URL_LENGTH, help='Split the JQL into several queries with urls no longer than this')
+    add_tracker_arguments(parser)
+    add_profile_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     arguments = vars(args)
+    configure_trackers(arguments)
 
     source = arguments['source']
     dest = arguments['dest']
     repo_location = arguments['repo_loc']
     repo = arguments['repo']
     output = arguments['output']
+    commit_log = None if arguments['no_commit_log'] else arguments['commit_log']
 
-    #Fetch the content of a parsed git log
-    git_dictionary, git_log_command, git_log = get_git_log(repo_location, repo, source, dest)
+    with profile_session(arguments) as metrics:
+        #Fetch the content of a parsed git log
+        with metrics.stage("git log"):
+            git_dictionary, git_log_command, git_log = get_git_log(repo_location, repo, source, dest, use_cache=arguments['cache'], backend=arguments['backend'],
+                                                                   commit_log=commit_log, background_writes=arguments['background_writes'], parse_jobs=arguments['parse_jobs'])
 
-    azdo_projects = ['AZMV', 'AMZV']
-    jql_url = parse_jira_issues_from_git_log(git_dictionary.keys(), azdo_projects)
+        with metrics.stage("build jql"):
+            jql_urls = build_tracker_queries(git_dictionary.keys(), arguments['max_url_length'])
 
-    #Write the JQL query to an output file
-    with open(output, "w") as jql_file:
-        jql_file.write(jql_url)
+        #Write the JQL queries to an output file, one per line
+        with open(output, "w") as jql_file:
+            jql_file.write("\n".join(jql_urls))
 
-    #Open a browser with to view the content of the JQL query
-    webbrowser.open(jql_url, new=1)
+        if metrics.enabled:
+            metrics.count_commits(git_dictionary)
+            metrics.count("jql queries", len(jql_urls))
+            metrics.count_bytes_written(output, commit_log)
 
-def parse_jira_issues_from_git_log(keys, blacklist):
-    """Parse a list of jira issues from a git log, ignoring blacklisted project keys"""
-    blacklisted_issues = []
-    jira_issues = []
+    #Open a browser with to view the content of each JQL query
+    import webbrowser
 
-    #
-    # Find all the unique issues by key. Ignore 'UNKOWN' keys and blacklisted projects
-    #
-    for item in keys:
-        jira_issue = True
-
-        for project in blacklist:
-            if item.upper().startswith("UNKNOWN"):
-                jira_issue = False
-                break
-            elif item.upper().startswith(project):
-                if item not in blacklisted_issues:
-                    blacklisted_issues.append(item)
-                jira_issue = False
-                break
-
-        if(jira_issue and item not in jira_issues):
-            jira_issues.append(item)
+    for jql_url in jql_urls:
+        webbrowser.open(jql_url, new=1)
 
-    return build_jql(jira_issues)
+# Longest JQL url to open in a browser. Longer urls are rejected by browsers and by Jira
+MAX_JQL_URL_LENGTH = 6000
 
 def build_jql(jira_issues):
     """Build a JQL string to access Jira for a set of issues"""
-    return "https://jira.mot-solutions.com/issues/?jql=" + build_jira_query(jira_issues)
+    return JIRA_ISSUES_URL + build_jql_query(jira_issues)
+
+def build_jql_chunks(jira_issues, max_length=MAX_JQL_URL_LENGTH, build_url=build_jql):
+    """Build as few JQL strings as possible to access Jira for a set of issues, each no longer than max_length.
+    Issues are grouped by project and a project is only split across queries when it is too big for one query.
+    build_url builds the url of each query (e.g. a tracker's query, for another tracker or query language), and
+    must not add more to the url for an issue than the length of its key and a separator"""
+
+    empty_length = len(build_url([]))
+    if empty_length >= max_length:
+        raise ValueError("max_length must be longer than an empty JQL url (" + str(empty_length) + " characters)")
+
+    # Group the issues by project, in the order each project was first found
+    projects = {}
+    for issue in jira_issues:
+        projects.setdefault(issue.partition("-")[0], []).append(issue)
+
+    chunks = [[]]
+    chunk_length = empty_length
+
+    def add(issue):
+        """Add an issue to the current chunk, starting a new chunk if it would be too long"""
+        nonlocal chunk_length
+        issue_length = len(issue) + (1 if chunks[-1] else 0)
+
+        if chunks[-1] and chunk_length + issue_length > max_length:
+            chunks.append([])
+            chunk_length = empty_length
+            issue_length = len(issue)
+
+        chunks[-1].append(issue)
+        chunk_length += issue_length
+
+    for issues in projects.values():
+        project_length = sum(len(issue) for issue in issues) + len(issues)
+
+        #Start a new query rather than split a project that would fit in one on its own
+        if chunks[-1] and chunk_length + project_length > max_length and empty_length + project_length - 1 <= max_length:
+            chunks.append([])
+            chunk_length = empty_length
+
+        for issue in issues:
+            add(issue)
+
+    return [build_url(chunk) for chunk in chunks]
 
-def build_jira_query(issues):
-    """Build a JQL query string for a set of issues, ignoring duplicates"""
-    #Build the JQL query
-    query = "issueKey in ("
-    for item in issues:
-        query += item + ","
+def build_default_query(keys):
+    """Build the query url for the issues of a git log that the tracker registry routes to its default tracker (Jira)"""
+    return registry.default.query(registry.default_issues(keys))
 
-    #Remove the trailing ',' (as long as the list is not empty)
-    if issues:
-        query = query[:-1]
+def build_tracker_queries(keys, max_length=MAX_JQL_URL_LENGTH):
+    """Build the query urls, each no longer than max_length, for the issues of a git log in each tracker they are routed to"""
+    urls = []
 
-    query += ")"
+    for tracker_name, issues in registry.group(keys).items():
+        urls.extend(build_jql_chunks(issues, max_length, registry.trackers[tracker_name].query))
 
-    return query
+    return urls
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+"""Read the CSV exported from a Jira query, keeping only the columns that are needed.
+
+ The export is '^' delimited (to avoid having to handle ',' in comment fields) and can have tens of
+ thousands of issues and many custom fields. Rather than building a dict for every row, the header is
+ resolved to column positions once and each row is projected to a tuple of just the requested columns,
+ as the rows are read. Very large exports can be memory-mapped rather than read through a file buffer.
+"""
+
+import csv
+import mmap
+import operator
+
+JIRA_EXPORT_DELIMITER = "^"
+
+# The columns used to consolidate the Jira issues with the git log, in the order they are projected
+CONSOLIDATION_COLUMNS = ('Issue key', 'Issue Type', 'Summary', 'Custom field (Proposed Release Notes)')
+
+def column_projection(header, columns):
+    """A function that picks the named columns out of a row as a tuple, given the header row of the export.
+    Columns that are not in the header project to None"""
+
+    # As with csv.DictReader, the last of any repeated column names wins
+    positions = {name: position for position, name in enumerate(header)}
+    indices = [positions.get(column) for column in columns]
+
+    if None in indices:
+        return lambda row: tuple(None if index is None else row[index] for index in indices)
+
+    getter = operator.itemgetter(*indices)
+
+    if len(indices) == 1:
+        return lambda row: (getter(row),)
+
+    return getter
+
+def project_rows(lines, columns, delimiter=JIRA_EXPORT_DELIMITER):
+    """Yield a tuple of the named columns for each row of an export, given an iterable of its lines"""
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    project = column_projection(header, columns)
+    width = len(header)
+
+    for row in reader:
+        # Skip blank lines, as csv.DictReader does
+        if not row:
+            continue
+
+        # Short rows are padded with None, again as csv.DictReader does
+        if len(row) < width:
+            row += [None] * (width - len(row))
+
+        yield project(row)
+
+def iter_mapped_lines(mapped_file, encoding="utf-8"):
+    """Yield the decoded lines of a memory-mapped file. Windows line endings are translated, as they are
+    when the export is read as a text file, and the line ending is kept so that quoted newlines survive"""
+    for line in iter(mapped_file.readline, b""):
+        yield line.decode(encoding).replace("\r\n", "\n")
+
+def read_jira_export(jira_export_file, columns=CONSOLIDATION_COLUMNS, use_mmap=False):
+    """Yield a tuple of the named columns for each issue in a Jira export, as the rows are read"""
+    if use_mmap:
+        with open(jira_export_file, 'rb') as input_file:
+            # mmap cannot map an empty file
+            if not input_file.seek(0, 2):
+                return
+
+            with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                yield from project_rows(iter_mapped_lines(mapped_file), columns)
+    else:
+        with open(jira_export_file, 'r', encoding="utf-8") as input_csv_file:
+            yield from project_rows(input_csv_file, columns)
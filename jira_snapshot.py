@@ -0,0 +1,136 @@
+"""Persistent, indexed snapshots of Jira exports, keyed by the content hash of each export.
+
+ The first time an export is seen it is parsed into a SQLite store, where its issues are kept apart from
+ those of every other export. Later runs given the same file (by content, not by name) skip parsing the CSV
+ altogether and load its issues from the store. When a run is given several exports and an issue is in more
+ than one of them, the most recently updated (or, failing that, resolved) copy of it wins. So the issues loaded
+ only depend on the exports given, not on what else has been imported into the store
+"""
+
+import datetime
+
+from jira_export import CONSOLIDATION_COLUMNS, read_jira_export
+from sqlite_store import SQLiteStore
+
+# Bump whenever the columns or the way they are read change, to discard old snapshots
+SNAPSHOT_VERSION = 2
+
+# Read exports in blocks of this many bytes to hash them
+HASH_BLOCK_SIZE = 1 << 20
+
+# The Updated and Resolved columns decide which copy of an issue is the latest
+SNAPSHOT_COLUMNS = CONSOLIDATION_COLUMNS + ('Updated', 'Resolved')
+
+# Date formats used by Jira CSV exports, the default format first
+JIRA_DATE_FORMATS = ("%d/%b/%y %I:%M %p", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S.%f%z", "%d/%m/%Y %H:%M")
+
+def content_hash(jira_export_file):
+    """The sha256 of the content of an export"""
+    import hashlib
+
+    digest = hashlib.sha256()
+
+    with open(jira_export_file, 'rb') as export_file:
+        for block in iter(lambda: export_file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+def parse_jira_date(value):
+    """Convert a date from a Jira export into a sortable ISO 8601 string, or '' if it is empty or not understood"""
+    if value:
+        for date_format in JIRA_DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(value.strip(), date_format).isoformat()
+            except ValueError:
+                pass
+
+    return ""
+
+def is_newer(modified, latest_modified):
+    """True if a copy of an issue modified at modified replaces one modified at latest_modified (both from parse_jira_date).
+    When either date is unknown the copy read last wins"""
+    return not modified or not latest_modified or modified >= latest_modified
+
+class JiraSnapshotStore(SQLiteStore):
+    """Class to store the consolidated columns of the issues in one or more Jira exports, indexed by export and position"""
+    # The issues table held the snapshots of version 1
+    TABLES = ("issues", "exports", "export_issues")
+    SCHEMA = ("""CREATE TABLE IF NOT EXISTS exports (
+                     content_hash TEXT PRIMARY KEY,
+                     issue_count INTEGER) WITHOUT ROWID""",
+              """CREATE TABLE IF NOT EXISTS export_issues (
+                     content_hash TEXT,
+                     position INTEGER,
+                     issue_key TEXT,
+                     issue_type TEXT,
+                     summary TEXT,
+                     proposed_release_note TEXT,
+                     modified TEXT,
+                     PRIMARY KEY (content_hash, position)) WITHOUT ROWID""")
+
+    def __init__(self, path):
+        super().__init__(path, SNAPSHOT_VERSION)
+
+    def contains(self, export_hash):
+        """True if the export with this content hash has already been imported"""
+        row = self.connection.execute("SELECT 1 FROM exports WHERE content_hash = ?", (export_hash,)).fetchone()
+        return row is not None
+
+    def import_export(self, jira_export_file, use_mmap=False):
+        """Import the issues of an export, unless an export with the same content has been imported before.
+        Returns the content hash that identifies the export in the store"""
+        export_hash = content_hash(jira_export_file)
+
+        if self.contains(export_hash):
+            return export_hash
+
+        # Issue key -> (issue type, summary, proposed release note, modified) of the latest copy of each issue in the export,
+        # in the order the issues first appear
+        issues = {}
+
+        for issue_key, issue_type, summary, proposed_release_note, updated, resolved in read_jira_export(jira_export_file, SNAPSHOT_COLUMNS, use_mmap):
+            modified = parse_jira_date(updated) or parse_jira_date(resolved)
+            latest = issues.get(issue_key)
+
+            if latest is None or is_newer(modified, latest[3]):
+                issues[issue_key] = (issue_type, summary, proposed_release_note, modified)
+
+        self.connection.executemany("INSERT INTO export_issues VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    ((export_hash, position, issue_key) + issue for position, (issue_key, issue) in enumerate(issues.items())))
+        self.connection.execute("INSERT INTO exports VALUES (?, ?)", (export_hash, len(issues)))
+        self.connection.commit()
+
+        return export_hash
+
+    def load_issues(self, export_hashes):
+        """Return a dictionary of issue key -> (issue type, summary, proposed release note) for every issue
+        in the given exports, in the order the issues appear in the exports. An issue in several of the exports
+        is the copy that was modified last, or the copy in the later export if that is not known"""
+        latest = {}
+
+        for export_hash in export_hashes:
+            rows = self.connection.execute("""SELECT issue_key, issue_type, summary, proposed_release_note, modified
+                                              FROM export_issues WHERE content_hash = ? ORDER BY position""", (export_hash,))
+
+            for issue_key, issue_type, summary, proposed_release_note, modified in rows:
+                issue = latest.get(issue_key)
+
+                if issue is None or is_newer(modified, issue[3]):
+                    latest[issue_key] = (issue_type, summary, proposed_release_note, modified)
+
+        return {issue_key: issue[:3] for issue_key, issue in latest.items()}
+
+def load_jira_issues(jira_export_files, store_path=None, use_mmap=False):
+    """Return a dictionary of issue key -> (issue type, summary, proposed release note) for the issues in one or more exports.
+
+    With a store_path the exports are loaded through a snapshot store there, so unchanged exports are not parsed again.
+    Without one, a single export is read directly and several exports are merged in a store held in memory.
+    """
+    if store_path is None and len(jira_export_files) == 1:
+        return {issue_key: (issue_type, summary, proposed_release_note)
+                for issue_key, issue_type, summary, proposed_release_note in read_jira_export(jira_export_files[0], use_mmap=use_mmap)}
+
+    with JiraSnapshotStore(store_path or ":memory:") as store:
+        export_hashes = [store.import_export(jira_export_file, use_mmap) for jira_export_file in jira_export_files]
+        return store.load_issues(export_hashes)
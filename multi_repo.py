@@ -0,0 +1,71 @@
+"""Fetch the git logs of several repos in parallel and merge them into a single set of commits.
+
+ The repos are listed in a CSV manifest with the header: repo_loc,repo,source,dest
+ Each repo is walked and parsed in its own process, so the time taken is set by the largest repo
+"""
+
+import csv
+import dataclasses
+import itertools
+
+import output_sinks
+from commit_source import DEFAULT_COMMIT_SOURCE
+from parse_git_log import iter_git_log, collect_git_log, COMMIT_LOG_FILE, COMMIT_LOG_HEADER
+
+@dataclasses.dataclass
+class RepoRange:
+    """Class to hold a range of commits between two tags in one repo"""
+    def __init__(self, repo_loc, repo, source, dest):
+        self.repo_loc = repo_loc
+        self.repo = repo
+        self.source = source
+        self.dest = dest
+
+    def __str__(self):
+        return self.repo + " " + self.source + ".." + self.dest
+
+def load_manifest(manifest_file):
+    """Read the list of repo ranges from a CSV manifest"""
+    with open(manifest_file, 'r', encoding="utf-8", newline='') as input_csv_file:
+        csv_reader = csv.DictReader(input_csv_file)
+
+        return [RepoRange(row['repo_loc'], row['repo'], row['source'], row['dest']) for row in csv_reader]
+
+def fetch_git_log(repo_range, use_cache, backend):
+    """Fetch the (line, GitCommitMessage) entries of the git log of one repo range (runs in a worker process).
+    The commit log is written by the parent process, so the commits of every repo go to one file"""
+    return list(iter_git_log(repo_range.repo_loc, repo_range.repo, repo_range.source, repo_range.dest,
+                             use_cache=use_cache, backend=backend, commit_log=None))
+
+def get_git_logs(repo_ranges, use_cache=False, backend=DEFAULT_COMMIT_SOURCE, jobs=None, commit_log=COMMIT_LOG_FILE, background_writes=False):
+    """Get the content of the git logs of several repo ranges, fetched in parallel.
+    Returns the same (commit dictionary, git log command, git log) as get_git_log, merged across all the repos.
+    The commits of every repo are exported to the commit_log CSV, in manifest order, as get_git_log does for one repo"""
+
+    import concurrent.futures
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(fetch_git_log, repo_ranges, itertools.repeat(use_cache), itertools.repeat(backend)))
+
+    commit_dictionary = {}
+    git_log_commands = []
+    git_logs = []
+
+    # Merge in manifest order, so the output does not depend on which repo finished first
+    with output_sinks.open_sink(commit_log, COMMIT_LOG_HEADER, background_writes) as commit_sink:
+        for repo_range, entries in zip(repo_ranges, results):
+            commit_sink.write_rows((commit.hash, commit.jira_id, commit.comment) for _, commit in entries)
+
+            repo_dictionary, git_log_command, git_log = collect_git_log(entries, repo_range.source, repo_range.dest)
+
+            for jira_id, commits in repo_dictionary.items():
+                commit_dictionary.setdefault(jira_id, []).extend(commits)
+
+            git_log_commands.append(repo_range.repo + ": " + git_log_command)
+            git_logs.append("# " + repo_range.repo + "\n" + git_log)
+
+    return commit_dictionary, "<br>\n".join(git_log_commands), "".join(git_logs)
+
+def describe_versions(versions):
+    """A single version string for a report covering several repos e.g. 'v1.2' or 'v1.2, v3.4'"""
+    return ", ".join(dict.fromkeys(versions))
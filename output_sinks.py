@@ -0,0 +1,119 @@
+"""Sinks for the CSV files the tools export alongside the html, e.g. commitMessages.csv and the review CSV.
+
+ Rows are collected into batches and written with writerows. A sink can hand its batches to a background
+ thread, so writing to disk overlaps with reading and parsing the git log, and a path ending in .gz is
+ written gzip compressed. A path of None gives a sink that discards everything, for exports that are not wanted
+"""
+
+import csv
+import queue
+import threading
+
+# Number of rows written by each writerows call
+SINK_BATCH_SIZE = 1000
+
+# Number of batches that can wait for the background writer before the producer is held up
+SINK_QUEUE_LENGTH = 16
+
+def open_csv_file(path):
+    """Open a CSV file for writing, gzip compressed if the path ends with .gz"""
+    if path.endswith(".gz"):
+        import gzip
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+
+    return open(path, "w", encoding="utf-8", newline="")
+
+class CsvSink:
+    """Class to write rows to a CSV file in batches, optionally from a background thread"""
+    def __init__(self, path, header, background=False, batch_size=SINK_BATCH_SIZE):
+        self.output_file = open_csv_file(path)
+        self.writer = csv.writer(self.output_file, delimiter=',')
+        self.batch_size = batch_size
+        self.batch = []
+        self.queue = None
+        self.thread = None
+        self.error = None
+
+        self.writer.writerow(header)
+
+        if background:
+            self.queue = queue.Queue(SINK_QUEUE_LENGTH)
+            self.thread = threading.Thread(target=self.write_queued_batches, daemon=True)
+            self.thread.start()
+
+    def write_queued_batches(self):
+        """Write the batches handed to the background thread, until the None that marks the end"""
+        while (batch := self.queue.get()) is not None:
+            # Keep draining the queue after an error so the producer is never blocked, and report it on close
+            if self.error is None:
+                try:
+                    self.writer.writerows(batch)
+                except Exception as error:
+                    self.error = error
+
+    def write_batch(self, batch):
+        """Write a batch of rows, or hand it to the background thread"""
+        if self.queue is not None:
+            self.queue.put(batch)
+        else:
+            self.writer.writerows(batch)
+
+    def write(self, row):
+        """Add a row to the current batch, writing the batch once it is full"""
+        self.batch.append(row)
+
+        if len(self.batch) >= self.batch_size:
+            self.write_batch(self.batch)
+            self.batch = []
+
+    def write_rows(self, rows):
+        """Write every row of an iterable (e.g. a generator) in batches"""
+        for row in rows:
+            self.write(row)
+
+    def close(self):
+        """Write any remaining rows, wait for the background thread and close the file"""
+        try:
+            if self.batch:
+                self.write_batch(self.batch)
+                self.batch = []
+
+            if self.thread is not None:
+                self.queue.put(None)
+                self.thread.join()
+                self.thread = None
+        finally:
+            self.output_file.close()
+
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class NullSink:
+    """Class to discard the rows of an export that has been turned off"""
+    def write(self, row):
+        """Discard a row"""
+
+    def write_rows(self, rows):
+        """Discard every row of an iterable"""
+
+    def close(self):
+        """Nothing to close"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_sink(path, header, background=False):
+    """Open a CsvSink for path, or a NullSink if path is None"""
+    if path is None:
+        return NullSink()
+
+    return CsvSink(path, header, background)
@@ -1,132 +1,328 @@
 #For calling Git commands
 import re
 import os
-import dataclasses
-import csv
+import collections
+import contextlib
+import itertools
+
+import commit_cache
+import commit_source
+import instrumentation
+import output_sinks
+import range_manifest
+import sqlite_store
+from records import GitCommitMessage
 
 #
-# GitPython
+# Get the git history from a git log. This code performs the equivalent to a git log --oneline --no-merges <soure>..<destination> to retrieve the history of
+# changes in a code base between two tagged references
 #
-import git
 
-#
-# Class to hold a git commit message of the form: <hash> <jiraId> <comment>
-#
-@dataclasses.dataclass
-class GitCommitMessage:
-    """Class to encapsulate the content of a git log line"""
-    def __init__(self, sha_hash, jira_id, comment):
-        self.hash = sha_hash
-        self.jira_id = jira_id
-        self.comment = comment
+GIT_LOG_OPTIONS = ("--oneline", "--no-merges", "--no-decorate")
 
-    def __str__(self):
-        return "[" + self.hash + "],[" + self.jira_id + "],[" + self.comment + "]"
+# The CSV that every parsed commit is exported to by default, and its header
+COMMIT_LOG_FILE = 'commitMessages.csv'
+COMMIT_LOG_HEADER = ['Hash', 'JiraId', 'Comment']
 
-#
-# Get the git history from a git log. This code performs the equivalent to a git log --oneline --no-merges <soure>..<destination> to retrieve the history of
-# changes in a code base between two tagged references
-#
+# Bump whenever a change to parse_commit_line changes its results, to invalidate previously cached commits
+PARSER_VERSION = 1
 
-#Assumes you have access to the tags (have performed a git fetch of the repo)
-def get_git_log(repo, repo_name, source, destination):
-    """Get the content of the git log from a repo between a source and destination tag"""
+# Number of lines parsed by a worker process at a time when parsing in parallel. Large, so the cost of passing
+# the lines to a worker and the parsed fields back is spread over a lot of parsing
+PARSE_CHUNK_SIZE = 20000
 
-    write_git_log = True
-    commit_dictionary = {}
+def build_git_log_command(source, destination):
+    """Build the git log command line that is shown in the rendered notes"""
+    return 'git log ' + ' '.join(GIT_LOG_OPTIONS) + ' ' + source + '..' + destination + '\n'
+
+def open_repo(repo, repo_name, backend=commit_source.DEFAULT_COMMIT_SOURCE):
+    """Open the git repo named repo_name that is found under the repo location, with the named commit source backend"""
 
     #Location of the repo
     repo_directory = os.path.join(os.path.abspath(repo), repo_name)
 
-    #TODO: Handle errors when unable to retreive the git log
+    return commit_source.open_commit_source(repo_directory, backend)
 
-    #Set the repo
-    repo = git.Repo(repo_directory)
+def iter_git_log_lines(repo, source, destination):
+    """Yield the lines of a git log between a source and destination tag, one at a time, as they are read"""
 
     #
     # Equivalent to: git log --oneline --nomerges --no-decorate <source>..<dest>
+    # Read incrementally rather than buffering the whole log, so memory use does not grow with the size of the range
     #
-    logs = repo.git.log("--oneline", "--no-merges", "--no-decorate", source + ".." + destination)
-    lines = logs.splitlines()
-    full_log = ''
+    for _, line in repo.iter_log(source, destination):
+        yield line
 
-    git_log_command = 'git log --oneline --no-merges --no-decorate ' + source + '..' + destination + '\n'
+def stream_git_log(repo, repo_name, source, destination, backend=commit_source.DEFAULT_COMMIT_SOURCE):
+    """Yield a GitCommitMessage for each commit between a source and destination tag"""
+    with open_repo(repo, repo_name, backend) as commits:
+        yield from split_commit_messages(iter_git_log_lines(commits, source, destination))
+
+def iter_cached_git_log(repo, source, destination, cache, manifests):
+    """Yield a tuple of (line, GitCommitMessage) for each commit between a source and destination tag.
+    Segments of the range that have been resolved before are read from their manifests, only the remaining
+    segments are walked, and only the commits that are not already in the cache are parsed"""
+
+    source_sha = repo.resolve(source)
+    destination_sha = repo.resolve(destination)
+
+    segments = range_manifest.plan_range(repo, manifests, source_sha, destination_sha)
+    start, end, shas = segments[0]
+
+    # The shas of the whole range, and the stored segments that are still to be read
+    range_shas = []
+    stored_segments = segments
+
+    if shas is None:
+        if len(segments) == 1:
+            is_linear = yield from iter_cached_git_log_segment(repo, start, end, cache, range_shas)
+            manifests.store(start, end, repo.is_ancestor(start, end), is_linear, range_shas)
+            return
+
+        #
+        # The newest segment still has to be walked. The stored segments only follow it in git log's order if it
+        # is linear as well, so hold its commits back until the walk shows whether it has any merges
+        #
+        walk = iter_cached_git_log_segment(repo, start, end, cache, range_shas)
+        walked = []
+        try:
+            while True:
+                walked.append(next(walk))
+        except StopIteration as finished:
+            is_linear = finished.value
+
+        manifests.store(start, end, repo.is_ancestor(start, end), is_linear, range_shas)
+
+        # A merge can bring in commits older than those of the stored segments, which git log interleaves
+        # with them by date, so walk the whole range instead
+        if not is_linear:
+            range_shas = []
+            is_linear = yield from iter_cached_git_log_segment(repo, source_sha, destination_sha, cache, range_shas)
+            manifests.store(source_sha, destination_sha, repo.is_ancestor(source_sha, destination_sha), is_linear, range_shas)
+            return
+
+        yield from walked
+        stored_segments = segments[1:]
+
+    for start, end, shas in stored_segments:
+        for batch_start in range(0, len(shas), sqlite_store.LOOKUP_BATCH_SIZE):
+            batch = shas[batch_start:batch_start + sqlite_store.LOOKUP_BATCH_SIZE]
+            yield from resolve_cached_commits(repo, [(sha, None) for sha in batch], cache)
+
+        range_shas.extend(shas)
+
+    # Remember a range that was chained together from several segments, so it is a single lookup next time
+    if len(segments) > 1:
+        manifests.store(source_sha, destination_sha, True, True, range_shas)
+
+def iter_cached_git_log_segment(repo, start, end, cache, walked_shas):
+    """Walk start..end, yielding (line, GitCommitMessage) for each commit and recording its sha in walked_shas.
+    Merges are left out as git log --no-merges does (which lists the other commits in the same order).
+    Returns True if the segment is linear, i.e. there were no merges to leave out"""
+
+    batch = []
+    is_linear = True
+
+    for sha, parents, line in repo.iter_graph(start, end):
+        if len(parents) > 1:
+            is_linear = False
+            continue
+
+        batch.append((sha, line))
+        walked_shas.append(sha)
+
+        if len(batch) == sqlite_store.LOOKUP_BATCH_SIZE:
+            yield from resolve_cached_commits(repo, batch, cache)
+            batch = []
+
+    yield from resolve_cached_commits(repo, batch, cache)
+
+    return is_linear
+
+def resolve_cached_commits(repo, entries, cache):
+    """Resolve a batch of (sha, line) entries against the cache, parsing and storing any that are missing.
+    The line can be None when it is not known, in which case it is read from the repo if the commit is not cached"""
+
+    cached = cache.lookup(sha for sha, _ in entries)
+
+    unknown_shas = [sha for sha, line in entries if line is None and sha not in cached]
+    unknown_lines = repo.read_lines(unknown_shas) if unknown_shas else {}
+
+    resolved = []
+    new_records = []
+
+    for sha, line in entries:
+        if sha in cached:
+            line, sha_hash, jira_id, comment = cached[sha]
+            resolved.append((line, GitCommitMessage(sha_hash, jira_id, comment)))
+        else:
+            if line is None:
+                line = unknown_lines[sha]
+            fields = parse_commit_line(line)
+            new_records.append((sha, line) + fields)
+            resolved.append((line, GitCommitMessage(*fields)))
 
-    # Parse out all the commits into a list
-    commits = []
-    for line in lines:
-        commit = split_commit_message(line)
-        commits.append(commit)
-        full_log += line + '\n'
+    if new_records:
+        cache.store(new_records)
 
-        # There can be multiple commit messages per Jira id. Collect the commit messages in a list
-        if(commit.jira_id in commit_dictionary):
-            commit_dictionary[commit.jira_id].append(commit)
-        else:
-            commit_dictionary[commit.jira_id] = [commit]
+    return resolved
+
+#Assumes you have access to the tags (have performed a git fetch of the repo)
+def iter_git_log(repo, repo_name, source, destination, use_cache=False, backend=commit_source.DEFAULT_COMMIT_SOURCE,
+                 commit_log=COMMIT_LOG_FILE, background_writes=False, parse_jobs=1):
+    """Yield a tuple of (line, GitCommitMessage) for each commit from a repo between a source and destination tag,
+    as the commits are read. Takes the same options as get_git_log"""
+
+    #TODO: Handle errors when unable to retreive the git log
 
     # Optionally write all the commits into a CSV file of the form: <Hash>, <Jira_id>, <comment>
-    if write_git_log:
+    with contextlib.ExitStack() as stack:
+        #Set the repo
+        repo = stack.enter_context(open_repo(repo, repo_name, backend))
 
-        with open('commitMessages.csv', 'w', newline='') as csvfile:
-            commit_writer = csv.writer(csvfile, delimiter=',')
-            commit_writer.writerow(['Hash', 'JiraId', 'Comment'])
+        commit_sink = stack.enter_context(output_sinks.open_sink(commit_log, COMMIT_LOG_HEADER, background_writes))
 
-            for commit in commits:
-                commit_writer.writerow([commit.hash, commit.jira_id, commit.comment])
+        if use_cache:
+            cache = stack.enter_context(commit_cache.CommitCache(commit_cache.cache_path(repo), PARSER_VERSION))
+            manifests = stack.enter_context(range_manifest.RangeManifests(range_manifest.manifest_path(repo)))
+            entries = iter_cached_git_log(repo, source, destination, cache, manifests)
+        else:
+            # When profiling, time reading from the commit source apart from parsing
+            lines = instrumentation.metrics.timed_iterator("commit source", iter_git_log_lines(repo, source, destination))
+
+            if parse_jobs > 1:
+                entries = iter_parallel_parse(lines, parse_jobs)
+            else:
+                entries = ((line, split_commit_message(line)) for line in lines)
+
+        # Parse each commit as it is read from git, rather than collecting the whole log first
+        for line, commit in entries:
+            commit_sink.write((commit.hash, commit.jira_id, commit.comment))
+
+            yield line, commit
+
+def get_git_log(repo, repo_name, source, destination, use_cache=False, backend=commit_source.DEFAULT_COMMIT_SOURCE,
+                commit_log=COMMIT_LOG_FILE, background_writes=False, parse_jobs=1):
+    """Get the content of the git log from a repo between a source and destination tag.
+    Optionally cache the parsed commits and the resolved range in the repo's .git directory, so later runs
+    only parse new commits and only walk the parts of the range that have not been resolved before.
+    The backend names the commit source used to read the history (see commit_source.COMMIT_SOURCES).
+    Every commit is also exported to the commit_log CSV (gzip compressed if it ends with .gz, not written if None),
+    from a background thread if background_writes is set.
+    With parse_jobs above 1 the commits read from git are parsed by that many processes (not used with the cache,
+    which only parses the commits it has not seen before), giving the same results as parsing them one by one"""
+    return collect_git_log(iter_git_log(repo, repo_name, source, destination, use_cache, backend, commit_log, background_writes, parse_jobs),
+                           source, destination)
+
+def collect_git_log(entries, source, destination):
+    """Collect (line, GitCommitMessage) entries of the range source..destination into the
+    (commit dictionary, git log command, git log) returned by get_git_log"""
+    commit_dictionary = {}
+    log_lines = []
 
-    return commit_dictionary, git_log_command, full_log
+    for line, commit in entries:
+        log_lines.append(line)
 
+        # There can be multiple commit messages per Jira id. Collect the commit messages in a list
+        commit_dictionary.setdefault(commit.jira_id, []).append(commit)
 
-def split_commit_message(git_commit_line):
-    """parse the git commit message to extract the hash, jira_id and message from git log entry"""
+    full_log = ''.join(line + '\n' for line in log_lines)
 
-    sha_regex = r"([a-f0-9]{6,120})"
-    sha_match = re.findall(sha_regex, git_commit_line)
+    return commit_dictionary, build_git_log_command(source, destination), full_log
 
-    #Didn't even find the sha hash, return an empty string
-    if(len(sha_match) == 0):
-        return GitCommitMessage("", "UNKNOWN", git_commit_line)
+def add_git_range_arguments(parser, required=True):
+    """Add the options that choose a range of a git repo, and how its log is read and exported, to a tool's argument parser.
+    The repo and range are optional when a tool can take them some other way"""
+    parser.add_argument('-l','--repo_loc', type=str, help='Location of a git repo to search history in', required=required)
+    parser.add_argument('-r','--repo', type=str, help='The name of the git repo in which to search the history', required=required)
+    parser.add_argument('-s','--source', type=str, help='Git tag of starting range to search in git', required=required)
+    parser.add_argument('-d','--dest', type=str, help='Git tag of destination to search in git', required=required)
+    parser.add_argument('-c','--cache', action='store_true', help='Cache parsed commits and resolved ranges in the .git directory of the repo so later runs only parse and walk new commits')
+    parser.add_argument('-b','--backend', type=str, choices=sorted(commit_source.COMMIT_SOURCES), default=commit_source.DEFAULT_COMMIT_SOURCE, help='How to read the history of the git repo')
+    parser.add_argument('-w','--commit_log', type=str, default=COMMIT_LOG_FILE, help='CSV file to export every parsed commit to (gzip compressed if it ends with .gz)')
+    parser.add_argument('-n','--no_commit_log', action='store_true', help='Do not export the parsed commits to a CSV file')
+    parser.add_argument('-g','--background_writes', action='store_true', help='Write the CSV exports from a background thread, so writing to disk overlaps with parsing')
+    parser.add_argument('--parse_jobs', type=int, default=1, help='Number of processes to parse the commits read from git with (not used with --cache)')
 
-    #Trim off the sha1
-    commit_message = git_commit_line.removeprefix(sha_match[0])
 
-    #Try to match the jira id and the commit message
-    regex = r"([\s]([a-zA-Z0-9]+-[0-9]+)(.+))"
-    match = re.findall(regex, commit_message)
+#
+# Precompiled patterns for parsing a line of the git log of the form: <hash> <jiraId> <comment>
+#
+
+# The sha hash at the start of the line
+SHA_PATTERN = re.compile(r"[a-f0-9]{6,120}")
+
+# The first jira id in the message, either well formed (ABC-123) or using the common mistake of
+# replacing the '-' with a ':' (ABC:123, which must be followed by whitespace). Both forms are
+# alternatives of one pattern so that whichever jira id appears first in the message is matched
+JIRA_ID_PATTERN = re.compile(r"\s(?:([a-zA-Z0-9]+)-([0-9]+)(.+)|([a-zA-Z0-9]+):([0-9]+)\s(.+))")
 
-    #Did not find the jira id from the regex
-    if(len(match) == 0):
+def parse_commit_line(git_commit_line):
+    """parse a git log entry into a tuple of (hash, jira_id, message)"""
 
-        #Its a common mistake to replace the '-' with a ':' in the jira-id, try to match this instead
-        alternative_regex = r"([\s]([a-zA-Z0-9]+:[0-9]+)[\s](.+))"
-        alternative_match = re.findall(alternative_regex, commit_message)
-        commit_message = trim_excess_prefix_characters(commit_message)
+    sha_match = SHA_PATTERN.search(git_commit_line)
 
-        #Didn't match any style of malformed jira-id's (jira-id is missing)
-        if(len(alternative_match) == 0):
-            return GitCommitMessage(sha_match[0], "UNKNOWN", commit_message)
+    #Didn't even find the sha hash, return an empty string
+    if sha_match is None:
+        return ("", "UNKNOWN", git_commit_line)
 
-        #Fix up the jira-id by replacing the incorrect characters
-        fixed_jira_id = alternative_match[0][1]
-        fixed_jira_id = fixed_jira_id.replace(':', '-')
-        commit_message = trim_excess_prefix_characters(alternative_match[0][2])
+    sha = sha_match.group()
+
+    #Trim off the sha1
+    commit_message = git_commit_line[sha_match.end():] if sha_match.start() == 0 else git_commit_line
 
-        return GitCommitMessage(sha_match[0], fixed_jira_id, commit_message)
+    match = JIRA_ID_PATTERN.search(commit_message)
 
-    #Alternatively, found a tuple of the matched ranges
-    tuple_of_matches = match[0]
+    #Didn't match any style of jira-id (jira-id is missing)
+    if match is None:
+        return (sha, "UNKNOWN", trim_excess_prefix_characters(commit_message))
 
-    if(len(tuple_of_matches) != 3):
-        print("Did not match the regex - wrong tuple size")
-        print(commit_message)
-        return GitCommitMessage("UNKNOWN", "UNKNOWN", "UNKNOWN")
-    else:
-        sha = sha_match[0]
-        jira_id = tuple_of_matches[1]
-        message = trim_excess_prefix_characters(tuple_of_matches[2])
+    project, number, message = match.group(1, 2, 3)
 
-    return GitCommitMessage(sha, jira_id, message)
+    #Fix up a malformed jira-id by replacing the incorrect characters
+    if project is None:
+        project, number, message = match.group(4, 5, 6)
+
+    return (sha, project + "-" + number, trim_excess_prefix_characters(message))
+
+def split_commit_message(git_commit_line):
+    """parse the git commit message to extract the hash, jira_id and message from git log entry"""
+    return GitCommitMessage(*parse_commit_line(git_commit_line))
+
+def split_commit_messages(git_commit_lines):
+    """parse a list (or any iterable) of git log entries, yielding a GitCommitMessage for each"""
+    for git_commit_line in git_commit_lines:
+        yield GitCommitMessage(*parse_commit_line(git_commit_line))
+
+def parse_commit_lines(git_commit_lines):
+    """parse a chunk of git log entries into a list of (hash, jira_id, message) tuples (runs in a worker process).
+    Plain tuples are passed back, as they are much cheaper to pickle than GitCommitMessage instances"""
+    return [parse_commit_line(git_commit_line) for git_commit_line in git_commit_lines]
+
+def iter_parallel_parse(git_commit_lines, jobs, chunk_size=PARSE_CHUNK_SIZE):
+    """Yield (line, GitCommitMessage) for each of an iterable of git log entries, parsing chunks of them in a pool of
+    jobs processes while more are read. The commits are yielded in the order of the entries, as the serial parser would"""
+    import concurrent.futures
+
+    git_commit_lines = iter(git_commit_lines)
+    pending = collections.deque()
+
+    def finish_chunk():
+        chunk, parsed = pending.popleft()
+        for line, fields in zip(chunk, parsed.result()):
+            # Built here rather than in the worker, so the issue keys are interned in this process
+            yield line, GitCommitMessage(*fields)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        while chunk := list(itertools.islice(git_commit_lines, chunk_size)):
+            pending.append((chunk, executor.submit(parse_commit_lines, chunk)))
+
+            # Keep every worker busy, without reading arbitrarily far ahead of the chunks that have been parsed
+            if len(pending) > jobs * 2:
+                yield from finish_chunk()
+
+        while pending:
+            yield from finish_chunk()
 
 def trim_excess_prefix_characters(message):
     """trim any leading ':' or '-' characters, or whitespace"""
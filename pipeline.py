@@ -0,0 +1,143 @@
+"""Run the stages of a tool concurrently, each on its own thread, and time them.
+
+ A stage is started with run(), which returns a Future. Any Futures passed as arguments are waited for
+ before the stage starts, so independent stages (e.g. reading the Jira export and walking the git log)
+ run at the same time and dependent stages start as soon as their inputs are ready. stream() runs a
+ producer on its own thread and passes its items to the consumer in batches through a bounded queue, so
+ downstream stages work on records as they arrive without the producer running arbitrarily far ahead.
+"""
+
+import concurrent.futures
+import dataclasses
+import queue
+import threading
+import time
+
+# Number of items passed between streamed stages at a time
+STREAM_BATCH_SIZE = 500
+
+# Number of batches a producer can get ahead of its consumer
+STREAM_QUEUE_LENGTH = 16
+
+# How often a blocked producer or consumer checks whether the pipeline has been cancelled
+PUT_TIMEOUT = 0.1
+
+# Marks the end of a stream
+END_OF_STREAM = object()
+
+@dataclasses.dataclass
+class StageTiming:
+    """Class to hold the time a stage spent running, and the number of items it streamed"""
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.items = None
+
+class StreamFailed:
+    """Class to pass the exception that stopped a producer to its consumer"""
+    def __init__(self, error):
+        self.error = error
+
+class Pipeline:
+    """Class to run and time the stages of a tool"""
+    def __init__(self):
+        self.timings = []
+        self.threads = []
+        self.cancelled = threading.Event()
+
+    def start_thread(self, name, target):
+        """Run target on a new thread for a stage"""
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        self.threads.append(thread)
+        thread.start()
+
+    def run(self, name, function, *args):
+        """Run function(*args) as a stage once any Futures in args have results, returning a Future of its result"""
+        future = concurrent.futures.Future()
+        timing = StageTiming(name)
+        self.timings.append(timing)
+
+        def stage():
+            try:
+                inputs = [arg.result() if isinstance(arg, concurrent.futures.Future) else arg for arg in args]
+
+                # Time the stage itself, not the wait for its inputs
+                start = time.perf_counter()
+                result = function(*inputs)
+                timing.seconds = time.perf_counter() - start
+
+                future.set_result(result)
+            except BaseException as error:
+                future.set_exception(error)
+
+        self.start_thread(name, stage)
+        return future
+
+    def stream(self, name, items, batch_size=STREAM_BATCH_SIZE, queue_length=STREAM_QUEUE_LENGTH):
+        """Iterate over items on a producer stage, returning an iterator over them for a consumer stage"""
+        batches = queue.Queue(queue_length)
+        timing = StageTiming(name)
+        timing.items = 0
+        self.timings.append(timing)
+
+        def put(batch):
+            """Queue a batch, returning False if the pipeline has been cancelled while waiting for room"""
+            while not self.cancelled.is_set():
+                try:
+                    batches.put(batch, timeout=PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            start = time.perf_counter()
+            batch = []
+
+            try:
+                for item in items:
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        timing.items += len(batch)
+                        if not put(batch):
+                            return
+                        batch = []
+
+                timing.items += len(batch)
+                put(batch)
+                put(END_OF_STREAM)
+            except BaseException as error:
+                put(StreamFailed(error))
+            finally:
+                timing.seconds = time.perf_counter() - start
+
+        def consume():
+            while True:
+                try:
+                    batch = batches.get(timeout=PUT_TIMEOUT)
+                except queue.Empty:
+                    # A cancelled producer stops without ending the stream, so stop waiting for it
+                    if self.cancelled.is_set():
+                        raise concurrent.futures.CancelledError(name + " was cancelled")
+                    continue
+
+                if batch is END_OF_STREAM:
+                    return
+                if isinstance(batch, StreamFailed):
+                    raise batch.error
+                yield from batch
+
+        self.start_thread(name, produce)
+        return consume()
+
+    def close(self):
+        """Stop any producers and consumers that are still waiting for each other, and wait for every stage to finish"""
+        self.cancelled.set()
+        for thread in self.threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
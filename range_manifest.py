@@ -0,0 +1,93 @@
+"""Persistent manifests of the commits resolved for each git range.
+
+ A manifest records the shas found between a source and destination commit. Manifests of linear
+ ranges can be chained: A..C is B..C followed by A..B as long as A is an ancestor of B, B is an
+ ancestor of C and neither range has a merge. So a roll-up range only needs git to walk the
+ segments that have not been resolved before.
+
+ Only linear ranges are chained because git log lists the commits of a range by commit date. When a
+ merge brings in commits from a side branch, those can be older than commits of the earlier range,
+ and git log interleaves them rather than listing one range after the other. Without merges the
+ range is a single chain of parents, which git log lists in order whatever the dates
+"""
+
+import os
+
+from sqlite_store import SQLiteStore
+
+# Bump whenever the commits selected for a range change (e.g. the git log options), to discard old manifests
+MANIFEST_VERSION = 2
+
+def manifest_path(repo):
+    """Location of the range manifests for a GitPython repo"""
+    return os.path.join(repo.git_dir, 'release_notes', 'range_manifests.sqlite')
+
+class RangeManifests(SQLiteStore):
+    """Class to store the shas (newest first) resolved for a range of commits, keyed by the range's start and end shas"""
+    TABLES = ("manifests",)
+    SCHEMA = ("""CREATE TABLE IF NOT EXISTS manifests (
+                     source TEXT,
+                     destination TEXT,
+                     is_ancestor INTEGER,
+                     is_linear INTEGER,
+                     commit_count INTEGER,
+                     shas TEXT,
+                     PRIMARY KEY (source, destination))""",)
+
+    def __init__(self, path):
+        super().__init__(path, MANIFEST_VERSION)
+
+    def lookup(self, source, destination):
+        """Return the list of shas in source..destination, or None if the range has not been resolved"""
+        row = self.connection.execute("SELECT shas FROM manifests WHERE source = ? AND destination = ?",
+                                      (source, destination)).fetchone()
+        if row is None:
+            return None
+
+        return row[0].split() if row[0] else []
+
+    def ranges_from(self, source):
+        """Return the destinations of ranges starting at source that can be chained (largest range first)"""
+        rows = self.connection.execute("""SELECT destination FROM manifests
+                                          WHERE source = ? AND is_ancestor = 1 AND is_linear = 1 AND destination != source
+                                          ORDER BY commit_count DESC""", (source,))
+        return [destination for (destination,) in rows]
+
+    def store(self, source, destination, is_ancestor, is_linear, shas):
+        """Store the list of shas resolved for source..destination. is_linear is True if the range has no merges"""
+        self.connection.execute("INSERT OR REPLACE INTO manifests VALUES (?, ?, ?, ?, ?, ?)",
+                                (source, destination, int(is_ancestor), int(is_linear), len(shas), "\n".join(shas)))
+        self.connection.commit()
+
+def plan_range(repo, manifests, source, destination):
+    """Split the range source..destination (both full shas) into segments of (start, end, shas), newest first.
+    shas is the list of stored shas for a segment, or None for a segment that git still has to walk.
+    Only the stored linear ranges are chained, so the segments only match a walk of the whole range if the
+    segment left to walk turns out to be linear too"""
+
+    stored = manifests.lookup(source, destination)
+    if stored is not None:
+        return [(source, destination, stored)]
+
+    segments = []
+    current = source
+
+    #
+    # Chain stored linear manifests forward from the source for as long as each one ends at an ancestor of the destination
+    #
+    while current != destination:
+        for end in manifests.ranges_from(current):
+            if end == destination or repo.is_ancestor(end, destination):
+                segments.append((current, end, manifests.lookup(current, end)))
+                current = end
+                break
+        else:
+            break
+
+    #Walk whatever is left between the end of the chain and the destination
+    if current != destination:
+        segments.append((current, destination, None))
+
+    segments.reverse()
+
+    return segments
@@ -0,0 +1,102 @@
+"""The records shared by the release note tools: commits from git, issues exported from Jira, the
+ reviewed release notes and the entries consolidated from all of them.
+
+ There is a record for every commit and every Jira issue in a release, so each class declares __slots__
+ rather than carrying a __dict__ per instance, and the values that repeat across many records (issue
+ keys, issue types, statuses...) are interned so every record shares a single copy of each string.
+"""
+
+import dataclasses
+import sys
+
+def intern(value):
+    """Intern a string that is shared by many records, passing through None for a missing CSV column"""
+    return None if value is None else sys.intern(value)
+
+#
+# Class to hold a git commit message of the form: <hash> <jiraId> <comment>
+#
+@dataclasses.dataclass
+class GitCommitMessage:
+    """Class to encapsulate the content of a git log line"""
+    __slots__ = ("hash", "jira_id", "comment")
+
+    def __init__(self, sha_hash, jira_id, comment):
+        self.hash = sha_hash
+        self.jira_id = intern(jira_id)
+        self.comment = comment
+
+    def __str__(self):
+        return "[" + self.hash + "],[" + self.jira_id + "],[" + self.comment + "]"
+
+@dataclasses.dataclass
+class JiraExportQueryEntry:
+    """Class to Ingest the content of a JQL query (for all issues in a release) from a CSV file"""
+
+# CSV Header:
+#Issue Type^Issue key^Issue id^Parent id^Summary^Resolution^Resolved^Custom field (Closed Date)^Custom field (ID)^Assignee^Reporter^Priority^Created^Status^Fix Version/s^Custom field (Proposed Release Notes)
+#Note this CSV export uses the '^' delimiter to avoid having to worry about handling ',' in comment fields
+
+    __slots__ = ("issue_type", "issue_key", "issue_id", "parent", "summary", "resolution", "resolved", "closed_date", "id",
+                 "assignee", "reporter", "priority", "created", "status", "fix_version", "proposed_release_note")
+
+    def __init__(self, **kwargs):
+        self.issue_type = intern(kwargs.get('Issue Type'))
+        self.issue_key = intern(kwargs.get('Issue key'))
+        self.issue_id = kwargs.get('Issue id')
+        self.parent = kwargs.get('Parent id')
+        self.summary = kwargs.get('Summary')
+        self.resolution = intern(kwargs.get('Resolution'))
+        self.resolved = kwargs.get('Resolved')
+        self.closed_date = kwargs.get('Custom field (Closed Date)')
+        self.id = kwargs.get('Custom field (ID)')
+        self.assignee = intern(kwargs.get('Assignee'))
+        self.reporter = intern(kwargs.get('Reporter'))
+        self.priority = intern(kwargs.get('Priority'))
+        self.created = kwargs.get('Created')
+        self.status = intern(kwargs.get('Status'))
+        self.fix_version = intern(kwargs.get('Fix Version/s'))
+        self.proposed_release_note = kwargs.get('Custom field (Proposed Release Notes)')
+
+    def __str__(self):
+        return self.issue_key + " " + self.issue_type + " " + self.summary
+
+@dataclasses.dataclass
+class ReleaseNoteDataImport:
+    """Class to Import the modified content of the release notes for converting to HTML"""
+# CSV Header:
+# Issue_Type,Issue_key,Issue_id,Parent_id,Summary,Resolution,Resolved,Closed_Date),ID,Assignee,Reporter,Priority,Created,Release_Note,Status,Fix_Version,Proposed_Release_Notes,Actual_Release_Note,
+
+    __slots__ = ("jira_id", "issue_type", "in_jira", "in_git", "jira_comment", "git_comment", "proposed_release_note",
+                 "take", "actual_release_note")
+
+    def __init__(self, **kwargs):
+        self.jira_id = intern(kwargs.get('JiraId'))
+        self.issue_type = intern(kwargs.get('IssueType'))
+        self.in_jira = intern(kwargs.get('InJira'))
+        self.in_git = intern(kwargs.get('InGit'))
+        self.jira_comment = kwargs.get('Jira Comment')
+        self.git_comment = kwargs.get('Git Comment')
+        self.proposed_release_note = kwargs.get('ProposedReleaseNote')
+        self.take = intern(kwargs.get('Take'))
+        self.actual_release_note = kwargs.get('ActualReleaseNote')
+
+    def __str__(self):
+        return self.jira_id + " " + self.issue_type + " " + self.jira_comment + " " + self.actual_release_note
+
+@dataclasses.dataclass
+class ConsolidatedEntry:
+    """Class to represent data that is consolidated between git and jira"""
+    __slots__ = ("jira_id", "found_in_jira", "found_in_git", "jira_comment", "issue_type", "git_comment", "release_note")
+
+    def __init__(self, jira_id, found_in_jira, found_in_git, jira_comment, issue_type, git_comment, release_note):
+        self.jira_id = intern(jira_id)
+        self.found_in_jira = found_in_jira
+        self.found_in_git = found_in_git
+        self.jira_comment = jira_comment
+        self.issue_type = intern(issue_type)
+        self.git_comment = git_comment
+        self.release_note = release_note
+
+    def __str__(self):
+        return self.found_in_jira + " " + self.found_in_git + " " + self.jira_comment + " " + self.issue_type + " " + self.git_comment + " " + self.release_note
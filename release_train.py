@@ -0,0 +1,92 @@
+"""Fetch the git logs of every consecutive pair of tags in a release train (e.g. 25.1.1 -> 25.1.2 -> ... -> 25.1.40)
+ from a single walk of the history.
+
+ The whole train, first..last, is read once with the commit source's iter_graph, and each commit is assigned
+ to the first tag of the train that contains it: the tags are taken in order, and the commits reachable from
+ a tag that are not reachable from the first tag, and have not been assigned to an earlier tag, are the
+ commits of the range ending at that tag. Every commit is read, parsed and assigned once, so the cost is
+ that of the single walk over first..last, however many tags the train has.
+
+ The commits assigned to a tag are the range from the previous tag only when every tag of the train is an
+ ancestor of the next one, so each pair of tags is checked before the walk and a train whose tags are not in
+ that order is rejected, naming the first pair that is not.
+"""
+
+import contextlib
+
+from parse_git_log import open_repo, split_commit_message, build_git_log_command, COMMIT_LOG_FILE, COMMIT_LOG_HEADER
+from commit_source import DEFAULT_COMMIT_SOURCE
+from output_sinks import open_sink
+
+def assign_commits(parents, tag_shas):
+    """Map each commit of a graph of sha -> parent shas to the index of the first of tag_shas it is reachable from.
+    The graph is the range first..last, so commits that are not in it are reachable from the first tag and are not assigned"""
+    assigned = {}
+
+    for index, tag_sha in enumerate(tag_shas):
+        stack = [tag_sha]
+
+        while stack:
+            sha = stack.pop()
+            if sha in assigned or sha not in parents:
+                continue
+
+            assigned[sha] = index
+            stack.extend(parents[sha])
+
+    return assigned
+
+def get_release_train(repo, repo_name, tags, backend=DEFAULT_COMMIT_SOURCE, commit_log=COMMIT_LOG_FILE, background_writes=False, roll_up=False):
+    """Get the content of the git log between each consecutive pair of an ordered list of tags, with a single walk of the history.
+
+    Returns a list of (source, destination, commit dictionary, git log command, git log) for each pair, with the same
+    commit dictionary, command and log as get_git_log would give for that pair, followed by the same for the whole
+    train (first..last) if roll_up is set. Every commit of the train is exported once to the commit_log CSV.
+    Raises a ValueError if a tag is not an ancestor of the next one.
+    """
+    if len(tags) < 2:
+        raise ValueError("A release train needs at least two tags")
+
+    with contextlib.ExitStack() as stack:
+        commits = stack.enter_context(open_repo(repo, repo_name, backend))
+        commit_sink = stack.enter_context(open_sink(commit_log, COMMIT_LOG_HEADER, background_writes))
+
+        first_sha, *tag_shas = commits.resolve_many(tags)
+
+        for source, destination, source_sha, destination_sha in zip(tags, tags[1:], [first_sha] + tag_shas, tag_shas):
+            if not commits.is_ancestor(source_sha, destination_sha):
+                raise ValueError(source + " is not an ancestor of " + destination + ", so the release train cannot be split between them")
+
+        # Every commit of the train, newest first, with the parents of each (merges included, as they join the history)
+        parents = {}
+        log_entries = []
+
+        for sha, commit_parents, line in commits.iter_graph(first_sha, tag_shas[-1]):
+            parents[sha] = commit_parents
+            if len(commit_parents) <= 1:
+                commit = split_commit_message(line)
+                commit_sink.write((commit.hash, commit.jira_id, commit.comment))
+                log_entries.append((sha, line, commit))
+
+    assigned = assign_commits(parents, tag_shas)
+
+    # Gather each pair's commits (and the roll-up's) in git log order, as get_git_log does
+    ranges = [({}, []) for _ in tag_shas]
+    roll_up_dictionary = {}
+
+    for sha, line, commit in log_entries:
+        commit_dictionary, log_lines = ranges[assigned[sha]]
+        commit_dictionary.setdefault(commit.jira_id, []).append(commit)
+        log_lines.append(line)
+
+        if roll_up:
+            roll_up_dictionary.setdefault(commit.jira_id, []).append(commit)
+
+    train = [(source, destination, commit_dictionary, build_git_log_command(source, destination), ''.join(line + '\n' for line in log_lines))
+             for source, destination, (commit_dictionary, log_lines) in zip(tags, tags[1:], ranges)]
+
+    if roll_up:
+        train.append((tags[0], tags[-1], roll_up_dictionary, build_git_log_command(tags[0], tags[-1]),
+                      ''.join(line + '\n' for _, line, _ in log_entries)))
+
+    return train
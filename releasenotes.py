@@ -0,0 +1,39 @@
+"""releasenotes - a single entry point for the release note tools, each run as a command:
+
+   python releasenotes.py release ...      (release_note_generator.py)
+   python releasenotes.py engineering ...  (engineering_note_generator.py)
+   python releasenotes.py jql ...          (issue_list_from_git_log.py)
+   python releasenotes.py index ...        (issue_index.py)
+
+ Only the module of the command being run is imported, once the command has been picked, so e.g. jql does
+ not import the Jira export, SQLite or html rendering code used by release, and --help imports none of them.
+ The arguments after the command are handed to that tool's main() unchanged.
+"""
+
+import argparse
+import importlib
+
+# Command -> (module whose main() runs it, description)
+COMMANDS = {
+    "release": ("release_note_generator", "Pull the git and Jira data together for review, and render the sanitised release notes"),
+    "engineering": ("engineering_note_generator", "Pretty print the git log between two tags to html"),
+    "jql": ("issue_list_from_git_log", "Build JQL queries for the Jira issues changed between two tags"),
+    "index": ("issue_index", "Update the index of jira ids to commits and tags, and look up which release contains an issue"),
+}
+
+def describe_commands():
+    """A line per command, for the help"""
+    return "commands:\n" + "".join(f"  {command:<14}{description}\n" for command, (_, description) in COMMANDS.items())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="releasenotes", epilog=describe_commands(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='The tool to run. See releasenotes <command> --help for its options')
+    parser.add_argument('arguments', nargs=argparse.REMAINDER, help='Options for the command')
+    args = parser.parse_args(argv)
+
+    module_name, _ = COMMANDS[args.command]
+    module = importlib.import_module(module_name)
+    module.main(args.arguments, prog="releasenotes " + args.command)
+
+if __name__ == "__main__":
+    main()
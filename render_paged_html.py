@@ -0,0 +1,352 @@
+"""Render engineering notes as a small index page plus chunks of data loaded on demand, for ranges whose
+ single html file would be too big for a browser to open.
+
+ notes.html is written with the header, the JQL and a manifest of the chunks, and the rows are written to
+ notes_files/ beside it, page_size rows to a chunk: issues-00000.js, issues-00001.js... for the table of issues
+ and log-00000.js... for the lines of the git log. Each chunk is a JSON array of rows wrapped in a call,
+
+   releaseNotesChunk("issues", 0, [["ABC-1", "<a href=...>ABC-1</a>", "Summary"], ...]);
+
+ so that it is loaded with a <script> tag, which (unlike fetching a .json file) browsers allow for pages opened
+ from the file system. The page only loads the chunks of the rows scrolled into view, and only creates elements
+ for those rows, so it opens as quickly for a million commits as for ten. Searching loads the chunks of issues
+ one at a time, filtering the table as each one arrives.
+"""
+
+import glob
+import itertools
+import os
+
+from NoteType import ReleaseNoteType
+from render_to_html import (render_header, render_body, render_horizontal_line, render_jql, render_close_body,
+                            TABS, GIT_LOG_START, ENGINEERING_NOTE_TABLE_HEADER, STREAMING_BATCH_SIZE)
+from trackers import registry
+
+# Number of rows in each chunk. Small enough for a chunk to load in a moment, large enough that scrolling
+# through the notes does not mean loading hundreds of files
+PAGE_SIZE = 2000
+
+# The kinds of rows, each in a chunk file of its own named <kind>-<page>.js
+ISSUES = "issues"
+LOG = "log"
+
+PAGED_STYLE = """
+        <style>
+            div.releaseNotes .pagedList {
+                position: relative;
+                height: 60vh;
+                overflow-y: auto;
+                border: 1px solid #ccc;
+            }
+            div.releaseNotes .pagedRows {
+                position: absolute;
+                top: 0;
+                left: 0;
+                right: 0;
+            }
+            div.releaseNotes .pagedRow {
+                position: absolute;
+                left: 0;
+                right: 0;
+                height: 24px;
+                line-height: 24px;
+                display: flex;
+                white-space: nowrap;
+            }
+            div.releaseNotes .pagedRow.odd {
+                background-color: #f2f2f2;
+            }
+            div.releaseNotes .pagedRow span {
+                overflow: hidden;
+                text-overflow: ellipsis;
+                padding: 0px 4px;
+            }
+            div.releaseNotes .pagedRow span.issueid {
+                flex: 0 0 140px;
+            }
+            div.releaseNotes .gitLog .pagedRow {
+                font-family: monospace;
+            }
+        </style>
+"""
+
+ISSUE_LIST = """</dt>
+                <dd>
+                    <input type="search" id="search" placeholder="Search issues and summaries"> <span id="searchStatus"></span>
+                    <div class="pagedList" id="issues"><div class="pagedSpacer"></div><div class="pagedRows"></div></div>
+                </dd>"""
+
+LOG_LIST = TABS + '<div class="pagedList gitLog" id="log"><div class="pagedSpacer"></div><div class="pagedRows"></div></div>\n'
+
+# The script that scrolls through the rows, loading their chunks as they come into view. The manifest is inserted in place of MANIFEST
+PAGED_SCRIPT = """
+        <script>
+        (function () {
+            var manifest = MANIFEST;
+            var ROW_HEIGHT = 24;
+            var OVERSCAN = 20;
+            var chunks = {issues: {}, log: {}};
+            var waiting = {issues: {}, log: {}};
+
+            window.releaseNotesChunk = function (kind, page, rows) {
+                chunks[kind][page] = rows;
+                var callbacks = waiting[kind][page] || [];
+                delete waiting[kind][page];
+                callbacks.forEach(function (callback) { callback(); });
+            };
+
+            function load(kind, page, callback) {
+                if (chunks[kind][page]) {
+                    callback();
+                } else if (waiting[kind][page]) {
+                    waiting[kind][page].push(callback);
+                } else {
+                    waiting[kind][page] = [callback];
+                    var script = document.createElement("script");
+                    script.charset = "utf-8";
+                    script.src = manifest.directory + "/" + kind + "-" + String(page).padStart(5, "0") + ".js";
+                    document.head.appendChild(script);
+                }
+            }
+
+            function PagedList(kind, renderRow) {
+                this.kind = kind;
+                this.renderRow = renderRow;
+                this.matches = null;
+                this.element = document.getElementById(kind);
+                this.spacer = this.element.querySelector(".pagedSpacer");
+                this.rows = this.element.querySelector(".pagedRows");
+                this.element.addEventListener("scroll", this.render.bind(this));
+            }
+
+            PagedList.prototype.count = function () {
+                return this.matches ? this.matches.length : manifest[this.kind].rows;
+            };
+
+            // Create the rows in view (and a few either side), loading the chunks of any that are missing
+            PagedList.prototype.render = function () {
+                var list = this;
+                var count = this.count();
+                var first = Math.max(0, Math.floor(this.element.scrollTop / ROW_HEIGHT) - OVERSCAN);
+                var last = Math.min(count, Math.ceil((this.element.scrollTop + this.element.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+                var fragment = document.createDocumentFragment();
+                var missing = {};
+
+                this.spacer.style.height = count * ROW_HEIGHT + "px";
+
+                for (var position = first; position < last; position++) {
+                    var index = this.matches ? this.matches[position] : position;
+                    var page = Math.floor(index / manifest.pageSize);
+
+                    if (!chunks[this.kind][page]) {
+                        missing[page] = true;
+                        continue;
+                    }
+
+                    var row = this.renderRow(chunks[this.kind][page][index % manifest.pageSize]);
+                    row.className = position % 2 ? "pagedRow odd" : "pagedRow";
+                    row.style.top = position * ROW_HEIGHT + "px";
+                    fragment.appendChild(row);
+                }
+
+                this.rows.replaceChildren(fragment);
+
+                Object.keys(missing).forEach(function (page) {
+                    load(list.kind, page, function () { list.render(); });
+                });
+            };
+
+            function cell(className, text) {
+                var span = document.createElement("span");
+                span.className = className;
+                span.textContent = text;
+                span.title = text;
+                return span;
+            }
+
+            var issues = new PagedList("issues", function (issue) {
+                var row = document.createElement("div");
+                var key = cell("issueid", "");
+                key.innerHTML = issue[1];
+                row.appendChild(key);
+                row.appendChild(cell("summary", issue[2]));
+                return row;
+            });
+
+            var log = new PagedList("log", function (line) {
+                var row = document.createElement("div");
+                row.appendChild(cell("line", line));
+                return row;
+            });
+
+            // Each search loads the chunks of issues one after another, showing the matches found so far,
+            // until it has read them all or a newer search has started
+            var search = document.getElementById("search");
+            var status = document.getElementById("searchStatus");
+            var searches = 0;
+
+            search.addEventListener("input", function () {
+                var query = search.value.toLowerCase();
+                var current = ++searches;
+                var matches = [];
+                var page = 0;
+
+                issues.element.scrollTop = 0;
+
+                if (!query) {
+                    issues.matches = null;
+                    status.textContent = "";
+                    issues.render();
+                    return;
+                }
+
+                function next() {
+                    if (current !== searches) {
+                        return;
+                    }
+                    if (page === manifest.issues.pages) {
+                        status.textContent = matches.length + " of " + manifest.issues.rows + " match";
+                        return;
+                    }
+
+                    load("issues", page, function () {
+                        if (current !== searches) {
+                            return;
+                        }
+                        chunks.issues[page].forEach(function (issue, offset) {
+                            if (issue[0].toLowerCase().indexOf(query) !== -1 || issue[2].toLowerCase().indexOf(query) !== -1) {
+                                matches.push(page * manifest.pageSize + offset);
+                            }
+                        });
+
+                        page++;
+                        status.textContent = matches.length + " found, searching...";
+                        issues.matches = matches;
+                        issues.render();
+                        setTimeout(next, 0);
+                    });
+                }
+
+                next();
+            });
+
+            issues.render();
+            log.render();
+        })();
+        </script>
+"""
+
+def chunk_directory(output_location):
+    """The directory the chunks of a paged note are written to, e.g. notes_files for notes.html"""
+    return os.path.splitext(output_location)[0] + "_files"
+
+class PagedNoteWriter:
+    """Class to write the rows of a paged note to chunk files as they are added, then its index page.
+
+    Rows are added with add(kind, rows) in order, and written out a chunk at a time, so only one chunk
+    of each kind is held in memory.
+    """
+    def __init__(self, output_location, page_size=PAGE_SIZE):
+        self.output_location = output_location
+        self.directory = chunk_directory(output_location)
+        self.page_size = page_size
+        self.pending = {ISSUES: [], LOG: []}
+        self.pages = {ISSUES: 0, LOG: 0}
+        self.rows = {ISSUES: 0, LOG: 0}
+
+        # Chunks left from an earlier, longer, render would otherwise be listed nowhere but still take up space
+        os.makedirs(self.directory, exist_ok=True)
+        for kind in self.pages:
+            for stale_chunk in glob.glob(os.path.join(glob.escape(self.directory), kind + "-*.js")):
+                os.remove(stale_chunk)
+
+    def add(self, kind, rows):
+        """Add rows of a kind, writing out each chunk that fills up"""
+        rows = iter(rows)
+
+        # Take no more rows than fill the pending chunk, so a generator of rows is not read ahead of the chunks
+        while True:
+            pending = self.pending[kind]
+            pending.extend(itertools.islice(rows, self.page_size - len(pending)))
+            if len(pending) < self.page_size:
+                break
+
+            self.write_chunk(kind, pending)
+            self.pending[kind] = []
+
+    def write_chunk(self, kind, rows):
+        """Write a chunk of rows of a kind to the next chunk file"""
+        # Only paged notes need json, so it is not imported at startup
+        import json
+
+        # Named by kind and page alone, so the page can find a chunk without the index listing them all
+        page = self.pages[kind]
+        name = f"{kind}-{page:05d}.js"
+
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as chunk_file:
+            chunk_file.write(f'releaseNotesChunk("{kind}", {page}, ' + json.dumps(rows, ensure_ascii=False, separators=(",", ":")) + ");\n")
+
+        self.pages[kind] += 1
+        self.rows[kind] += len(rows)
+
+    def finish(self, version, previous_version, git_log_command, jql):
+        """Write out the remaining rows, then the index page that lists every chunk"""
+        import json
+        import urllib.parse
+
+        for kind, pending in self.pending.items():
+            if pending:
+                self.write_chunk(kind, pending)
+                pending.clear()
+
+        manifest = {
+            "directory": urllib.parse.quote(os.path.basename(self.directory)),
+            "pageSize": self.page_size,
+            ISSUES: {"rows": self.rows[ISSUES], "pages": self.pages[ISSUES]},
+            LOG: {"rows": self.rows[LOG], "pages": self.pages[LOG]},
+        }
+
+        with open(self.output_location, "w") as output_html:
+            render_header(output_html)
+            output_html.write(PAGED_STYLE)
+
+            render_body(output_html, version, previous_version, ReleaseNoteType.ENGINEERING_NOTE)
+            output_html.write(TABS + "<dt>" + ENGINEERING_NOTE_TABLE_HEADER + ISSUE_LIST)
+
+            render_horizontal_line(output_html)
+            output_html.write(GIT_LOG_START + git_log_command + LOG_LIST)
+
+            render_horizontal_line(output_html)
+            render_jql(jql, output_html)
+
+            # The manifest only holds numbers and file names, but escape '</' so it can never close the script
+            output_html.write(PAGED_SCRIPT.replace("MANIFEST", json.dumps(manifest).replace("</", "<\\/")))
+            render_close_body(output_html)
+
+def issue_rows(commits):
+    """The row of each GitCommitMessage in the table of issues: its key, the link to it and its comment"""
+    hyperlink = registry.hyperlink
+    return ((commit.jira_id, hyperlink(commit.jira_id), commit.comment) for commit in commits)
+
+def render_engineering_notes_paged(output_location, version, previous_version, commits, git_log_command, git_log, jql, page_size=PAGE_SIZE):
+    """Render the content of engineering notes into an index page and chunks of rows, as render_engineering_notes does into one file"""
+    writer = PagedNoteWriter(output_location, page_size)
+
+    writer.add(ISSUES, issue_rows(commits))
+    writer.add(LOG, git_log.splitlines())
+
+    writer.finish(version, previous_version, git_log_command, jql)
+
+def render_engineering_notes_paged_streaming(output_location, version, previous_version, log_entries, git_log_command, jql_for_keys, page_size=PAGE_SIZE):
+    """Render paged engineering notes as the commits are read, as render_engineering_notes_streaming does into one file.
+    log_entries is an iterable of (git log line, GitCommitMessage), and jql_for_keys is called with the unique jira ids once they have all been read"""
+    writer = PagedNoteWriter(output_location, page_size)
+    keys = {}
+    entries = iter(log_entries)
+
+    while batch := list(itertools.islice(entries, STREAMING_BATCH_SIZE)):
+        writer.add(ISSUES, issue_rows(commit for _, commit in batch))
+        writer.add(LOG, (line for line, _ in batch))
+        keys.update((commit.jira_id, None) for _, commit in batch)
+
+    writer.finish(version, previous_version, git_log_command, jql_for_keys(keys.keys()))
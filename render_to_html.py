@@ -4,10 +4,129 @@
  <List of Stories>
  <list of Defects>
  <list of Support issues>
+
+ The static parts of the page and the table rows are templates, built once when the module is loaded.
+ Each document is assembled in memory and written to its file in a single write.
 """
 
+import io
+import itertools
+
 from NoteType import ReleaseNoteType
-from helpers import issue_key_to_hyperlink
+from trackers import registry
+
+TABS = '\t\t\t\t'
+ROW_TABS = TABS + '\t\t'
+
+#TODO: update the title
+
+#TODO: Set the release notes title correctly
+HEADER = """<html lang="en">
+        <head>
+            <meta charset="utf-8"/>
+            <style>
+                div.releaseNotes dt {
+                    font-family: sans-serif;
+                    font-weight: bold;
+                }
+                div.releaseNotes dd {
+                    padding: 0px 0px 10px 0px;
+                }
+                div.releaseNotes table {
+                border-collapse: collapse;
+                }
+                div.releaseNotes table.issues tr:nth-child(even) {
+                    background-color: #f2f2f2;
+                }
+                div.releaseNotes td, div.releaseNotes th {
+                border: 4px solid transparent;
+                padding: 0px;
+                text-align: left;
+                }
+                div.releaseNotes table.table-border td, div.releaseNotes table.table-border th {
+                border: 1px solid black;
+                padding: 4px;
+                }
+                div.releaseNotes .issueid {
+                width: 140px
+                }
+                div.releaseNotes .configsetting {
+                width: 240px
+                }
+            </style>
+
+            <title>Release Notes - V500 - Version V500_25.1</title>
+        </head>"""
+
+#TODO: should pipe through the release notes version in the <title>
+
+BODY_START = """
+    <body>
+        <div class="releaseNotes">
+            <h1>Motorola Solutions release notes - </h1>
+            <!--<p><em>Warning:</em> These release notes are incomplete, expect an update</p>-->
+            <h2>Changes</h2>
+            <hr><h3>Software updated in """
+
+BODY_SOFTWARE_LIST = """</h3>
+            <ul>
+                <li>V500 firmware
+                <li>VB400 firmware
+                <!--<li>VT50 / VT100 firmware-->
+                <li>DockController firmware
+                <li>Smart Dock firmware
+            </ul><h3>Changes since """
+
+BODY_CHANGES_SINCE = "</h3><h3>Changes since "
+
+BODY_END = """</h3>
+            <dl>\n"""
+
+CLOSE_BODY = """
+            <dl>
+        </div>\n</body>"""
+
+HORIZONTAL_LINE = "\n" + TABS + "<hr>\n"
+
+GIT_LOG_START = TABS + "<dt>Git Log</dt>\n" + TABS + "<br>\n" + TABS
+PRE_START = TABS + "<pre>\n"
+PRE_END = "\n" + TABS + "</pre>"
+
+ENGINEERING_NOTE_TABLE_HEADER = "Issues modified in this release"
+
+# Number of commits the streaming renderer collects before writing them out
+STREAMING_BATCH_SIZE = 1000
+
+TABLE_START = """</dt>
+                <dd>
+                    <table class="issues">
+                        <colgroup>
+                            <col class="issueid">
+                            <col>
+                        </colgroup>
+                        <tr>
+                            <th>Issue Id</th>
+                            <th>Summary</th>
+                        </tr>""" + '\n'
+
+TABLE_END = """
+                    </table>
+                </dd>"""
+
+def compile_template(template):
+    """Split a template on its {} placeholders, into the literal text either side of each placeholder"""
+    return tuple(template.split("{}"))
+
+RELEASE_NOTE_ROW = compile_template("\n" + ROW_TABS + "<tr>\t<td>{}</td>\n" +
+                                    ROW_TABS + "\t<td>{}</td>\n" +
+                                    ROW_TABS + "</tr>")
+
+ENGINEERING_NOTE_ROW = compile_template(ROW_TABS + "<tr>\n" +
+                                        ROW_TABS + "\t<td>{}</td>\n" +
+                                        ROW_TABS + "\t<td>{}</td> \n" +
+                                        ROW_TABS + "</tr>\n")
+
+EPIC = compile_template(TABS + "<dt>New Feature: {}</dt> \n" + TABS + "<dd>\n" + TABS + "\t{}\n" + TABS + "</dd> \n")
 
 def render_to_html(output_location, version, previous_version, commits):
     """Render the content of a commit list into a html file."""
@@ -40,247 +159,165 @@ def render_to_html(output_location, version, previous_version, commits):
             case _:
                 other.append(entry)
 
-    with open(output_location, "w") as output_html:
+    render_release_notes(output_location, version, previous_version, epics, stories, defects, support_issues, other, ReleaseNoteType.RELEASE_NOTE)
 
-        render_header(output_html)
+def render_engineering_notes(output_location, version, previous_version, commits, git_log_command, git_log, jql):
+    """Render the content of engineering notes into a html file, with a row for each of an iterable of GitCommitMessage."""
 
-        render_body(output_html, version, previous_version, ReleaseNoteType.RELEASE_NOTE)
-        render_epics(output_html, epics, ReleaseNoteType.RELEASE_NOTE)
-        render_stories(output_html, stories, "Minor enhancements made to device software", ReleaseNoteType.RELEASE_NOTE)
-        render_defects(output_html, defects, "Defects resolved in device software", ReleaseNoteType.RELEASE_NOTE)
-        render_support(output_html, support_issues, "Customer support issues resolved in device software", ReleaseNoteType.RELEASE_NOTE)
+    output_html = io.StringIO()
 
-        #Render issues that are not suitable for release notes
-        render_horizontal_line(output_html)
+    render_header(output_html)
 
-        render_close_body(output_html)
+    render_body(output_html, version, previous_version, ReleaseNoteType.ENGINEERING_NOTE)
+    render_table_of_issues(output_html, commits, ENGINEERING_NOTE_TABLE_HEADER, ReleaseNoteType.ENGINEERING_NOTE)
 
-    output_html.close()
+    # Render the git log
+    render_horizontal_line(output_html)
+    render_git_log(output_html, git_log_command, git_log)
 
-def render_engineering_notes(output_location, version, previous_version, issues, git_log_command, git_log, jql):
-    """Render the content of engineering notes into a html file."""
+    # Render the JQL
+    render_horizontal_line(output_html)
+    render_jql(jql, output_html)
 
-    with open(output_location, "w") as output_html:
+    render_close_body(output_html)
+
+    write_document(output_location, output_html)
+
+def render_engineering_notes_streaming(output_location, version, previous_version, log_entries, git_log_command, jql_for_keys):
+    """Render engineering notes into a html file as the commits are read, without holding them all in memory.
+
+    log_entries is an iterable of (git log line, GitCommitMessage). Each commit is rendered as a row of the
+    table in git log order, while the git log lines are spooled to a temporary file until the table is complete.
+    jql_for_keys is called with the unique jira ids once every commit has been read.
+    """
+
+    import shutil
+    import tempfile
+
+    keys = {}
+    start, middle, end = ENGINEERING_NOTE_ROW
+    hyperlink = registry.hyperlink
+    entries = iter(log_entries)
+
+    with open(output_location, "w") as output_html, tempfile.TemporaryFile("w+", encoding="utf-8") as git_log_spool:
 
         render_header(output_html)
 
         render_body(output_html, version, previous_version, ReleaseNoteType.ENGINEERING_NOTE)
-        render_table_of_issues(output_html, issues, "Issues modified in this release", ReleaseNoteType.ENGINEERING_NOTE)
+        output_html.write(TABS + "<dt>" + ENGINEERING_NOTE_TABLE_HEADER + TABLE_START)
+
+        # Write the table and spool the git log a batch of commits at a time
+        while batch := list(itertools.islice(entries, STREAMING_BATCH_SIZE)):
+            rows = []
+            lines = []
+
+            for line, commit in batch:
+                rows.extend((start, hyperlink(commit.jira_id), middle, commit.comment, end))
+                lines.append(line + "\n")
+                keys[commit.jira_id] = None
+
+            output_html.write("".join(rows))
+            git_log_spool.write("".join(lines))
+
+        output_html.write(TABLE_END)
 
         # Render the git log
         render_horizontal_line(output_html)
-        render_git_log(output_html, git_log_command, git_log)
+        output_html.write(GIT_LOG_START + git_log_command + PRE_START)
+        git_log_spool.seek(0)
+        shutil.copyfileobj(git_log_spool, output_html)
+        output_html.write(PRE_END)
 
         # Render the JQL
         render_horizontal_line(output_html)
-        render_jql(jql, output_html)
+        render_jql(jql_for_keys(keys.keys()), output_html)
 
         render_close_body(output_html)
 
-    output_html.close()
-
 def render_release_notes(output_location, version, previous_version, epics, stories, defects, support_issues, other, note_type):
     """Render the content of various lists into a html file."""
 
-    with open(output_location, "w") as output_html:
+    output_html = io.StringIO()
 
-        render_header(output_html)
+    render_header(output_html)
 
-        render_body(output_html, version, previous_version, note_type)
-        render_epics(output_html, epics, note_type)
-        render_stories(output_html, stories, "Minor enhancements made to device software", note_type)
-        render_defects(output_html, defects, "Defects resolved in device software", note_type)
-        render_support(output_html, support_issues, "Customer support issues resolved in device software", note_type)
+    render_body(output_html, version, previous_version, note_type)
+    render_epics(output_html, epics, note_type)
+    render_stories(output_html, stories, "Minor enhancements made to device software", note_type)
+    render_defects(output_html, defects, "Defects resolved in device software", note_type)
+    render_support(output_html, support_issues, "Customer support issues resolved in device software", note_type)
 
-        #Render issues that are not suitable for release notes
-        render_horizontal_line(output_html)
+    #Render issues that are not suitable for release notes
+    render_horizontal_line(output_html)
 
-        render_close_body(output_html)
+    render_close_body(output_html)
 
-    output_html.close()
+    write_document(output_location, output_html)
 
+def write_document(output_location, document):
+    """Write a document that has been assembled in memory to a file, in one write"""
+    with open(output_location, "w") as output_html:
+        output_html.write(document.getvalue())
 
 def render_horizontal_line(output):
     """Render a horizontal line to the html"""
-    output.write("\n\t\t\t\t<hr>\n")
+    output.write(HORIZONTAL_LINE)
 
 def render_git_log(output, git_log_command, git_log):
     """Render the content of the git log string"""
-    tabs = '\t\t\t\t'
-    html = tabs + "<dt>Git Log</dt>\n" + tabs + "<br>\n" + tabs + git_log_command
-    formatted_git_log = tabs + "<pre>\n"
-
-    lines = git_log.split(sep='\n')
-    for line in lines:
-        formatted_git_log += line + "\n"
-
-    formatted_git_log += tabs + "</pre>"
-
-    html += formatted_git_log
-
-    output.write(html)
+    output.write(GIT_LOG_START + git_log_command + PRE_START + git_log + PRE_END)
 
 def render_jql(jira_url, output):
     """Render the content of a JQL query to html"""
-
-    tabs = '\t\t\t\t'
-    html = tabs + '<dt>Jira</dt>\n' + tabs + '<br>\n'
-    jira_hyperlink = '<a href="' + jira_url + '">' + 'Jira</a>\n'
-    html += 'Display the changed issues in ' + jira_hyperlink
-
-    output.write(html)
+    output.write(TABS + '<dt>Jira</dt>\n' + TABS + '<br>\n' +
+                 'Display the changed issues in <a href="' + jira_url + '">Jira</a>\n')
 
 def render_header(output):
     """Render the html header"""
-
-    # Write the HTML Header
-
-    #TODO: update the title
-
-    #TODO: Set the release notes title correctly
-    html = """<html lang="en">
-        <head>
-            <meta charset="utf-8"/>
-            <style>
-                div.releaseNotes dt {
-                    font-family: sans-serif;
-                    font-weight: bold;
-                }
-                div.releaseNotes dd {
-                    padding: 0px 0px 10px 0px;
-                }
-                div.releaseNotes table {
-                border-collapse: collapse;
-                }
-                div.releaseNotes table.issues tr:nth-child(even) {
-                    background-color: #f2f2f2;
-                }
-                div.releaseNotes td, div.releaseNotes th {
-                border: 4px solid transparent;
-                padding: 0px;
-                text-align: left;
-                }
-                div.releaseNotes table.table-border td, div.releaseNotes table.table-border th {
-                border: 1px solid black;
-                padding: 4px;
-                }
-                div.releaseNotes .issueid {
-                width: 140px
-                }
-                div.releaseNotes .configsetting {
-                width: 240px
-                }
-            </style>
-
-            <title>Release Notes - V500 - Version V500_25.1</title>
-        </head>"""
-
-    #TODO: should pipe through the release notes version in the <title>
-
-    output.write(html)
+    output.write(HEADER)
 
 def render_body(html, version, previous_version, note_type):
     """Render the body of the html"""
 
-    # Write the HTML Body text
-
-    html_body = """
-    <body>
-        <div class="releaseNotes">
-            <h1>Motorola Solutions release notes - """
-
-    next = "</h1>" + """
-            <!--<p><em>Warning:</em> These release notes are incomplete, expect an update</p>-->
-            <h2>Changes</h2>
-            <hr>"""
-
-    software_version = "<h3>Software updated in " + version + "</h3>"
-
-    tail = """
-            <ul>
-                <li>V500 firmware
-                <li>VB400 firmware
-                <!--<li>VT50 / VT100 firmware-->
-                <li>DockController firmware
-                <li>Smart Dock firmware
-            </ul>"""
-
-    since = "<h3>Changes since " + previous_version + "</h3>" + """
-            <dl>\n"""
-
-    if note_type == note_type.RELEASE_NOTE:
-        content = html_body + next + software_version + tail + since
+    if note_type == ReleaseNoteType.RELEASE_NOTE:
+        html.write(BODY_START + version + BODY_SOFTWARE_LIST + previous_version + BODY_END)
     else:
-        content = html_body + next + software_version + since
-
-    html.write(content)
+        html.write(BODY_START + version + BODY_CHANGES_SINCE + previous_version + BODY_END)
 
 def render_close_body(output_html):
     """Render the closing tags of the html"""
-    # Write the HTML body closing tags
-
-    closing_braces = "</body>"
-
-    then = """
-            <dl>
-        </div>\n"""
-
-    output_html.write(then + closing_braces)
+    output_html.write(CLOSE_BODY)
 
 def render_table_of_issues(output_html, issues, header, note_type):
-    """Render the content of a table of issues to html"""
+    """Render the content of a table of issues to html: consolidated entries for release notes, or the
+    GitCommitMessage of each commit for engineering notes"""
 
-    tabs = '\t\t\t\t'
-
-    # Render a table of issues
-    output_html.write(tabs + "<dt>" + header + "</dt>")
-    output = """
-                <dd>
-                    <table class="issues">
-                        <colgroup>
-                            <col class="issueid">
-                            <col>
-                        </colgroup>
-                        <tr>
-                            <th>Issue Id</th>
-                            <th>Summary</th>
-                        </tr>""" + '\n'
-
-    output_html.write(output)
-
-    tabs += '\t\t'
+    rows = []
 
+    # Collect the pieces of every row in one list and join them once
     match note_type:
-        case note_type.RELEASE_NOTE:
-
+        case ReleaseNoteType.RELEASE_NOTE:
+            start, middle, end = RELEASE_NOTE_ROW
             for issue in issues:
-                output_html.write("\n" + tabs + "<tr>")
-                output_html.write("\t<td>" + issue.jira_id +"</td>\n")
-                output_html.write(tabs +"\t<td>" + issue.release_note + "</td>\n")
-                output_html.write(tabs +"</tr>")
-
-        case note_type.ENGINEERING_NOTE:
+                rows.extend((start, issue.jira_id, middle, issue.release_note, end))
 
-            for issue in issues:
-
-                #Render hyperlinks
-                jira = issue_key_to_hyperlink(issue.jira_id)
-                output_html.write(tabs + "<tr>\n")
-                output_html.write(tabs + "\t<td>" + jira +"</td>\n")
-                output_html.write(tabs + "\t<td>" + issue.git_comment + "</td> \n")
-                output_html.write(tabs + "</tr>\n")
-
-    closing_tags = """
-                    </table>
-                </dd>"""
+        case ReleaseNoteType.ENGINEERING_NOTE:
+            start, middle, end = ENGINEERING_NOTE_ROW
+            hyperlink = registry.hyperlink
+            for commit in issues:
+                rows.extend((start, hyperlink(commit.jira_id), middle, commit.comment, end))
 
-    output_html.write(closing_tags)
+    output_html.write(TABS + "<dt>" + header + TABLE_START)
+    output_html.write("".join(rows))
+    output_html.write(TABLE_END)
 
 def render_epics(output_html, epics, note_type):
     """Render a list of epics"""
+    start, middle, end = EPIC
+    parts = []
     for epic in epics:
-        output_html.write("\t\t\t\t<dt>New Feature: " + epic.jira_comment +"</dt> \n")
-        output_html.write("\t\t\t\t<dd>\n\t\t\t\t\t" + epic.release_note + "\n\t\t\t\t</dd> \n")
+        parts.extend((start, epic.jira_comment, middle, epic.release_note, end))
+    output_html.write("".join(parts))
 
 def render_stories(output_html, stories, description, note_type):
     """Render a list of stories to html"""
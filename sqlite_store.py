@@ -0,0 +1,58 @@
+"""Shared plumbing for the SQLite stores (commit cache, range manifests, issue index and Jira snapshots).
+
+ Each store is a single SQLite database stamped with a version number. Opening it with a different version
+ drops the store's tables along with their data, since the columns may have changed, before they are created again
+"""
+
+import os
+
+# SQLite limits the number of parameters in a single statement, so look up keys in batches
+LOOKUP_BATCH_SIZE = 500
+
+class SQLiteStore:
+    """Base class for a versioned SQLite store, usable as a context manager that closes the database.
+
+    Subclasses list the tables they own in TABLES and the statements that create them in SCHEMA.
+    """
+    TABLES = ()
+    SCHEMA = ()
+
+    def __init__(self, path, version):
+        # Imported here so that runs that open no store need not pay for SQLite
+        import sqlite3
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.connection = sqlite3.connect(path)
+
+        (stored_version,) = self.connection.execute("PRAGMA user_version").fetchone()
+
+        if stored_version != version:
+            for table in self.TABLES:
+                self.connection.execute("DROP TABLE IF EXISTS " + table)
+            self.connection.execute("PRAGMA user_version = " + str(int(version)))
+
+        for statement in self.SCHEMA:
+            self.connection.execute(statement)
+
+        self.connection.commit()
+
+    def select_in(self, query, keys):
+        """Run a query whose {} is replaced by the placeholders of a batch of keys, for every batch of an iterable of keys,
+        and yield the rows of each"""
+        keys = list(keys)
+
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + LOOKUP_BATCH_SIZE]
+            yield from self.connection.execute(query.format(",".join("?" * len(batch))), batch)
+
+    def close(self):
+        """Close the underlying database"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,36 @@
+import subprocess
+
+import pytest
+
+COMMIT_MESSAGES = [
+    "ABC-1 First change",
+    "ABC-2 Second change",
+    "ABC:3 Malformed key",
+    "No issue key here",
+    "ABC-2 Follow up to the second change",
+]
+
+def git(repo_directory, *args):
+    return subprocess.run(["git", *args], cwd=repo_directory, check=True, capture_output=True, text=True).stdout
+
+def create_git_repo(repo_directory, messages):
+    """Create a git repo with the tags 'start' and 'end' around a commit for each message"""
+    repo_directory.mkdir()
+
+    git(repo_directory, "init", "-q")
+    git(repo_directory, "config", "user.email", "test@example.com")
+    git(repo_directory, "config", "user.name", "Test")
+    git(repo_directory, "commit", "-q", "--allow-empty", "-m", "Initial commit")
+    git(repo_directory, "tag", "start")
+
+    for message in messages:
+        git(repo_directory, "commit", "-q", "--allow-empty", "-m", message)
+
+    git(repo_directory, "tag", "end")
+
+    return repo_directory
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """A small git repo at tmp_path/repo with the tags 'start' and 'end' around COMMIT_MESSAGES"""
+    return create_git_repo(tmp_path / "repo", COMMIT_MESSAGES)
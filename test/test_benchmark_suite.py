@@ -0,0 +1,17 @@
+from benchmark.suite import find_regressions
+from benchmark.suite import run_suite
+
+def test_suite_times_every_stage(tmp_path):
+    results = run_suite(str(tmp_path), [200], repeat=1)
+
+    assert set(results["sizes"]["200"]) == {"get_git_log", "split_commit_message", "parse_jira_issues_from_git_log", "read_jira_export",
+                                            "consolidate", "render_engineering_notes", "render_to_html"}
+
+def test_only_stages_slower_than_the_tolerance_are_regressions():
+    baseline = {"sizes": {"1000": {"get_git_log": 1.0, "consolidate": 1.0, "render_to_html": 0.001}}}
+    results = {"sizes": {"1000": {"get_git_log": 1.2, "consolidate": 1.3, "render_to_html": 0.004, "new_stage": 5.0}}}
+
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("consolidate at 1000 commits")
@@ -0,0 +1,22 @@
+from commit_cache import CommitCache
+
+def test_lookup_returns_only_stored_commits(tmp_path):
+    with CommitCache(str(tmp_path / "cache.sqlite"), 1) as cache:
+        cache.store([("sha1", "abc ABC-1 message", "abc", "ABC-1", "message")])
+        assert cache.lookup(["sha1", "sha2"]) == {"sha1": ("abc ABC-1 message", "abc", "ABC-1", "message")}
+
+def test_lookup_handles_more_shas_than_a_single_batch(tmp_path):
+    with CommitCache(str(tmp_path / "cache.sqlite"), 1) as cache:
+        cache.store([("sha" + str(i), "", "", "", "") for i in range(1200)])
+        assert len(cache.lookup("sha" + str(i) for i in range(1500))) == 1200
+
+def test_changing_version_discards_stale_commits(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with CommitCache(path, 1) as cache:
+        cache.store([("sha1", "abc ABC-1 message", "abc", "ABC-1", "message")])
+
+    with CommitCache(path, 1) as cache:
+        assert "sha1" in cache.lookup(["sha1"])
+
+    with CommitCache(path, 2) as cache:
+        assert cache.lookup(["sha1"]) == {}
@@ -0,0 +1,94 @@
+import pytest
+
+from conftest import git
+
+from commit_source import COMMIT_SOURCES
+from commit_source import CommitSourceError
+from commit_source import commit_subject
+from commit_source import open_commit_source
+
+BACKENDS = sorted(COMMIT_SOURCES)
+
+def git_log_entries(repo_directory, revision_range):
+    entries = git(repo_directory, "log", "--no-merges", "--format=%H %h %s", revision_range).splitlines()
+    return [tuple(entry.split(" ", 1)) for entry in entries]
+
+def git_graph_entries(repo_directory, revision_range):
+    entries = []
+    for entry in git(repo_directory, "log", "--format=%H %P%x00%h %s", revision_range).splitlines():
+        shas, line = entry.split("\0")
+        sha, *parents = shas.split()
+        entries.append((sha, tuple(parents), line))
+    return entries
+
+@pytest.fixture(params=["loose", "packed"])
+def history(request, git_repo):
+    """The git_repo fixture with a merged side branch and an annotated tag, with its objects loose or packed"""
+    git(git_repo, "checkout", "-q", "-b", "side", "start")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "DEF-1 Side branch change\n\nWith a body")
+    git(git_repo, "checkout", "-q", "-")
+    git(git_repo, "merge", "-q", "--no-ff", "-m", "Merge side", "side")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "DEF-2 After the merge")
+    git(git_repo, "tag", "-a", "-m", "Annotated", "annotated")
+
+    if request.param == "packed":
+        git(git_repo, "gc", "-q")
+
+    return git_repo
+
+def test_commit_subject_joins_the_first_paragraph():
+    assert commit_subject(b"ABC-1 First line\ncontinued  \n\nBody") == "ABC-1 First line continued"
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_iter_log_matches_git_log(history, backend):
+    with open_commit_source(str(history), backend) as commits:
+        assert list(commits.iter_log("start", "annotated")) == git_log_entries(history, "start..annotated")
+        assert list(commits.iter_log("side", "end")) == git_log_entries(history, "side..end")
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_iter_graph_matches_git_log_with_merges(history, backend):
+    with open_commit_source(str(history), backend) as commits:
+        entries = list(commits.iter_graph("start", "annotated"))
+
+    assert entries == git_graph_entries(history, "start..annotated")
+    assert sum(len(parents) == 2 for _, parents, _ in entries) == 1
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_iter_graph_without_a_source_walks_the_whole_history(history, backend):
+    with open_commit_source(str(history), backend) as commits:
+        assert list(commits.iter_graph(None, "annotated")) == git_graph_entries(history, "annotated")
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_tags_are_peeled_to_commits(history, backend):
+    git(history, "tag", "nested/tree", "end^{tree}")
+    start, end, annotated = git(history, "rev-parse", "start", "end", "annotated^{commit}").split()
+
+    with open_commit_source(str(history), backend) as commits:
+        assert commits.tags() == {"annotated": annotated, "end": end, "start": start}
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_resolve_and_is_ancestor(history, backend):
+    start, end, annotated = git(history, "rev-parse", "start", "end", "annotated^{commit}").split()
+
+    with open_commit_source(str(history), backend) as commits:
+        assert commits.resolve("annotated") == annotated
+        assert commits.resolve("end~5") == start
+        assert commits.resolve_many(["start", "annotated", "end"]) == [start, annotated, end]
+        assert commits.is_ancestor(start, end)
+        assert not commits.is_ancestor(end, start)
+
+        with pytest.raises(Exception):
+            commits.resolve("no-such-tag")
+        with pytest.raises(Exception):
+            commits.resolve_many(["start", "no-such-tag"])
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_read_lines_matches_git_log(history, backend):
+    entries = git_log_entries(history, "start..end")
+
+    with open_commit_source(str(history), backend) as commits:
+        assert commits.read_lines([sha for sha, _ in entries]) == dict(entries)
+
+def test_unknown_backend_is_rejected(git_repo):
+    with pytest.raises(CommitSourceError):
+        open_commit_source(str(git_repo), "svn")
@@ -0,0 +1,46 @@
+from consolidate import commit_rows
+from consolidate import consolidate
+from consolidate import group_commits
+from consolidate import join_grouped
+from consolidate import review_rows
+from records import GitCommitMessage
+
+JIRA_ISSUES = {
+    "ABC-1": ("Story", "A story", "The story release note"),
+    "ABC-2": ("Defect", "A defect", "The defect release note"),
+}
+
+COMMITS = [
+    GitCommitMessage("a1", "ABC-1", "First commit"),
+    GitCommitMessage("a2", "DEF-9", "Not in Jira"),
+    GitCommitMessage("a3", "ABC-1", "Second commit"),
+]
+
+def test_consolidate_is_a_full_outer_join_on_issue_key():
+    consolidated = consolidate(JIRA_ISSUES, COMMITS)
+
+    assert list(consolidated) == ["ABC-1", "ABC-2", "DEF-9"]
+    assert [(entry.found_in_jira, entry.found_in_git) for entry in consolidated.values()] == [("Yes", "Yes"), ("Yes", "No"), ("No", "Yes")]
+
+def test_consolidate_keeps_every_commit_of_a_key():
+    consolidated = consolidate(JIRA_ISSUES, COMMITS)
+    assert consolidated["ABC-1"].git_comment == ["First commit", "Second commit"]
+
+def test_review_rows_list_one_comment_per_line():
+    rows = list(review_rows(consolidate(JIRA_ISSUES, COMMITS)))
+
+    assert rows == [
+        ["ABC-1", "Story", "Yes", "Yes", "A story", "First commit\nSecond commit\n", "The story release note"],
+        ["ABC-2", "Defect", "Yes", "No", "A defect", "", "The defect release note"],
+        ["DEF-9", "", "No", "Yes", "", "Not in Jira\n", ""],
+    ]
+
+def test_commit_rows_are_one_entry_per_commit():
+    rows = [(entry.jira_id, entry.git_comment) for entry in commit_rows(consolidate({}, COMMITS))]
+    assert rows == [("ABC-1", "First commit"), ("ABC-1", "Second commit"), ("DEF-9", "Not in Jira")]
+
+def test_joining_grouped_commits_matches_consolidate():
+    def columns(consolidated):
+        return list(review_rows(consolidated))
+
+    assert columns(join_grouped(JIRA_ISSUES, group_commits(COMMITS))) == columns(consolidate(JIRA_ISSUES, COMMITS))
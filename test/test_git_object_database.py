@@ -0,0 +1,47 @@
+import subprocess
+
+from conftest import git
+
+from git_object_database import ObjectDatabase
+from git_object_database import apply_delta
+
+def test_apply_delta_copies_and_inserts():
+    # base size 5, target size 8: copy 'hello' then insert ' yo'
+    delta = bytes([5, 8, 0x80 | 0x10, 5, 3]) + b" yo"
+    assert apply_delta(b"hello", delta) == b"hello yo"
+
+def cat_file(repo_directory, sha):
+    """(type, data) of an object, as read by git"""
+    output = subprocess.run(["git", "cat-file", "--batch"], input=sha.encode() + b"\n",
+                            cwd=repo_directory, capture_output=True, check=True).stdout
+    header, data = output.split(b"\n", 1)
+    return header.split()[1].decode(), data[:-1]
+
+def test_read_deltified_objects_from_a_pack(git_repo):
+    for version in range(20):
+        (git_repo / "file.txt").write_text("line\n" * 200 + "version " + str(version) + "\n")
+        git(git_repo, "add", "file.txt")
+        git(git_repo, "commit", "-q", "-m", "Version " + str(version))
+    git(git_repo, "repack", "-adf", "-q", "--depth=50", "--window=50")
+
+    pack_index = next((git_repo / ".git" / "objects" / "pack").glob("*.idx"))
+    assert "chain length" in git(git_repo, "verify-pack", "-v", str(pack_index))
+
+    shas = [entry.split()[0] for entry in git(git_repo, "rev-list", "--objects", "--all").splitlines()]
+    objects = ObjectDatabase(str(git_repo / ".git" / "objects"))
+
+    try:
+        for sha in shas:
+            assert objects.read(sha) == cat_file(git_repo, sha)
+    finally:
+        objects.close()
+
+def test_abbreviate_and_complete(git_repo):
+    sha = git(git_repo, "rev-parse", "end").strip()
+    objects = ObjectDatabase(str(git_repo / ".git" / "objects"))
+
+    try:
+        assert objects.abbreviate(sha, objects.default_abbreviation()) == git(git_repo, "rev-parse", "--short", "end").strip()
+        assert objects.complete(sha[:8]) == sha
+    finally:
+        objects.close()
@@ -13,4 +13,8 @@ def test_key_starts_with_azmv_provides_AZDO_hyperlink():
 
 def test_key_starts_with_anything_else_provides_jira_hyperlink():
     hyperlink = "<a href=\"https://jira.mot-solutions.com/browse/ABC-123\">ABC-123</a>"
-    assert issue_key_to_hyperlink("ABC-123") == hyperlink
\ No newline at end of file
+    assert issue_key_to_hyperlink("ABC-123") == hyperlink
+
+def test_key_starts_with_AMZV_provides_AZDO_hyperlink():
+    hyperlink = "<a href=\"https://dev.azure.com/MobileVideo/VideoManager/_workitems/edit/45\">AMZV-45</a>"
+    assert issue_key_to_hyperlink("AMZV-45") == hyperlink
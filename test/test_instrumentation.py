@@ -0,0 +1,59 @@
+import io
+import json
+import os
+
+from instrumentation import Metrics
+from instrumentation import NULL_CONTEXT
+from instrumentation import metrics
+from instrumentation import profile_session
+
+def arguments(**overrides):
+    values = {'profile': False, 'metrics': None, 'profiler': None, 'profiler_output': 'release_notes.prof'}
+    values.update(overrides)
+    return values
+
+def test_disabled_metrics_do_not_wrap_anything():
+    disabled = Metrics()
+    iterator = iter([1, 2])
+
+    assert disabled.stage("stage") is NULL_CONTEXT
+    assert disabled.timed_iterator("items", iterator) is iterator
+
+    disabled.count("commits parsed")
+    assert disabled.as_dict() == {"timers": {}, "counters": {}}
+
+def test_enabled_metrics_time_stages_and_iterators():
+    enabled = Metrics()
+    enabled.reset(enabled=True)
+
+    with enabled.stage("stage"):
+        pass
+    assert list(enabled.timed_iterator("items", iter([1, 2]))) == [1, 2]
+    enabled.count("commits parsed", 3)
+
+    assert set(enabled.timers) == {"stage", "items"}
+    assert enabled.counters == {"commits parsed": 3}
+
+def test_profile_session_reports_summary_and_json(tmp_path):
+    output = io.StringIO()
+    metrics_file = str(tmp_path / "metrics.json")
+
+    with profile_session(arguments(profile=True, metrics=metrics_file), output) as session:
+        with session.stage("render html"):
+            session.count("jira rows", 2)
+
+    assert "render html" in output.getvalue()
+    assert json.loads(open(metrics_file, encoding="utf-8").read())["counters"] == {"jira rows": 2}
+    assert not metrics.enabled
+
+def test_profile_session_dumps_profiler_results(tmp_path):
+    for profiler in ("cprofile", "tracemalloc"):
+        profiler_output = str(tmp_path / (profiler + ".out"))
+        with profile_session(arguments(profiler=profiler, profiler_output=profiler_output), io.StringIO()):
+            sorted(range(1000), key=str)
+
+        assert os.path.getsize(profiler_output) > 0
+
+def test_profile_session_does_nothing_by_default():
+    with profile_session(arguments()) as session:
+        assert not session.enabled
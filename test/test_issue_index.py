@@ -0,0 +1,137 @@
+import os
+import subprocess
+
+import pytest
+
+from conftest import git
+
+import issue_index
+import releasenotes
+from commit_source import COMMIT_SOURCES, open_commit_source
+from issue_index import IssueIndex
+
+@pytest.fixture
+def index(tmp_path):
+    with IssueIndex(str(tmp_path / "index.sqlite")) as index:
+        yield index
+
+def update(index, git_repo, ref="HEAD", backend="gitpython"):
+    with open_commit_source(str(git_repo), backend) as commits:
+        return index.update(commits, ref)
+
+def tags_of(entries):
+    return [(jira_id, tag) for jira_id, _, _, tag in entries]
+
+@pytest.mark.parametrize("backend", sorted(COMMIT_SOURCES))
+def test_lookup_finds_each_commit_of_a_key_and_its_first_tag(git_repo, index, backend):
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABC-2 After the release")
+
+    assert update(index, git_repo, backend=backend) == 7
+
+    entries = index.lookup("ABC-2")
+    assert tags_of(entries) == [("ABC-2", "end"), ("ABC-2", "end"), ("ABC-2", None)]
+    assert [comment for _, _, comment, _ in entries] == ["Second change", "Follow up to the second change", "After the release"]
+    assert entries[-1][1] == git(git_repo, "rev-parse", "HEAD").strip()
+    assert index.lookup("ABC-9") == []
+
+def test_keys_are_parsed_as_split_commit_message_does(git_repo, index):
+    update(index, git_repo)
+
+    assert tags_of(index.lookup("ABC-3")) == [("ABC-3", "end")]
+    assert [comment for _, _, comment, _ in index.lookup("UNKNOWN")] == ["Initial commit", "No issue key here"]
+
+def test_lookup_by_prefix(git_repo, index):
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABD-1 Another project")
+    update(index, git_repo)
+
+    assert [jira_id for jira_id, _, _, _ in index.lookup_prefix("ABC-")] == ["ABC-1", "ABC-2", "ABC-2", "ABC-3"]
+    assert [jira_id for jira_id, _, _, _ in index.lookup_prefix("AB")] == ["ABC-1", "ABC-2", "ABC-2", "ABC-3", "ABD-1"]
+    assert len(index.lookup_prefix("")) == 7
+
+def test_update_only_walks_the_new_commits(git_repo, index, monkeypatch):
+    update(index, git_repo)
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABC-4 Next release")
+    git(git_repo, "tag", "next")
+
+    walked = []
+    iter_graph = COMMIT_SOURCES["gitpython"].iter_graph
+
+    def recording_iter_graph(self, source, destination):
+        for entry in iter_graph(self, source, destination):
+            walked.append(entry)
+            yield entry
+
+    monkeypatch.setattr(COMMIT_SOURCES["gitpython"], "iter_graph", recording_iter_graph)
+
+    assert update(index, git_repo) == 1
+    assert len(walked) == 1
+    assert tags_of(index.lookup("ABC-4")) == [("ABC-4", "next")]
+    assert tags_of(index.lookup("ABC-1")) == [("ABC-1", "end")]
+
+def test_merged_branch_commits_belong_to_the_tag_they_were_merged_into(git_repo, index):
+    git(git_repo, "checkout", "-q", "-b", "side", "start")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "DEF-1 Side branch change")
+    git(git_repo, "checkout", "-q", "-")
+    git(git_repo, "merge", "-q", "--no-ff", "-m", "Merge side", "side")
+    git(git_repo, "tag", "merged")
+
+    update(index, git_repo)
+
+    assert tags_of(index.lookup("DEF-1")) == [("DEF-1", "merged")]
+    assert tags_of(index.lookup("UNKNOWN")) == [("UNKNOWN", "start"), ("UNKNOWN", "end")]
+
+def test_moved_and_older_tags_reassign_every_commit(git_repo, index):
+    update(index, git_repo)
+
+    git(git_repo, "tag", "hotfix", "end~3")
+    update(index, git_repo)
+    assert tags_of(index.lookup("ABC-1")) == [("ABC-1", "hotfix")]
+    assert tags_of(index.lookup("ABC-2")) == [("ABC-2", "hotfix"), ("ABC-2", "end")]
+
+    git(git_repo, "tag", "-d", "hotfix")
+    git(git_repo, "tag", "-f", "end", "end~1")
+    update(index, git_repo)
+    assert tags_of(index.lookup("ABC-2")) == [("ABC-2", "end"), ("ABC-2", None)]
+
+@pytest.mark.parametrize("backend", sorted(COMMIT_SOURCES))
+def test_tags_are_ordered_by_ancestry_not_commit_date(git_repo, index, backend):
+    def commit(date, *args):
+        environment = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+        subprocess.run(["git", *args], cwd=git_repo, env=environment, check=True, capture_output=True)
+
+    # "second" is a descendant of "first" whose clock was behind, so its commit is older than first's. A newer
+    # commit on another branch from "first" makes git log list "first" before "second"
+    commit("2030-01-05T00:00:00", "commit", "-q", "--allow-empty", "-m", "ABC-10 Tagged first")
+    git(git_repo, "tag", "first")
+    git(git_repo, "checkout", "-q", "-b", "skewed")
+    commit("2001-01-01T00:00:00", "commit", "-q", "--allow-empty", "-m", "ABC-11 Tagged second")
+    git(git_repo, "tag", "second")
+    git(git_repo, "checkout", "-q", "-")
+    commit("2030-01-06T00:00:00", "commit", "-q", "--allow-empty", "-m", "ABC-12 Newer change")
+    commit("2030-01-07T00:00:00", "merge", "-q", "--no-ff", "-m", "Merge skewed", "skewed")
+
+    update(index, git_repo, backend=backend)
+
+    assert tags_of(index.lookup("ABC-10")) == [("ABC-10", "first")]
+    assert tags_of(index.lookup("ABC-11")) == [("ABC-11", "second")]
+    assert tags_of(index.lookup("ABC-2")) == [("ABC-2", "end"), ("ABC-2", "end")]
+
+def test_index_command(git_repo, capsys):
+    repo_arguments = ["-l", str(git_repo.parent), "-r", git_repo.name]
+
+    releasenotes.main(["index", *repo_arguments, "-u", "HEAD"])
+    releasenotes.main(["index", *repo_arguments, "ABC-1", "ABC-9", "-x", "ABC-3"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split("\t")[:2] for line in lines] == [["ABC-1", "end"], ["ABC-9", "(not found)"], ["ABC-3", "end"]]
+    assert (git_repo / ".git" / "release_notes" / "issue_index.sqlite").exists()
+
+def test_changed_parser_version_discards_the_index(git_repo, tmp_path, monkeypatch):
+    with IssueIndex(str(tmp_path / "index.sqlite")) as index:
+        update(index, git_repo)
+
+    monkeypatch.setattr(issue_index, "PARSER_VERSION", issue_index.PARSER_VERSION + 1)
+
+    with IssueIndex(str(tmp_path / "index.sqlite")) as index:
+        assert index.lookup("ABC-1") == []
+        assert update(index, git_repo) == 6
@@ -1,5 +1,6 @@
 from issue_list_from_git_log import build_jql
-from issue_list_from_git_log import parse_jira_issues_from_git_log
+from issue_list_from_git_log import build_jql_chunks
+from issue_list_from_git_log import build_default_query
 
 def test_build_jql_empty_list():
     assert build_jql([]) == "https://jira.mot-solutions.com/issues/?jql=issueKey in ()"
@@ -17,9 +18,31 @@ def test_build_jql_multi_elements():
 def test_build_jql_duplicate_elements_are_removed():
     duplicate_key = 'KEY-1'
     list = [duplicate_key, duplicate_key]
-    assert parse_jira_issues_from_git_log(list, []) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (KEY-1)"
+    assert build_default_query(list) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (KEY-1)"
 
 def test_build_jql_unknown_elements_are_removed():
     list = ['KEY-1', 'UNKNOWN']
-    blacklist = ['UNKNOWN']
-    assert parse_jira_issues_from_git_log(list, blacklist) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (KEY-1)"
+    assert build_default_query(list) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (KEY-1)"
+
+def test_default_query_keeps_first_seen_order():
+    keys = ['KEY-2', 'KEY-1', 'KEY-2', 'KEY-3', 'KEY-1']
+    assert build_default_query(keys) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (KEY-2,KEY-1,KEY-3)"
+
+def test_default_query_leaves_out_azdo_projects_and_unknown_keys_in_any_case():
+    keys = ['AZMV-1', 'KEY-1', 'azmv-2', 'UNKNOWN', 'AMZV-3', 'Azmv-5', 'amzV-1', 'unknown-4', 'KEY-2']
+    assert build_default_query(keys) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (KEY-1,KEY-2)"
+
+def test_build_jql_chunks_small_set_is_a_single_query():
+    assert build_jql_chunks(['KEY-1', 'KEY-2']) == [build_jql(['KEY-1', 'KEY-2'])]
+
+def test_build_jql_chunks_splits_on_project_boundaries():
+    issues = ['ABC-1', 'DEF-1', 'ABC-2', 'DEF-2']
+    max_length = len(build_jql(['ABC-1', 'ABC-2', 'DEF-1']))
+    assert build_jql_chunks(issues, max_length) == [build_jql(['ABC-1', 'ABC-2']), build_jql(['DEF-1', 'DEF-2'])]
+
+def test_build_jql_chunks_splits_a_project_that_is_too_long_for_one_query():
+    issues = ['ABC-' + str(number) for number in range(1000)]
+    chunks = build_jql_chunks(issues, 500)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert ','.join(chunk[len(build_jql([])) - 1:-1] for chunk in chunks) == ','.join(issues)
@@ -0,0 +1,26 @@
+import pytest
+
+from benchmark.reference import original_read_jira_export
+from benchmark.synthetic_jira_export import create_jira_export
+from jira_export import read_jira_export
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_read_jira_export_matches_dict_reader(tmp_path, use_mmap):
+    path = create_jira_export(str(tmp_path / "export.csv"), 200, custom_fields=5)
+    expected = [(key, entry.issue_type, entry.summary, entry.proposed_release_note) for key, entry in original_read_jira_export(path).items()]
+    assert list(read_jira_export(path, use_mmap=use_mmap)) == expected
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_read_jira_export_projects_named_columns(tmp_path, use_mmap):
+    path = tmp_path / "export.csv"
+    path.write_text('Summary^Issue key^Status\r\n"Multi\r\nline"^ABC-1^Done\r\n\r\nShort^ABC-2\r\n', encoding="utf-8")
+
+    rows = list(read_jira_export(str(path), ("Issue key", "Summary", "Status", "Missing"), use_mmap=use_mmap))
+
+    assert rows == [("ABC-1", "Multi\nline", "Done", None), ("ABC-2", "Short", None, None)]
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_read_empty_jira_export(tmp_path, use_mmap):
+    path = tmp_path / "export.csv"
+    path.write_text("", encoding="utf-8")
+    assert list(read_jira_export(str(path), use_mmap=use_mmap)) == []
@@ -0,0 +1,72 @@
+import jira_snapshot
+from benchmark.synthetic_jira_export import create_jira_export
+from jira_snapshot import JiraSnapshotStore
+from jira_snapshot import load_jira_issues
+from jira_snapshot import parse_jira_date
+
+HEADER = "Issue key^Issue Type^Summary^Custom field (Proposed Release Notes)^Updated^Resolved\n"
+
+def write_export(path, rows):
+    path.write_text(HEADER + "".join("^".join(row) + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+def test_snapshot_loads_the_same_issues_as_the_export(tmp_path):
+    export = create_jira_export(str(tmp_path / "export.csv"), 300, custom_fields=3)
+    store_path = str(tmp_path / "store.sqlite")
+
+    assert load_jira_issues([export], store_path) == load_jira_issues([export])
+    assert list(load_jira_issues([export], store_path)) == list(load_jira_issues([export]))
+
+def test_unchanged_export_is_not_parsed_again(tmp_path, monkeypatch):
+    export = write_export(tmp_path / "export.csv", [("ABC-1", "Story", "Summary", "Note", "", "")])
+    store_path = str(tmp_path / "store.sqlite")
+    load_jira_issues([export], store_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the export was parsed again")
+
+    monkeypatch.setattr(jira_snapshot, "read_jira_export", fail)
+    assert load_jira_issues([export], store_path) == {"ABC-1": ("Story", "Summary", "Note")}
+
+def test_merged_exports_keep_the_most_recently_updated_issue(tmp_path):
+    older = write_export(tmp_path / "older.csv", [("ABC-1", "Story", "New summary", "Note", "02/Jan/25 9:00 AM", ""),
+                                                  ("ABC-2", "Defect", "Old defect", "", "", "01/Jan/25 9:00 AM")])
+    newer = write_export(tmp_path / "newer.csv", [("ABC-1", "Story", "Old summary", "Note", "01/Jan/25 9:00 AM", ""),
+                                                  ("ABC-2", "Defect", "New defect", "", "", "03/Jan/25 9:00 AM"),
+                                                  ("ABC-3", "Story", "Only new", "", "", "")])
+
+    issues = load_jira_issues([older, newer])
+
+    assert issues == {"ABC-1": ("Story", "New summary", "Note"), "ABC-2": ("Defect", "New defect", ""), "ABC-3": ("Story", "Only new", "")}
+
+def test_load_issues_only_returns_issues_of_the_given_exports(tmp_path):
+    first = write_export(tmp_path / "first.csv", [("ABC-1", "Story", "First", "", "", "")])
+    second = write_export(tmp_path / "second.csv", [("ABC-2", "Story", "Second", "", "", "")])
+
+    with JiraSnapshotStore(str(tmp_path / "store.sqlite")) as store:
+        first_hash = store.import_export(first)
+        store.import_export(second)
+
+        assert store.load_issues([first_hash]) == {"ABC-1": ("Story", "First", "")}
+
+def test_later_imports_do_not_change_the_issues_of_an_export(tmp_path):
+    old = write_export(tmp_path / "a.csv", [("ABC-1", "Story", "old summary", "", "01/Jan/25 9:00 AM", "")])
+    new = write_export(tmp_path / "b.csv", [("ABC-1", "Story", "NEW summary", "", "02/Jan/25 9:00 AM", "")])
+    store_path = str(tmp_path / "store.sqlite")
+
+    load_jira_issues([old], store_path)
+    load_jira_issues([new], store_path)
+
+    assert load_jira_issues([old], store_path) == load_jira_issues([old]) == {"ABC-1": ("Story", "old summary", "")}
+    assert load_jira_issues([old, new], store_path) == {"ABC-1": ("Story", "NEW summary", "")}
+
+def test_undated_copies_of_an_issue_go_to_the_later_export(tmp_path):
+    dated = write_export(tmp_path / "dated.csv", [("ABC-1", "Story", "Dated", "", "02/Jan/25 9:00 AM", "")])
+    undated = write_export(tmp_path / "undated.csv", [("ABC-1", "Story", "Undated", "", "", "")])
+
+    assert load_jira_issues([dated, undated]) == {"ABC-1": ("Story", "Undated", "")}
+    assert load_jira_issues([undated, dated]) == {"ABC-1": ("Story", "Dated", "")}
+
+def test_parse_jira_date_sorts_chronologically():
+    assert parse_jira_date("09/Feb/25 1:00 PM") > parse_jira_date("10/Jan/25 11:00 AM") > parse_jira_date("")
+    assert parse_jira_date("not a date") == ""
@@ -0,0 +1,53 @@
+import csv
+
+import pytest
+
+import engineering_note_generator
+from conftest import create_git_repo
+
+from multi_repo import describe_versions
+from multi_repo import get_git_logs
+from multi_repo import load_manifest
+from multi_repo import RepoRange
+
+def test_load_manifest(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("repo_loc,repo,source,dest\n/repos,V500,v1,v2\n/repos,VB400,v3,v4\n")
+    assert [str(repo_range) for repo_range in load_manifest(str(manifest))] == ["V500 v1..v2", "VB400 v3..v4"]
+
+def test_describe_versions_removes_duplicates():
+    assert describe_versions(["v1", "v2", "v1"]) == "v1, v2"
+
+def test_get_git_logs_merges_repos_in_manifest_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_git_repo(tmp_path / "first", ["ABC-1 First repo change", "ABC-2 Shared issue in the first repo"])
+    create_git_repo(tmp_path / "second", ["ABC-2 Shared issue in the second repo", "DEF-1 Second repo change"])
+
+    repo_ranges = [RepoRange(str(tmp_path), "first", "start", "end"), RepoRange(str(tmp_path), "second", "start", "end")]
+    git_dictionary, git_log_command, git_log = get_git_logs(repo_ranges, jobs=2)
+
+    assert list(git_dictionary.keys()) == ["ABC-2", "ABC-1", "DEF-1"]
+    assert [commit.comment for commit in git_dictionary["ABC-2"]] == ["Shared issue in the first repo", "Shared issue in the second repo"]
+    assert git_log_command.startswith("first: git log")
+    assert git_log.startswith("# first\n")
+    assert "# second\n" in git_log
+
+def test_get_git_logs_exports_the_commits_of_every_repo(tmp_path):
+    create_git_repo(tmp_path / "first", ["ABC-1 First repo change", "ABC-2 Second first repo change"])
+    create_git_repo(tmp_path / "second", ["DEF-1 Second repo change"])
+
+    repo_ranges = [RepoRange(str(tmp_path), "first", "start", "end"), RepoRange(str(tmp_path), "second", "start", "end")]
+    get_git_logs(repo_ranges, jobs=2, commit_log=str(tmp_path / "commits.csv"), background_writes=True)
+
+    with open(tmp_path / "commits.csv", encoding="utf-8", newline="") as commit_log:
+        rows = list(csv.reader(commit_log))
+
+    assert rows[0] == ["Hash", "JiraId", "Comment"]
+    assert [row[1:] for row in rows[1:]] == [["ABC-2", "Second first repo change"], ["ABC-1", "First repo change"], ["DEF-1", "Second repo change"]]
+
+def test_manifest_rejects_parse_jobs(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("repo_loc,repo,source,dest\n/repos,V500,v1,v2\n")
+
+    with pytest.raises(SystemExit):
+        engineering_note_generator.main(["-m", str(manifest), "-o", str(tmp_path / "notes.html"), "--parse_jobs", "2"])
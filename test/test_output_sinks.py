@@ -0,0 +1,59 @@
+import csv
+import gzip
+
+import pytest
+
+from output_sinks import CsvSink
+from output_sinks import NullSink
+from output_sinks import open_sink
+
+HEADER = ['Hash', 'JiraId', 'Comment']
+ROWS = [("abc" + str(number), "ABC-" + str(number), "Comment, with a comma\nand a newline") for number in range(2500)]
+
+def read_rows(path, opener=open):
+    with opener(path, "rt", encoding="utf-8", newline="") as csv_file:
+        return [tuple(row) for row in csv.reader(csv_file)]
+
+@pytest.mark.parametrize("background", [False, True])
+def test_sink_writes_header_and_every_row(tmp_path, background):
+    path = str(tmp_path / "commits.csv")
+    with open_sink(path, HEADER, background) as sink:
+        sink.write_rows(iter(ROWS))
+
+    assert read_rows(path) == [tuple(HEADER)] + ROWS
+
+def test_sink_compresses_gz_paths(tmp_path):
+    path = str(tmp_path / "commits.csv.gz")
+    with open_sink(path, HEADER, background=True) as sink:
+        for row in ROWS:
+            sink.write(row)
+
+    assert read_rows(path, gzip.open) == [tuple(HEADER)] + ROWS
+
+def test_sink_matches_writing_rows_one_at_a_time(tmp_path):
+    with open(tmp_path / "expected.csv", "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=',')
+        writer.writerow(HEADER)
+        for row in ROWS:
+            writer.writerow(row)
+
+    with CsvSink(str(tmp_path / "sink.csv"), HEADER, batch_size=7) as sink:
+        sink.write_rows(ROWS)
+
+    assert (tmp_path / "sink.csv").read_bytes() == (tmp_path / "expected.csv").read_bytes()
+
+def test_background_write_errors_are_raised_on_close(tmp_path):
+    sink = CsvSink(str(tmp_path / "commits.csv"), HEADER, background=True, batch_size=1)
+
+    # Writing to a closed file raises ValueError in the background thread
+    sink.output_file.close()
+    sink.write(["row"])
+
+    with pytest.raises(ValueError):
+        sink.close()
+
+def test_no_path_discards_rows(tmp_path):
+    sink = open_sink(None, HEADER)
+    assert isinstance(sink, NullSink)
+    sink.write_rows(ROWS)
+    sink.close()
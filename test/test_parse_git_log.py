@@ -1,6 +1,17 @@
+import gzip
+import os
+import subprocess
+
+from conftest import git
+
 from parse_git_log import trim_excess_prefix_characters
 from parse_git_log import split_commit_message
+from parse_git_log import split_commit_messages
 from parse_git_log import GitCommitMessage
+from parse_git_log import stream_git_log
+from parse_git_log import get_git_log
+from parse_git_log import iter_git_log
+from parse_git_log import iter_parallel_parse
 
 def test_trim_single_comma():
     assert trim_excess_prefix_characters(",abcdef") == "abcdef"
@@ -44,15 +55,11 @@ def test_commit_message_contains_sha_jira_message_and_can_fix_malformed_jira_ids
     assert(log.jira_id == "ABC-123")
     assert(log.comment == "My fancy message")
 
-#TODO: Fix this Failing test. The regex is matching the second jira id, not the first
-#      This is conflicting with 'test_commit_message_punctuation_between_jira_and_commit_message'
-#      which is matching this regex = r"([\s]([a-zA-Z0-9]+-[0-9]+)[\s](.+))" (note [\s])
-#
-#def test_commit_message_contains_sha_jira_message_and_can_fix_malformed_jira_ids_dont_match_second_jira_id():
-#    log = split_commit_message("abcd123 ABC:123 My fancy message ABC-456")
-#    assert(log.hash == "abcd123")
-#    assert(log.jira_id == "ABC-123")
-#    assert(log.comment == "My fancy message ABC-456")
+def test_commit_message_contains_sha_jira_message_and_can_fix_malformed_jira_ids_dont_match_second_jira_id():
+    log = split_commit_message("abcd123 ABC:123 My fancy message ABC-456")
+    assert(log.hash == "abcd123")
+    assert(log.jira_id == "ABC-123")
+    assert(log.comment == "My fancy message ABC-456")
 
 def test_commit_message_could_not_find_sha_in_git_log():
     log = split_commit_message("my_entry_that_is_not_a_hash ABC-123 My fancy message")
@@ -72,3 +79,128 @@ def test_commit_message_punctuation_between_jira_and_commit_message():
     assert(log.jira_id == "ABC-123") #TODO: Should handle this case to parse the punctuation
     assert(log.comment == "My fancy message")
 
+
+def test_stream_git_log_yields_commits_newest_first(git_repo):
+    commits = list(stream_git_log(str(git_repo.parent), git_repo.name, "start", "end"))
+    assert([commit.jira_id for commit in commits] == ["ABC-2", "UNKNOWN", "ABC-3", "ABC-2", "ABC-1"])
+
+def test_get_git_log_groups_commits_by_jira_id(git_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    git_dictionary, git_log_command, git_log = get_git_log(str(git_repo.parent), git_repo.name, "start", "end")
+    assert(list(git_dictionary.keys()) == ["ABC-2", "UNKNOWN", "ABC-3", "ABC-1"])
+    assert([commit.comment for commit in git_dictionary["ABC-2"]] == ["Follow up to the second change", "Second change"])
+    assert(git_log_command == "git log --oneline --no-merges --no-decorate start..end\n")
+    assert(len(git_log.splitlines()) == 5)
+    assert((tmp_path / "commitMessages.csv").exists())
+
+def test_split_commit_messages_parses_every_line():
+    logs = list(split_commit_messages(iter(["abcd123 ABC-123 My fancy message", "abcd456 No jira id"])))
+    assert([log.jira_id for log in logs] == ["ABC-123", "UNKNOWN"])
+    assert([log.comment for log in logs] == ["My fancy message", "No jira id"])
+
+def test_get_git_log_with_cache_matches_uncached_log(git_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def fields(git_log):
+        git_dictionary, git_log_command, full_log = git_log
+        commits = [(commit.hash, commit.jira_id, commit.comment) for entry in git_dictionary.values() for commit in entry]
+        return commits, git_log_command, full_log
+
+    uncached = fields(get_git_log(str(git_repo.parent), git_repo.name, "start", "end"))
+    first_run = fields(get_git_log(str(git_repo.parent), git_repo.name, "start", "end", use_cache=True))
+    second_run = fields(get_git_log(str(git_repo.parent), git_repo.name, "start", "end", use_cache=True))
+    assert((git_repo / ".git" / "release_notes" / "commit_cache.sqlite").exists())
+    assert(first_run == uncached)
+    assert(second_run == uncached)
+
+def test_get_git_log_with_cache_combines_previously_resolved_ranges(git_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    repo_location = str(git_repo.parent)
+
+    _, _, uncached_log = get_git_log(repo_location, git_repo.name, "start", "end")
+
+    get_git_log(repo_location, git_repo.name, "start", "end~3", use_cache=True)
+    get_git_log(repo_location, git_repo.name, "end~3", "end", use_cache=True)
+    git_dictionary, _, cached_log = get_git_log(repo_location, git_repo.name, "start", "end", use_cache=True)
+
+    assert(cached_log == uncached_log)
+    assert([commit.comment for commit in git_dictionary["ABC-2"]] == ["Follow up to the second change", "Second change"])
+
+def test_get_git_log_with_cache_keeps_the_date_order_of_a_merged_branch(git_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    repo_location = str(git_repo.parent)
+
+    def commit(message, date, *args):
+        environment = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+        subprocess.run(["git", *args, "-m", message], cwd=git_repo, env=environment, check=True, capture_output=True)
+
+    # A side branch commit that is older than the commit tagged B on master, merged after B
+    git(git_repo, "checkout", "-q", "-b", "side", "end")
+    commit("ABC-10 Side change", "2030-01-02T00:00:00", "commit", "-q", "--allow-empty")
+    git(git_repo, "checkout", "-q", "-")
+    commit("ABC-1 Tagged change", "2030-01-03T00:00:00", "commit", "-q", "--allow-empty")
+    git(git_repo, "tag", "B")
+    commit("Merge side", "2030-01-04T00:00:00", "merge", "-q", "--no-ff", "side")
+    commit("ABC-2 Later change", "2030-01-05T00:00:00", "commit", "-q", "--allow-empty")
+    git(git_repo, "tag", "C")
+
+    _, _, uncached_log = get_git_log(repo_location, git_repo.name, "end", "C")
+
+    get_git_log(repo_location, git_repo.name, "end", "B", use_cache=True)
+    get_git_log(repo_location, git_repo.name, "B", "C", use_cache=True)
+    _, _, first_log = get_git_log(repo_location, git_repo.name, "end", "C", use_cache=True)
+    _, _, second_log = get_git_log(repo_location, git_repo.name, "end", "C", use_cache=True)
+
+    assert([line.split(" ", 1)[1] for line in uncached_log.splitlines()] == ["ABC-2 Later change", "ABC-1 Tagged change", "ABC-10 Side change"])
+    assert(first_log == uncached_log)
+    assert(second_log == uncached_log)
+
+def test_get_git_log_with_cache_reads_commits_missing_from_the_cache_from_git(git_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    repo_location = str(git_repo.parent)
+
+    _, _, first_log = get_git_log(repo_location, git_repo.name, "start", "end", use_cache=True)
+    (git_repo / ".git" / "release_notes" / "commit_cache.sqlite").unlink()
+    _, _, second_log = get_git_log(repo_location, git_repo.name, "start", "end", use_cache=True)
+
+    assert(second_log == first_log)
+
+def test_iter_git_log_yields_the_commits_of_get_git_log(git_repo, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    commit_dictionary, _, full_log = get_git_log(str(git_repo.parent), git_repo.name, "start", "end", commit_log=None)
+    entries = list(iter_git_log(str(git_repo.parent), git_repo.name, "start", "end", commit_log=None))
+
+    assert "".join(line + "\n" for line, _ in entries) == full_log
+    assert [(commit.hash, commit.jira_id, commit.comment) for _, commit in entries] == \
+        sorted(((commit.hash, commit.jira_id, commit.comment) for commits in commit_dictionary.values() for commit in commits),
+               key=lambda entry: full_log.index(entry[0]))
+
+def test_get_git_log_exports_commits_to_a_compressed_commit_log(git_repo, tmp_path):
+    commit_log = str(tmp_path / "commits.csv.gz")
+    commit_dictionary, _, _ = get_git_log(str(git_repo.parent), git_repo.name, "start", "end", commit_log=commit_log, background_writes=True)
+
+    with gzip.open(commit_log, "rt", encoding="utf-8") as commit_log_file:
+        lines = commit_log_file.read().splitlines()
+
+    assert lines[0] == "Hash,JiraId,Comment"
+    assert len(lines) - 1 == sum(len(commits) for commits in commit_dictionary.values())
+
+def test_iter_parallel_parse_matches_the_serial_parser_in_order():
+    lines = ["abcd" + format(number, "03x") + " ABC-" + str(number % 7) + " Change " + str(number) for number in range(50)] + ["No sha or jira id"]
+    serial = [(commit.hash, commit.jira_id, commit.comment) for commit in split_commit_messages(lines)]
+
+    entries = list(iter_parallel_parse(iter(lines), 2, chunk_size=3))
+
+    assert [line for line, _ in entries] == lines
+    assert [(commit.hash, commit.jira_id, commit.comment) for _, commit in entries] == serial
+
+def test_get_git_log_parsed_in_parallel_matches_serial_log(git_repo):
+    def fields(git_log):
+        git_dictionary, git_log_command, full_log = git_log
+        return {key: [(commit.hash, commit.comment) for commit in commits] for key, commits in git_dictionary.items()}, git_log_command, full_log
+
+    serial = get_git_log(str(git_repo.parent), git_repo.name, "start", "end", commit_log=None)
+    parallel = get_git_log(str(git_repo.parent), git_repo.name, "start", "end", commit_log=None, parse_jobs=2)
+
+    assert fields(parallel) == fields(serial)
+    assert list(parallel[0]) == list(serial[0])
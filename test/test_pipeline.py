@@ -0,0 +1,63 @@
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline
+
+def test_independent_stages_run_concurrently():
+    both_started = threading.Barrier(2, timeout=5)
+
+    def stage(value):
+        both_started.wait()
+        return value
+
+    with Pipeline() as pipeline:
+        first = pipeline.run("first", stage, 1)
+        second = pipeline.run("second", stage, 2)
+        assert (first.result(), second.result()) == (1, 2)
+
+def test_stages_wait_for_their_inputs():
+    with Pipeline() as pipeline:
+        numbers = pipeline.run("numbers", lambda: [1, 2, 3])
+        total = pipeline.run("total", sum, numbers)
+        assert total.result() == 6
+
+def test_stream_passes_every_item_in_order():
+    with Pipeline() as pipeline:
+        items = pipeline.stream("produce", iter(range(10000)), batch_size=7, queue_length=2)
+        assert pipeline.run("consume", list, items).result() == list(range(10000))
+
+    assert "produce" in [timing.name for timing in pipeline.timings]
+    assert pipeline.timings[0].items == 10000
+
+def test_stream_raises_producer_errors_in_the_consumer():
+    def produce():
+        yield 1
+        raise ValueError("broken")
+
+    with Pipeline() as pipeline:
+        with pytest.raises(ValueError):
+            list(pipeline.stream("produce", produce()))
+
+def test_closing_stops_producers_blocked_on_a_full_queue():
+    with Pipeline() as pipeline:
+        items = pipeline.stream("produce", iter(range(100000)), batch_size=1, queue_length=1)
+        assert next(items) == 0
+
+def test_a_failed_stage_stops_a_consumer_while_the_stream_is_producing():
+    def produce():
+        for item in range(100000):
+            time.sleep(0.001)
+            yield item
+
+    with pytest.raises(ValueError):
+        with Pipeline() as pipeline:
+            items = pipeline.stream("produce", produce(), batch_size=10, queue_length=1)
+            consumed = pipeline.run("consume", list, items)
+            failed = pipeline.run("fail", int, "not a number")
+            failed.result()
+
+    with pytest.raises(concurrent.futures.CancelledError):
+        consumed.result()
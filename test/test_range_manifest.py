@@ -0,0 +1,52 @@
+from conftest import git
+
+import git as gitpython
+
+from range_manifest import RangeManifests
+from range_manifest import plan_range
+
+def test_lookup_unknown_range_returns_none(tmp_path):
+    with RangeManifests(str(tmp_path / "manifests.sqlite")) as manifests:
+        assert manifests.lookup("a", "b") is None
+
+def test_lookup_returns_stored_shas(tmp_path):
+    with RangeManifests(str(tmp_path / "manifests.sqlite")) as manifests:
+        manifests.store("a", "b", True, True, ["sha2", "sha1"])
+        manifests.store("a", "a", True, True, [])
+        assert manifests.lookup("a", "b") == ["sha2", "sha1"]
+        assert manifests.lookup("a", "a") == []
+
+def test_plan_walks_unknown_range(git_repo, tmp_path):
+    repo = gitpython.Repo(str(git_repo))
+    start, end = git(git_repo, "rev-parse", "start", "end").split()
+
+    with RangeManifests(str(tmp_path / "manifests.sqlite")) as manifests:
+        assert plan_range(repo, manifests, start, end) == [(start, end, None)]
+
+def test_plan_chains_stored_ranges_and_walks_the_rest(git_repo, tmp_path):
+    repo = gitpython.Repo(str(git_repo))
+    start, middle, end = git(git_repo, "rev-parse", "start", "end~3", "end").split()
+
+    with RangeManifests(str(tmp_path / "manifests.sqlite")) as manifests:
+        manifests.store(start, middle, True, True, ["sha2", "sha1"])
+        assert plan_range(repo, manifests, start, end) == [(middle, end, None), (start, middle, ["sha2", "sha1"])]
+
+        manifests.store(middle, end, True, True, ["sha5", "sha4", "sha3"])
+        assert plan_range(repo, manifests, start, end) == [(middle, end, ["sha5", "sha4", "sha3"]), (start, middle, ["sha2", "sha1"])]
+
+def test_plan_does_not_chain_a_range_past_the_destination(git_repo, tmp_path):
+    repo = gitpython.Repo(str(git_repo))
+    start, middle, end = git(git_repo, "rev-parse", "start", "end~3", "end").split()
+
+    with RangeManifests(str(tmp_path / "manifests.sqlite")) as manifests:
+        manifests.store(start, end, True, True, ["sha5", "sha4", "sha3", "sha2", "sha1"])
+        assert plan_range(repo, manifests, start, middle) == [(start, middle, None)]
+
+def test_plan_does_not_chain_a_range_with_merges(git_repo, tmp_path):
+    repo = gitpython.Repo(str(git_repo))
+    start, middle, end = git(git_repo, "rev-parse", "start", "end~3", "end").split()
+
+    with RangeManifests(str(tmp_path / "manifests.sqlite")) as manifests:
+        manifests.store(start, middle, True, False, ["sha2", "sha1"])
+        assert plan_range(repo, manifests, start, end) == [(start, end, None)]
+        assert plan_range(repo, manifests, start, middle) == [(start, middle, ["sha2", "sha1"])]
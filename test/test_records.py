@@ -0,0 +1,29 @@
+import pickle
+
+from records import ConsolidatedEntry
+from records import GitCommitMessage
+from records import JiraExportQueryEntry
+from records import ReleaseNoteDataImport
+
+def test_records_have_no_instance_dictionary():
+    records = [GitCommitMessage("abc123", "ABC-1", "Message"),
+               ConsolidatedEntry("ABC-1", "Yes", "Yes", "Summary", "Story", "Message", "Note"),
+               JiraExportQueryEntry(**{'Issue key': "ABC-1", 'Issue Type': "Story"}),
+               ReleaseNoteDataImport(JiraId="ABC-1", Take="Yes")]
+
+    for record in records:
+        assert not hasattr(record, "__dict__")
+
+def test_commits_share_one_copy_of_each_issue_key():
+    first = GitCommitMessage("abc123", "-".join(("ABC", "1")), "First")
+    second = GitCommitMessage("abc456", "-".join(("ABC", "1")), "Second")
+    assert first.jira_id is second.jira_id
+
+def test_missing_jira_columns_are_none():
+    entry = JiraExportQueryEntry(**{'Issue key': "ABC-1"})
+    assert entry.issue_key == "ABC-1"
+    assert entry.status is None
+
+def test_commits_can_be_pickled():
+    commit = pickle.loads(pickle.dumps(GitCommitMessage("abc123", "ABC-1", "Message")))
+    assert (commit.hash, commit.jira_id, commit.comment) == ("abc123", "ABC-1", "Message")
@@ -0,0 +1,41 @@
+import csv
+import json
+import sys
+
+import release_note_generator
+
+JIRA_EXPORT = ("Issue Type^Issue key^Summary^Custom field (Proposed Release Notes)\n"
+               "Story^ABC-1^The first story^First note\n"
+               "Defect^ABC-9^Not in git^Ninth note\n")
+
+SANITISED = ("JiraId\tIssueType\tInJira\tInGit\tJira Comment\tGit Comment\tProposedReleaseNote\tTake\tActualReleaseNote\n"
+             "ABC-1\tStory\tYes\tYes\tThe first story\tFirst change\tFirst note\tYes\tThe first release note\n"
+             "ABC-9\tDefect\tYes\tNo\tNot in git\t\tNinth note\tNo\t\n")
+
+def test_release_note_generator_writes_review_and_html(git_repo, tmp_path, monkeypatch):
+    (tmp_path / "jira.csv").write_text(JIRA_EXPORT, encoding="utf-8")
+    (tmp_path / "sanitised.tsv").write_text(SANITISED, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["release_note_generator.py", "-j", "jira.csv", "-l", str(git_repo.parent), "-r", git_repo.name,
+                                      "-s", "start", "-d", "end", "-i", "sanitised.tsv", "-v", "review.csv", "-o", "notes.html",
+                                      "--no_commit_log", "--profile", "--metrics", "metrics.json"])
+
+    release_note_generator.main()
+
+    with open(tmp_path / "review.csv", encoding="utf-8", newline="") as review_file:
+        rows = list(csv.reader(review_file))
+
+    assert [row[:4] for row in rows] == [["JiraId", "IssueType", "InJira", "InGit"], ["ABC-1", "Story", "Yes", "Yes"], ["ABC-9", "Defect", "Yes", "No"],
+                                         ["ABC-2", "", "No", "Yes"], ["UNKNOWN", "", "No", "Yes"], ["ABC-3", "", "No", "Yes"]]
+    assert rows[3][5] == "Follow up to the second change\nSecond change\n"
+
+    html = (tmp_path / "notes.html").read_text()
+    assert "The first release note" in html
+    assert "Ninth note" not in html
+    assert not (tmp_path / "commitMessages.csv").exists()
+
+    metrics = json.loads((tmp_path / "metrics.json").read_text())
+    assert metrics["counters"]["jira rows"] == 2
+    assert metrics["counters"]["commits parsed"] == 5
+    assert metrics["counters"]["UNKNOWN keys"] == 1
+    assert "read git log" in metrics["timers"]
@@ -0,0 +1,90 @@
+import pytest
+
+from conftest import git
+
+import engineering_note_generator
+from commit_source import COMMIT_SOURCES
+from parse_git_log import get_git_log
+from release_train import assign_commits, get_release_train
+
+TRAIN = ["start", "v1", "v2", "v3"]
+
+@pytest.fixture
+def train_repo(git_repo):
+    """The git_repo fixture continued into a train of tags v1..v3, with a side branch started before v1 and merged after it"""
+    git(git_repo, "checkout", "-q", "-b", "side", "end")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "DEF-1 Side branch change")
+    git(git_repo, "checkout", "-q", "-")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABC-4 In the first release")
+    git(git_repo, "tag", "v1")
+    git(git_repo, "merge", "-q", "--no-ff", "-m", "Merge side", "side")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABC-5 In the second release")
+    git(git_repo, "tag", "v2")
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABC-1 Back to the first issue")
+    git(git_repo, "tag", "v3")
+
+    return git_repo
+
+def as_tuples(git_dictionary):
+    return {key: [(commit.hash, commit.jira_id, commit.comment) for commit in commits] for key, commits in git_dictionary.items()}
+
+def test_assign_commits_picks_the_first_tag_that_contains_each_commit():
+    # a <- b <- d (tag 0), c <- d is a merge, c is only reachable from tag 1 through e
+    parents = {"b": ("a",), "c": ("a",), "d": ("b",), "e": ("d", "c")}
+
+    assert assign_commits(parents, ["d", "e"]) == {"d": 0, "b": 0, "e": 1, "c": 1}
+
+@pytest.mark.parametrize("backend", sorted(COMMIT_SOURCES))
+def test_each_pair_matches_get_git_log(train_repo, backend):
+    train = get_release_train(str(train_repo.parent), train_repo.name, TRAIN, backend=backend, commit_log=None, roll_up=True)
+
+    expected_ranges = list(zip(TRAIN, TRAIN[1:])) + [("start", "v3")]
+    assert [(source, destination) for source, destination, _, _, _ in train] == expected_ranges
+
+    for source, destination, git_dictionary, git_log_command, git_log in train:
+        expected_dictionary, expected_command, expected_log = get_git_log(str(train_repo.parent), train_repo.name, source, destination, commit_log=None)
+
+        assert as_tuples(git_dictionary) == as_tuples(expected_dictionary)
+        assert (git_log_command, git_log) == (expected_command, expected_log)
+
+def test_side_branch_commit_belongs_to_the_release_it_was_merged_into(train_repo):
+    train = get_release_train(str(train_repo.parent), train_repo.name, TRAIN, commit_log=None)
+
+    assert [sorted(git_dictionary) for _, _, git_dictionary, _, _ in train] == [["ABC-1", "ABC-2", "ABC-3", "ABC-4", "UNKNOWN"], ["ABC-5", "DEF-1"], ["ABC-1"]]
+
+def test_commit_log_lists_every_commit_of_the_train_once(train_repo, tmp_path):
+    get_release_train(str(train_repo.parent), train_repo.name, TRAIN, commit_log=str(tmp_path / "commits.csv"))
+
+    assert len((tmp_path / "commits.csv").read_text().splitlines()) == 1 + 9
+
+def test_tag_outside_the_train_is_rejected(train_repo):
+    git(train_repo, "checkout", "-q", "-b", "elsewhere", "v1")
+    git(train_repo, "commit", "-q", "--allow-empty", "-m", "GHI-1 Never merged")
+    git(train_repo, "tag", "unmerged")
+
+    with pytest.raises(ValueError, match="^unmerged is not an ancestor of v3,"):
+        get_release_train(str(train_repo.parent), train_repo.name, ["start", "unmerged", "v3"], commit_log=None)
+
+@pytest.mark.parametrize("train, message", [(["start", "v2", "v1", "v3"], "v2 is not an ancestor of v1"),
+                                            (["start", "v1", "v3", "v2"], "v3 is not an ancestor of v2"),
+                                            (["start", "side", "v1", "v3"], "side is not an ancestor of v1"),
+                                            (["start", "v1", "side", "v3"], "v1 is not an ancestor of side")])
+def test_tags_that_are_not_ancestors_of_the_next_tag_are_rejected(train_repo, train, message):
+    with pytest.raises(ValueError, match="^" + message + ","):
+        get_release_train(str(train_repo.parent), train_repo.name, train, commit_log=None)
+
+def test_train_of_tags_out_of_order_is_a_usage_error(train_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit):
+        engineering_note_generator.main(["-l", str(train_repo.parent), "-r", train_repo.name, "--train", "start", "v2", "v1", "-o", "notes.html", "-n"])
+
+def test_engineering_notes_for_a_train(train_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    engineering_note_generator.main(["-l", str(train_repo.parent), "-r", train_repo.name, "--train", *TRAIN, "--roll_up", "-o", "notes.html", "-n"])
+
+    assert "ABC-5" in (tmp_path / "notes_v1-v2.html").read_text()
+    assert "ABC-5" not in (tmp_path / "notes_v2-v3.html").read_text()
+    assert "DEF-1" in (tmp_path / "notes.html").read_text()
+    assert (tmp_path / "notes_start-v1.html").exists()
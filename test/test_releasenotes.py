@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import webbrowser
+
+import pytest
+
+import releasenotes
+
+def test_importing_releasenotes_does_not_import_the_tools():
+    # Run in a fresh interpreter, as the tests themselves have imported every module
+    script = ("import sys, releasenotes\n"
+              "print(' '.join(module for module in ('release_note_generator', 'engineering_note_generator', 'issue_list_from_git_log',"
+              " 'parse_git_log', 'sqlite3', 'cProfile', 'webbrowser') if module in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(releasenotes.__file__)), capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
+
+def test_jql_command_runs_issue_list_from_git_log(git_repo, tmp_path, monkeypatch):
+    opened = []
+    monkeypatch.setattr(webbrowser, "open", lambda url, new=0: opened.append(url))
+    monkeypatch.chdir(tmp_path)
+
+    releasenotes.main(["jql", "-l", str(git_repo.parent), "-r", git_repo.name, "-s", "start", "-d", "end", "-o", "jql.txt", "--no_commit_log"])
+
+    assert (tmp_path / "jql.txt").read_text() == "https://jira.mot-solutions.com/issues/?jql=issueKey in (ABC-2,ABC-3,ABC-1)"
+    assert opened == ["https://jira.mot-solutions.com/issues/?jql=issueKey in (ABC-2,ABC-3,ABC-1)"]
+
+def test_command_help_is_named_after_the_command(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        releasenotes.main(["engineering", "--help"])
+
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.startswith("usage: releasenotes engineering")
+
+def test_unknown_command_is_an_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        releasenotes.main(["publish"])
+
+    assert exit_info.value.code == 2
+    assert "invalid choice: 'publish'" in capsys.readouterr().err
@@ -0,0 +1,102 @@
+import json
+import re
+
+import engineering_note_generator
+from parse_git_log import split_commit_message
+from records import GitCommitMessage
+from render_paged_html import render_engineering_notes_paged, render_engineering_notes_paged_streaming, chunk_directory, PagedNoteWriter, ISSUES
+
+LINES = ["abc123 ABC-1 Feature", "abc456 AZMV-2 Story", "abc789 ABC-1 Feature fix", "abd000 No issue", "abd111 ABC-3 <b>Markup</b> é"]
+COMMAND = "git log --oneline v1..v2\n"
+
+def read_chunks(directory, kind):
+    """The rows of every chunk of a kind, in page order, checking each chunk is a call with its kind and page"""
+    rows = []
+    for page, path in enumerate(sorted(directory.glob(kind + "-*.js"))):
+        match = re.fullmatch(r'releaseNotesChunk\("(\w+)", (\d+), (.*)\);\n', path.read_text(encoding="utf-8"), re.DOTALL)
+        assert match.group(1, 2) == (kind, str(page))
+        rows.extend(json.loads(match.group(3)))
+    return rows
+
+def read_manifest(index):
+    return json.loads(re.search(r"var manifest = (.*);", index.read_text()).group(1))
+
+def commits():
+    return [split_commit_message(line) for line in LINES]
+
+def test_rows_are_split_into_chunks_listed_by_the_index(tmp_path):
+    issues = commits()
+
+    render_engineering_notes_paged(str(tmp_path / "notes.html"), "v1", "v2", issues, COMMAND, "".join(line + "\n" for line in LINES), "https://jira/?jql=x", page_size=2)
+
+    assert read_chunks(tmp_path / "notes_files", "issues") == [
+        ["ABC-1", '<a href="https://jira.mot-solutions.com/browse/ABC-1">ABC-1</a>', "Feature"],
+        ["AZMV-2", '<a href="https://dev.azure.com/MobileVideo/VideoManager/_workitems/edit/2">AZMV-2</a>', "Story"],
+        ["ABC-1", '<a href="https://jira.mot-solutions.com/browse/ABC-1">ABC-1</a>', "Feature fix"],
+        ["UNKNOWN", "UNKNOWN", "No issue"],
+        ["ABC-3", '<a href="https://jira.mot-solutions.com/browse/ABC-3">ABC-3</a>', "<b>Markup</b> é"],
+    ]
+    assert read_chunks(tmp_path / "notes_files", "log") == LINES
+
+    manifest = read_manifest(tmp_path / "notes.html")
+    assert manifest == {"directory": "notes_files", "pageSize": 2,
+                        "issues": {"rows": 5, "pages": 3}, "log": {"rows": 5, "pages": 3}}
+    assert sorted(path.name for path in (tmp_path / "notes_files").iterdir()) == ["issues-00000.js", "issues-00001.js", "issues-00002.js",
+                                                                                  "log-00000.js", "log-00001.js", "log-00002.js"]
+
+def test_index_page_holds_no_rows(tmp_path):
+    issues = [GitCommitMessage("abc%04d" % number, "ABC-" + str(number), "A change to the firmware") for number in range(10000)]
+    git_log = "".join("abc%04d ABC-%d A change to the firmware\n" % (number, number) for number in range(10000))
+
+    render_engineering_notes_paged(str(tmp_path / "notes.html"), "v1", "v2", issues, COMMAND, git_log, "https://jira/?jql=x")
+
+    index = (tmp_path / "notes.html").read_text()
+    assert "A change to the firmware" not in index
+    assert 'href="https://jira/?jql=x"' in index and COMMAND in index
+    assert len(index) < 20000
+
+def test_streamed_paged_notes_match_paged_notes(tmp_path):
+    issues = commits()
+
+    render_engineering_notes_paged(str(tmp_path / "buffered.html"), "v1", "v2", issues, COMMAND, "".join(line + "\n" for line in LINES), "https://jira/?jql=x", page_size=2)
+    render_engineering_notes_paged_streaming(str(tmp_path / "streamed.html"), "v1", "v2", zip(LINES, commits()), COMMAND,
+                                             lambda keys: "https://jira/?jql=" + ",".join(keys), page_size=2)
+
+    for kind in ("issues", "log"):
+        assert read_chunks(tmp_path / "streamed_files", kind) == read_chunks(tmp_path / "buffered_files", kind)
+    assert (tmp_path / "streamed.html").read_text().replace("streamed_files", "buffered_files") == \
+        (tmp_path / "buffered.html").read_text().replace("jql=x", "jql=ABC-1,AZMV-2,UNKNOWN,ABC-3")
+
+def test_chunks_of_an_earlier_longer_render_are_removed(tmp_path):
+    render_engineering_notes_paged(str(tmp_path / "notes.html"), "v1", "v2", [], COMMAND, "\n".join(LINES), "", page_size=1)
+    render_engineering_notes_paged(str(tmp_path / "notes.html"), "v1", "v2", [], COMMAND, LINES[0], "", page_size=1)
+
+    assert sorted(path.name for path in (tmp_path / "notes_files").iterdir()) == ["log-00000.js"]
+    assert chunk_directory("out/notes.html") == "out/notes_files"
+
+def test_engineering_notes_paged_option(git_repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    engineering_note_generator.main(["-l", str(git_repo.parent), "-r", git_repo.name, "-s", "start", "-d", "end", "-o", "notes.html", "-n",
+                                     "--paged", "--page_size", "2"])
+
+    assert read_manifest(tmp_path / "notes.html")["issues"]["rows"] == 5
+    assert sorted(row[0] for row in read_chunks(tmp_path / "notes_files", "issues")) == ["ABC-1", "ABC-2", "ABC-2", "ABC-3", "UNKNOWN"]
+    assert len(read_chunks(tmp_path / "notes_files", "log")) == 5
+
+def test_rows_are_written_a_chunk_at_a_time_as_they_are_read(tmp_path):
+    writer = PagedNoteWriter(str(tmp_path / "notes.html"), page_size=2)
+    read = []
+
+    def rows():
+        for row in range(5):
+            # Every full chunk before this row has been written, and the pending chunk holds the rest
+            assert len(list((tmp_path / "notes_files").glob("issues-*.js"))) == row // 2
+            read.append(row)
+            yield [str(row)]
+
+    writer.add(ISSUES, rows())
+
+    assert read == list(range(5))
+    assert read_chunks(tmp_path / "notes_files", "issues") == [["0"], ["1"], ["2"], ["3"]]
+    assert writer.pending[ISSUES] == [["4"]]
@@ -0,0 +1,39 @@
+from benchmark import reference_render_to_html
+from records import ConsolidatedEntry, GitCommitMessage
+from parse_git_log import split_commit_message
+from render_to_html import render_engineering_notes
+from render_to_html import render_engineering_notes_streaming
+from render_to_html import render_to_html
+
+ISSUES = [
+    ConsolidatedEntry("ABC-1", "Yes", "Yes", "A new feature", "Epic", "ABC-1 Feature", "The feature release note"),
+    ConsolidatedEntry("ABC-2", "Yes", "Yes", "A story", "Story", "ABC-2 Story", "The story release note"),
+    ConsolidatedEntry("ABC-3", "Yes", "Yes", "A defect", "Defect", "ABC-3 Defect", "The defect release note"),
+    ConsolidatedEntry("ABC-4", "Yes", "Yes", "A support issue", "Support", "ABC-4 Support", "The support release note"),
+    ConsolidatedEntry("ABC-5", "Yes", "Yes", "A spike", "Spike", "ABC-5 Spike", "The spike release note"),
+    ConsolidatedEntry("AZMV-6", "No", "Yes", "", "", "An AZDO issue", ""),
+    ConsolidatedEntry("UNKNOWN", "No", "Yes", "", "", "No issue", ""),
+]
+
+def test_render_to_html_matches_original_renderer(tmp_path):
+    render_to_html(str(tmp_path / "new.html"), "v2", "v1", ISSUES)
+    reference_render_to_html.render_to_html(str(tmp_path / "original.html"), "v2", "v1", ISSUES)
+    assert (tmp_path / "new.html").read_bytes() == (tmp_path / "original.html").read_bytes()
+
+def test_render_engineering_notes_matches_original_renderer(tmp_path):
+    arguments = ("git log --oneline v1..v2\n", "abc123 ABC-1 Feature\nabc456 ABC-2 Story\n", "https://jira/?jql=x")
+    commits = [GitCommitMessage("abc123", issue.jira_id, issue.git_comment) for issue in ISSUES]
+    render_engineering_notes(str(tmp_path / "new.html"), "v1", "v2", commits, *arguments)
+    reference_render_to_html.render_engineering_notes(str(tmp_path / "original.html"), "v1", "v2", ISSUES, *arguments)
+    assert (tmp_path / "new.html").read_bytes() == (tmp_path / "original.html").read_bytes()
+
+def test_streamed_engineering_notes_match_engineering_notes(tmp_path):
+    lines = ["abc123 ABC-1 Feature", "abc456 ABC-2 Story", "abc789 ABC-1 Feature fix"]
+    commits = [split_commit_message(line) for line in lines]
+    command = "git log --oneline v1..v2\n"
+
+    render_engineering_notes(str(tmp_path / "buffered.html"), "v1", "v2", commits, command, "".join(line + "\n" for line in lines), "https://jira/?jql=x")
+    render_engineering_notes_streaming(str(tmp_path / "streamed.html"), "v1", "v2", zip(lines, commits), command,
+                                       lambda keys: "https://jira/?jql=" + ",".join(keys))
+
+    assert (tmp_path / "streamed.html").read_text() == (tmp_path / "buffered.html").read_text().replace("jql=x", "jql=ABC-1,ABC-2")
@@ -0,0 +1,23 @@
+from sqlite_store import SQLiteStore, LOOKUP_BATCH_SIZE
+
+class KeyStore(SQLiteStore):
+    TABLES = ("keys",)
+    SCHEMA = ("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY, value INTEGER)",)
+
+def test_changing_version_drops_the_tables(tmp_path):
+    path = str(tmp_path / "nested" / "store.sqlite")
+    with KeyStore(path, 1) as store:
+        store.connection.execute("INSERT INTO keys VALUES ('a', 1)")
+        store.connection.commit()
+
+    with KeyStore(path, 1) as store:
+        assert store.connection.execute("SELECT key FROM keys").fetchall() == [("a",)]
+
+    with KeyStore(path, 2) as store:
+        assert store.connection.execute("SELECT key FROM keys").fetchall() == []
+
+def test_select_in_covers_every_batch():
+    with KeyStore(":memory:", 1) as store:
+        store.connection.executemany("INSERT INTO keys VALUES (?, ?)", (("k" + str(i), i) for i in range(LOOKUP_BATCH_SIZE * 2 + 1)))
+        rows = store.select_in("SELECT key, value FROM keys WHERE key IN ({})", ("k" + str(i) for i in range(LOOKUP_BATCH_SIZE * 3)))
+        assert len(dict(rows)) == LOOKUP_BATCH_SIZE * 2 + 1
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import trackers
+from issue_list_from_git_log import build_default_query, build_tracker_queries
+from trackers import TrackerRegistry, DEFAULT_TRACKERS
+
+CONFIG = {
+    "default": "jira",
+    "unlinked": ["UNKNOWN", "NOLINK"],
+    "trackers": [
+        {"name": "jira", "kind": "jira", "issue_url": "https://jira.example.com/browse/{key}", "query_url": "https://jira.example.com/?jql="},
+        {"name": "other-jira", "kind": "jira", "projects": ["OPS"], "issue_url": "https://ops.example.com/{project}/{number}", "query_url": "https://ops.example.com/?jql="},
+        {"name": "azdo", "kind": "azdo", "projects": ["AZ", "AZMV"], "issue_url": "https://azdo.example.com/{number}", "query_url": "https://azdo.example.com/?wiql="},
+    ],
+}
+
+@pytest.fixture
+def registry():
+    """The shared registry, configured with CONFIG for the test and restored afterwards"""
+    trackers.registry.configure(CONFIG)
+    yield trackers.registry
+    trackers.registry.configure(DEFAULT_TRACKERS)
+
+def test_keys_are_routed_by_their_longest_prefix(registry):
+    assert registry.route("AZMV-1").name == "azdo"
+    assert registry.route("AZ-2").name == "azdo"
+    assert registry.route("OPS-3").name == "other-jira"
+    assert registry.route("ABC-4") is registry.default
+    assert registry.route("UNKNOWN") is None
+    assert registry.route("NOLINK-5") is None
+
+def test_prefixes_are_matched_case_sensitively(registry):
+    assert registry.route("ops-3") is registry.default
+    assert registry.route("unknown-1") is registry.default
+    assert registry.hyperlink("unknown-1") == '<a href="https://jira.example.com/browse/unknown-1">unknown-1</a>'
+
+def test_default_trackers_link_either_case_of_azmv_to_azure_devops():
+    assert trackers.registry.hyperlink("azmv-5") == '<a href="https://dev.azure.com/MobileVideo/VideoManager/_workitems/edit/5">azmv-5</a>'
+    assert trackers.registry.hyperlink("Azmv-5") == '<a href="https://jira.mot-solutions.com/browse/Azmv-5">Azmv-5</a>'
+    assert trackers.registry.hyperlink("UNKNOWN") == "UNKNOWN"
+
+def test_hyperlinks_use_each_trackers_template(registry):
+    assert registry.hyperlink("OPS-12") == '<a href="https://ops.example.com/OPS/12">OPS-12</a>'
+    assert registry.hyperlink("AZMV-7") == '<a href="https://azdo.example.com/7">AZMV-7</a>'
+    assert registry.hyperlink("UNKNOWN") == "UNKNOWN"
+
+def test_reconfiguring_the_registry_changes_its_links(registry):
+    assert registry.hyperlink("ABC-1") == '<a href="https://jira.example.com/browse/ABC-1">ABC-1</a>'
+
+    registry.configure(DEFAULT_TRACKERS)
+    assert registry.hyperlink("ABC-1") == '<a href="https://jira.mot-solutions.com/browse/ABC-1">ABC-1</a>'
+
+def test_group_keeps_unique_keys_in_the_order_found(registry):
+    keys = ["ABC-2", "AZ-1", "UNKNOWN", "ABC-1", "ABC-2", "OPS-1", "AZ-3"]
+
+    assert registry.group(keys) == {"jira": ["ABC-2", "ABC-1"], "azdo": ["AZ-1", "AZ-3"], "other-jira": ["OPS-1"]}
+    assert registry.default_issues(keys) == ["ABC-2", "ABC-1"]
+
+def test_each_tracker_gets_a_query_in_its_language(registry):
+    keys = ["ABC-2", "AZ-1", "OPS-1", "AZMV-30", "UNKNOWN"]
+
+    assert build_tracker_queries(keys) == ["https://jira.example.com/?jql=issueKey in (ABC-2)",
+                                           "https://azdo.example.com/?wiql=SELECT [System.Id] FROM WorkItems WHERE [System.Id] IN (1,30)",
+                                           "https://ops.example.com/?jql=issueKey in (OPS-1)"]
+    assert build_default_query(keys) == "https://jira.example.com/?jql=issueKey in (ABC-2)"
+
+def test_default_trackers_leave_azdo_issues_out_of_the_jql():
+    assert build_default_query(["ABC-1", "AZMV-1", "amzv-2", "UNKNOWN", "ABC-1"]) == "https://jira.mot-solutions.com/issues/?jql=issueKey in (ABC-1)"
+
+def test_queries_match_prefixes_whatever_their_case(registry):
+    keys = ["ABC-1", "ops-2", "Azmv-3", "az-4", "unknown-1", "NoLink-5"]
+
+    assert registry.route("ops-2") is registry.default
+    assert registry.group(keys) == {"jira": ["ABC-1"], "other-jira": ["ops-2"], "azdo": ["Azmv-3", "az-4"]}
+
+def test_configuration_errors_are_reported():
+    with pytest.raises(ValueError):
+        TrackerRegistry({"default": "jira", "trackers": [{"name": "jira", "kind": "bugzilla", "issue_url": "", "query_url": ""}]})
+    with pytest.raises(ValueError):
+        TrackerRegistry({"default": "missing", "trackers": CONFIG["trackers"]})
+
+def test_trackers_option_loads_a_configuration_file(registry, tmp_path):
+    (tmp_path / "trackers.json").write_text(json.dumps(CONFIG), encoding="utf-8")
+
+    trackers.configure_trackers({'trackers': str(tmp_path / "trackers.json")})
+    assert registry.route("OPS-1").name == "other-jira"
+
+    trackers.configure_trackers({'trackers': None})
+    assert registry.route("OPS-1") is registry.default
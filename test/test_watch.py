@@ -0,0 +1,140 @@
+import csv
+import io
+import os
+
+import pytest
+
+import watch
+from conftest import git
+from release_note_generator import render_sanitised_release_notes
+
+JIRA_EXPORT = ("Issue Type^Issue key^Summary^Custom field (Proposed Release Notes)\n"
+               "Story^ABC-1^The first story^First note\n")
+
+SANITISED = ("JiraId\tIssueType\tInJira\tInGit\tJira Comment\tGit Comment\tProposedReleaseNote\tTake\tActualReleaseNote\n"
+             "ABC-1\tStory\tYes\tYes\tThe first story\tFirst change\tFirst note\tYes\tThe first release note\n")
+
+def touch(path, content):
+    """Rewrite a file, moving its modification time on so the change is seen however coarse the file system's timestamps are"""
+    stat = os.stat(path)
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def review_keys(path):
+    with open(path, encoding="utf-8", newline="") as review_file:
+        return [row[0] for row in csv.reader(review_file)][1:]
+
+@pytest.fixture
+def session(git_repo, tmp_path):
+    (tmp_path / "jira.csv").write_text(JIRA_EXPORT, encoding="utf-8")
+    (tmp_path / "sanitised.tsv").write_text(SANITISED, encoding="utf-8")
+
+    arguments = {'jira': [str(tmp_path / "jira.csv")], 'jira_store': None, 'mmap': False, 'repo_loc': str(git_repo.parent), 'repo': git_repo.name,
+                 'source': "start", 'dest': "end", 'cache': False, 'backend': "gitpython", 'no_commit_log': True, 'commit_log': None,
+                 'background_writes': False, 'parse_jobs': 1, 'input': str(tmp_path / "sanitised.tsv"), 'review': str(tmp_path / "review.csv"),
+                 'output': str(tmp_path / "notes.html")}
+
+    return watch.ReleaseNoteSession(arguments, render_sanitised_release_notes)
+
+def forbid(monkeypatch, *names):
+    """Make the named functions of the watch module fail if they are called"""
+    for name in names:
+        monkeypatch.setattr(watch, name, lambda *args, _name=name, **kwargs: pytest.fail(_name + " should not be called"))
+
+def test_first_refresh_builds_every_output(session, tmp_path):
+    assert session.refresh() == [str(tmp_path / "notes.html"), str(tmp_path / "review.csv")]
+
+    assert review_keys(tmp_path / "review.csv") == ["ABC-1", "ABC-2", "UNKNOWN", "ABC-3"]
+    assert "The first release note" in (tmp_path / "notes.html").read_text()
+
+def test_refresh_without_changes_rebuilds_nothing(session, monkeypatch):
+    session.refresh()
+    forbid(monkeypatch, "load_jira_issues", "iter_git_log")
+
+    assert session.refresh() == []
+
+def test_edited_release_notes_only_rerender_the_html(session, tmp_path, monkeypatch):
+    session.refresh()
+    forbid(monkeypatch, "load_jira_issues", "iter_git_log", "join_grouped")
+
+    touch(tmp_path / "sanitised.tsv", SANITISED.replace("The first release note", "An edited release note"))
+
+    assert session.refresh() == [str(tmp_path / "notes.html")]
+    assert "An edited release note" in (tmp_path / "notes.html").read_text()
+
+def test_changed_jira_export_is_consolidated_with_the_commits_held(session, tmp_path, monkeypatch):
+    session.refresh()
+    forbid(monkeypatch, "iter_git_log")
+
+    touch(tmp_path / "jira.csv", JIRA_EXPORT + "Defect^ABC-2^The second defect^Second note\n")
+
+    assert session.refresh() == [str(tmp_path / "review.csv")]
+    assert review_keys(tmp_path / "review.csv") == ["ABC-1", "ABC-2", "UNKNOWN", "ABC-3"]
+    assert session.consolidated["ABC-2"].found_in_jira == "Yes"
+
+def test_moved_tag_walks_the_range_again(session, git_repo, tmp_path):
+    session.refresh()
+
+    git(git_repo, "commit", "-q", "--allow-empty", "-m", "ABC-7 A late change")
+    git(git_repo, "tag", "-f", "end")
+
+    assert session.refresh() == [str(tmp_path / "review.csv")]
+    assert review_keys(tmp_path / "review.csv") == ["ABC-1", "ABC-7", "ABC-2", "UNKNOWN", "ABC-3"]
+
+def test_missing_input_is_skipped_until_it_is_back(session, tmp_path):
+    session.refresh()
+    os.remove(tmp_path / "sanitised.tsv")
+
+    assert session.refresh() == []
+
+    (tmp_path / "sanitised.tsv").write_text(SANITISED.replace("The first release note", "A restored release note"), encoding="utf-8")
+    assert session.refresh() == [str(tmp_path / "notes.html")]
+
+def test_failed_walk_is_tried_again(session, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("git failed")
+
+    original = watch.iter_git_log
+    monkeypatch.setattr(watch, "iter_git_log", fail)
+    with pytest.raises(RuntimeError):
+        session.refresh()
+
+    monkeypatch.setattr(watch, "iter_git_log", original)
+    assert session.refresh() == [str(tmp_path / "review.csv")]
+    assert review_keys(tmp_path / "review.csv") == ["ABC-1", "ABC-2", "UNKNOWN", "ABC-3"]
+
+def test_review_waits_for_the_first_jira_read(session, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("half saved export")
+
+    original = watch.load_jira_issues
+    monkeypatch.setattr(watch, "load_jira_issues", fail)
+    with pytest.raises(ValueError):
+        session.refresh()
+
+    # The export is not read again until it changes, and the review is not written without it
+    monkeypatch.setattr(watch, "load_jira_issues", original)
+    assert session.refresh() == []
+    assert not (tmp_path / "review.csv").exists()
+
+    touch(tmp_path / "jira.csv", JIRA_EXPORT)
+    assert session.refresh() == [str(tmp_path / "review.csv")]
+    assert session.consolidated["ABC-1"].found_in_jira == "Yes"
+
+def test_watch_reports_a_failure_once_and_keeps_watching(monkeypatch):
+    class FailingSession:
+        refreshes = 0
+
+        def refresh(self):
+            self.refreshes += 1
+            if self.refreshes == 4:
+                raise KeyboardInterrupt
+            raise ValueError("the review is locked")
+
+    monkeypatch.setattr(watch.time, "sleep", lambda seconds: None)
+    output = io.StringIO()
+
+    with pytest.raises(KeyboardInterrupt):
+        watch.watch(FailingSession(), output=output)
+
+    assert output.getvalue().count("failed to regenerate the notes: the review is locked") == 1
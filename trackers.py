@@ -0,0 +1,178 @@
+"""Routing of issue keys to the trackers that hold them (Jira, Azure DevOps...), shared by the html renderers
+ and the query builders.
+
+ Each tracker lists the project prefixes it owns, a template for the url of an issue and the url that a query
+ for a list of its issues (JQL for Jira, WIQL for Azure DevOps) is appended to. Keys that match no prefix go to
+ the default tracker, and keys with an unlinked prefix (UNKNOWN) go to none. The trackers can be loaded from
+ a JSON file of the same shape as DEFAULT_TRACKERS, e.g.
+
+   {"default": "jira",
+    "unlinked": ["UNKNOWN"],
+    "trackers": [{"name": "jira", "kind": "jira", "issue_url": "https://jira.example.com/browse/{key}",
+                  "query_url": "https://jira.example.com/issues/?jql="},
+                 {"name": "azdo", "kind": "azdo", "projects": ["AZMV"],
+                  "issue_url": "https://dev.azure.com/Org/Project/_workitems/edit/{number}",
+                  "query_url": "https://dev.azure.com/Org/Project/_queries/query/?wiql="}]}
+
+ An issue url template can use {key}, {project} (the key up to its first '-') and {number} (the rest).
+
+ Links match the prefixes case-sensitively, as the keys are written in the commit messages, so a tracker that
+ should also link lower case keys lists both cases (as the default Azure DevOps tracker does for azmv).
+ Queries match them whatever their case, so a key such as Azmv-5 is linked to Jira but left out of the JQL.
+ Most keys belong to the default tracker, and are routed by a single str.startswith against every prefix.
+"""
+
+JIRA_ISSUES_URL = "https://jira.mot-solutions.com/issues/?jql="
+
+DEFAULT_TRACKERS = {
+    "default": "jira",
+    "unlinked": ["UNKNOWN"],
+    "trackers": [
+        {"name": "jira", "kind": "jira", "issue_url": "https://jira.mot-solutions.com/browse/{key}", "query_url": JIRA_ISSUES_URL},
+        # AMZV is a common mistyping of AZMV
+        {"name": "azdo", "kind": "azdo", "projects": ["AZMV", "azmv", "AMZV", "amzv"],
+         "issue_url": "https://dev.azure.com/MobileVideo/VideoManager/_workitems/edit/{number}",
+         "query_url": "https://dev.azure.com/MobileVideo/VideoManager/_queries/query/?wiql="},
+    ],
+}
+
+def build_jql_query(issues):
+    """Build a JQL query string for a list of Jira issues"""
+    return "issueKey in (" + ",".join(issues) + ")"
+
+def build_wiql_query(issues):
+    """Build a WIQL query string for a list of Azure DevOps work items, by the number of each key"""
+    return "SELECT [System.Id] FROM WorkItems WHERE [System.Id] IN (" + ",".join(issue.partition("-")[2] for issue in issues) + ")"
+
+# Tracker kind -> the builder of a query for a list of its issues
+QUERY_BUILDERS = {
+    "jira": build_jql_query,
+    "azdo": build_wiql_query,
+}
+
+def compile_hyperlink(template):
+    """A function from an issue key to the html link to it, for an issue url template. Templates that end with their
+    only {key} or {number} are joined directly, as a link is built for every key of a note and str.format is several times slower"""
+    head = '<a href="' + template[:template.rfind("{")]
+
+    if template.endswith("{key}") and template.count("{") == 1:
+        return lambda issue: head + issue + '">' + issue + '</a>'
+
+    if template.endswith("{number}") and template.count("{") == 1:
+        return lambda issue: head + issue.partition("-")[2] + '">' + issue + '</a>'
+
+    def format_hyperlink(issue):
+        project, _, number = issue.partition("-")
+        return '<a href="' + template.format(key=issue, project=project, number=number) + '">' + issue + '</a>'
+
+    return format_hyperlink
+
+class Tracker:
+    """Class to hold an issue tracker: the projects it owns, and how to link to an issue or a query of issues in it"""
+    __slots__ = ("name", "kind", "projects", "issue_url", "query_url", "build_query", "hyperlink")
+
+    def __init__(self, name, kind, issue_url, query_url, projects=()):
+        if kind not in QUERY_BUILDERS:
+            raise ValueError("Unknown kind of tracker " + repr(kind) + " for " + name + ", expected one of " + ", ".join(QUERY_BUILDERS))
+
+        self.name = name
+        self.kind = kind
+        self.projects = tuple(projects)
+        self.issue_url = issue_url
+        self.query_url = query_url
+        self.build_query = QUERY_BUILDERS[kind]
+
+        # The html link to an issue
+        self.hyperlink = compile_hyperlink(issue_url)
+
+    def query(self, issues):
+        """The url of a query for a list of issues"""
+        return self.query_url + self.build_query(issues)
+
+class TrackerRegistry:
+    """Class to route issue keys to their trackers, by project prefix"""
+    def __init__(self, config=DEFAULT_TRACKERS):
+        self.configure(config)
+
+    def configure(self, config):
+        """Replace the trackers with those of a configuration (shaped as DEFAULT_TRACKERS)"""
+        trackers = [Tracker(**tracker) for tracker in config["trackers"]]
+        self.trackers = {tracker.name: tracker for tracker in trackers}
+
+        if config["default"] not in self.trackers:
+            raise ValueError("The default tracker " + repr(config["default"]) + " is not one of the trackers")
+        self.default = self.trackers[config["default"]]
+
+        # Prefix -> tracker (None for unlinked keys)
+        self.prefixes = {prefix: None for prefix in config.get("unlinked", [])}
+        for tracker in trackers:
+            self.prefixes.update((project, tracker) for project in tracker.projects)
+
+        # Longest first, so the longest matching prefix wins
+        self.ordered_prefixes = tuple(sorted(self.prefixes, key=len, reverse=True))
+
+        # Upper case prefix -> tracker, for queries. Of the prefixes that only differ by case, the longest listed first wins
+        self.query_prefixes = {}
+        for prefix in self.ordered_prefixes:
+            self.query_prefixes.setdefault(prefix.upper(), self.prefixes[prefix])
+        self.ordered_query_prefixes = tuple(self.query_prefixes)
+
+    def match(self, issue, prefixes, ordered_prefixes):
+        """The tracker of the longest of ordered_prefixes that an issue key starts with, looked up in prefixes,
+        or the default tracker if there is none"""
+        # Checked against every prefix at once, as most keys match none and go to the default tracker
+        if not issue.startswith(ordered_prefixes):
+            return self.default
+
+        for prefix in ordered_prefixes:
+            if issue.startswith(prefix):
+                return prefixes[prefix]
+
+    def route(self, issue):
+        """The tracker an issue key links to, or None for an unlinked key"""
+        return self.match(issue, self.prefixes, self.ordered_prefixes)
+
+    def route_query(self, issue):
+        """The tracker whose query an issue key belongs in, matching the prefixes whatever their case, or None for an unlinked key"""
+        return self.match(issue.upper(), self.query_prefixes, self.ordered_query_prefixes)
+
+    def hyperlink(self, issue):
+        """The html link to an issue in its tracker, or the key itself for an unlinked key"""
+        tracker = self.route(issue)
+        return issue if tracker is None else tracker.hyperlink(issue)
+
+    def group(self, keys):
+        """Split an iterable of issue keys into a dictionary of tracker name -> unique keys to query, in the order they
+        were found. Unlinked keys are left out"""
+        groups = {}
+
+        # dict.fromkeys is an ordered set, so each key is only routed once however many times it appears
+        for key in dict.fromkeys(keys):
+            tracker = self.route_query(key)
+            if tracker is not None:
+                groups.setdefault(tracker.name, []).append(key)
+
+        return groups
+
+    def default_issues(self, keys):
+        """The unique keys of an iterable that belong to the default tracker, in the order they were found"""
+        return self.group(keys).get(self.default.name, [])
+
+def load_config(path):
+    """Read a tracker configuration from a JSON file"""
+    # Only needed when a configuration file is given, so json is not imported at startup
+    import json
+
+    with open(path, "r", encoding="utf-8") as config_file:
+        return json.load(config_file)
+
+def add_tracker_arguments(parser):
+    """Add the option to load the trackers from a configuration file to a tool's argument parser"""
+    parser.add_argument('--trackers', type=str, help='JSON file of the issue trackers to link and query issues in, by project prefix (default: Jira, with AZMV issues in Azure DevOps)')
+
+def configure_trackers(arguments):
+    """Load the trackers from the configuration file given on the command line, or the default trackers if there is none"""
+    registry.configure(load_config(arguments['trackers']) if arguments.get('trackers') else DEFAULT_TRACKERS)
+
+# The registry shared by the renderers and the query builders
+registry = TrackerRegistry()
@@ -0,0 +1,158 @@
+"""Keep the data of a release note run in memory, and regenerate the outputs as their inputs change.
+
+ A ReleaseNoteSession holds the commits of the git range, the issues of the Jira exports and their
+ consolidation. Each refresh() compares the inputs against what the outputs were last built from:
+ the modification time and size of each file, and the shas the source and destination tags point at.
+ Only what depends on a changed input is rebuilt: an edit to the sanitised release notes re-renders the
+ html alone, without touching git or Jira, a new Jira export is read and re-consolidated with the
+ commits already held, and the git range is only walked again when a tag has moved.
+"""
+
+import os
+import sys
+import time
+
+from parse_git_log import open_repo, iter_git_log
+from jira_snapshot import load_jira_issues
+from consolidate import group_commits, join_grouped, review_rows, REVIEW_HEADER
+from output_sinks import open_sink
+from instrumentation import metrics
+
+# Seconds between checks for changed inputs
+WATCH_INTERVAL = 1.0
+
+def file_fingerprint(path):
+    """The modification time and size of a file, or None if it does not exist (e.g. while an editor is replacing it)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+class ReleaseNoteSession:
+    """Class to hold the parsed inputs of a release note run, taking the same arguments as release_note_generator"""
+    def __init__(self, arguments, render_release_notes):
+        self.arguments = arguments
+        self.render_release_notes = render_release_notes
+        self.commit_log = None if arguments['no_commit_log'] else arguments['commit_log']
+
+        # What the current outputs were built from, None until they are first built
+        self.jira_fingerprints = None
+        self.range_shas = None
+        self.sanitised_fingerprint = None
+
+        # None until the Jira exports have been read, so a review is never written without them
+        self.jira_issues = None
+        self.commit_groups = {}
+        self.consolidated = {}
+
+        # Set when the review has to be written again, until it has been written
+        self.review_stale = False
+
+    def resolve_range(self):
+        """The shas the source and destination tags point at now"""
+        with open_repo(self.arguments['repo_loc'], self.arguments['repo'], self.arguments['backend']) as repo:
+            return repo.resolve(self.arguments['source']), repo.resolve(self.arguments['dest'])
+
+    def refresh_jira(self):
+        """Read the Jira exports again if any of them have changed, returning True if they were read"""
+        fingerprints = [file_fingerprint(path) for path in self.arguments['jira']]
+
+        if fingerprints == self.jira_fingerprints or None in fingerprints:
+            return False
+
+        # Recorded first, so an export that cannot be read is not read again until it changes
+        self.jira_fingerprints = fingerprints
+
+        with metrics.stage("read jira export"):
+            self.jira_issues = load_jira_issues(self.arguments['jira'], self.arguments['jira_store'], self.arguments['mmap'])
+
+        return True
+
+    def refresh_git(self):
+        """Walk the git range again if either tag has moved, returning True if it was walked"""
+        range_shas = self.resolve_range()
+
+        if range_shas == self.range_shas:
+            return False
+
+        # Walk the shas that were resolved, so a tag that moves during the walk is picked up by the next refresh
+        with metrics.stage("read git log"):
+            log_entries = iter_git_log(self.arguments['repo_loc'], self.arguments['repo'], *range_shas, use_cache=self.arguments['cache'],
+                                       backend=self.arguments['backend'], commit_log=self.commit_log,
+                                       background_writes=self.arguments['background_writes'], parse_jobs=self.arguments['parse_jobs'])
+            self.commit_groups = group_commits(commit for _, commit in log_entries)
+
+        # Recorded once the walk has succeeded, so a walk that fails is tried again by the next refresh
+        self.range_shas = range_shas
+
+        return True
+
+    def refresh_release_notes(self):
+        """Render the sanitised release notes again if they have changed, returning True if they were rendered"""
+        fingerprint = file_fingerprint(self.arguments['input'])
+
+        if fingerprint == self.sanitised_fingerprint or fingerprint is None:
+            return False
+
+        self.sanitised_fingerprint = fingerprint
+
+        with metrics.stage("render release notes"):
+            self.render_release_notes(self.arguments['input'], self.arguments['output'], self.arguments['dest'], self.arguments['source'])
+
+        return True
+
+    def refresh(self):
+        """Rebuild the outputs that depend on changed inputs, returning the names of the outputs rebuilt"""
+        rebuilt = []
+
+        # The sanitised release notes depend on neither git nor Jira, so an edit to them is rendered first
+        if self.refresh_release_notes():
+            rebuilt.append(self.arguments['output'])
+
+        if self.refresh_jira():
+            self.review_stale = True
+        if self.refresh_git():
+            self.review_stale = True
+
+        # The review waits until both git and Jira have been read at least once, rather than being written from half its inputs
+        if self.review_stale and self.jira_issues is not None and self.range_shas is not None:
+            with metrics.stage("consolidate"):
+                self.consolidated = join_grouped(self.jira_issues, self.commit_groups)
+
+            # Tried again on every refresh until it is written, e.g. while the review is open in a spreadsheet that locks it
+            with metrics.stage("write review"):
+                with open_sink(self.arguments['review'], REVIEW_HEADER, self.arguments['background_writes']) as review_sink:
+                    review_sink.write_rows(review_rows(self.consolidated))
+
+            self.review_stale = False
+            rebuilt.append(self.arguments['review'])
+
+        return rebuilt
+
+def watch(session, interval=WATCH_INTERVAL, output=None):
+    """Refresh a session every interval seconds until interrupted, reporting each rebuild (to stdout unless given an output).
+    A refresh that fails, e.g. on a half saved file, is reported and carries on watching; the input is read again once it changes"""
+    output = output or sys.stdout
+    last_error = None
+
+    while True:
+        start = time.perf_counter()
+        rebuilt = []
+
+        try:
+            rebuilt = session.refresh()
+            last_error = None
+        except Exception as error:
+            # Report an error once, rather than on every refresh that retries the same failing output
+            if str(error) != last_error:
+                output.write(time.strftime("%H:%M:%S") + " failed to regenerate the notes: " + str(error) + "\n")
+                output.flush()
+            last_error = str(error)
+
+        if rebuilt:
+            output.write(time.strftime("%H:%M:%S") + " regenerated " + ", ".join(rebuilt) + f" in {time.perf_counter() - start:.3f}s\n")
+            output.flush()
+
+        time.sleep(interval)